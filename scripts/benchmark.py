@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the analysis scripts.
+Each script runs in a fresh process against synthetic data (see synthetic_data.py), with
+its load, clean, categorize, aggregate and render stages timed separately (see
+instrumentation.py). Wall time and peak RSS of every stage are appended to a JSON
+history and compared with the last run of the same configuration, so regressions
+show up run over run. Generated data and the history are kept in .bench/.
+
+Usage:
+    python3 benchmark.py                           # every script, 100k stops
+    python3 benchmark.py --rows 5M quick_summary   # one script, 5M stops
+    python3 benchmark.py --data ../csvs            # real data instead of synthetic
+    python3 benchmark.py --warm --cache-format mmap  # memory-mapped stops store
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+
+import synthetic_data
+from instrumentation import instrumented_run, stage
+
+BENCH_DIR = '.bench'
+HISTORY_FILE = str(Path(BENCH_DIR) / 'benchmark_history.json')
+
+# A stage this much slower (or larger) than in the previous comparable run is flagged
+DEFAULT_THRESHOLD = 0.10
+
+# Stages shorter than this are too noisy to flag
+MIN_SECONDS = 0.05
+
+# Caches removed before each script unless --warm is given
+CACHE_DIRS = ['.stops_cache', '.pums_cache']
+
+HOUSING_CSV = str(Path(synthetic_data.PUMS_DIR) / synthetic_data.HOUSING_CSV)
+PERSON_CSV = str(Path(synthetic_data.PUMS_DIR) / synthetic_data.PERSON_CSV)
+DICT_FILE = str(Path(synthetic_data.PUMS_DIR) / synthetic_data.PUMS_DICTIONARY)
+
+
+def _stops_benchmark(report):
+    """Benchmark of one stops report script through its COLUMNS/DERIVED/compute/report/chart_jobs hooks."""
+    def run():
+        from charts import render_charts
+        from stops_data import load_stops
+        from stops_reports import load_report_modules
+        from stops_schema import derive_columns
+
+        module = load_report_modules([report])[report]
+        with stage('load'):
+            df = load_stops(module.COLUMNS)
+        # derive_columns times its own clean and categorize stages
+        with stage('derive'):
+            derive_columns(df, module.DERIVED)
+        with stage('aggregate'):
+            results = module.compute(df)
+        with stage('render'):
+            module.report(results)
+            render_charts(module.chart_jobs(results), force=True)
+        return len(df)
+    return run
+
+
+def _update_headers(var_descriptions):
+    from update_pums_headers_improved import update_csv_headers
+
+    for csv_file in [HOUSING_CSV, PERSON_CSV]:
+        update_csv_headers(csv_file, var_descriptions, csv_file.replace('.csv', '_updated_headers.csv'))
+
+
+def bench_pums_headers():
+    """Benchmark of update_pums_headers_improved.py."""
+    from update_pums_headers_improved import parse_data_dictionary
+
+    with stage('load'):
+        var_descriptions = parse_data_dictionary(DICT_FILE)
+    # update_csv_headers times each file as a 'write' stage
+    _update_headers(var_descriptions)
+    return None
+
+
+def setup_latino():
+    """The Latino analysis reads the renamed PUMS files; write them if missing."""
+    from update_pums_headers_improved import parse_data_dictionary
+
+    if not Path(PERSON_CSV.replace('.csv', '_updated_headers.csv')).exists():
+        _update_headers(parse_data_dictionary(DICT_FILE))
+
+
+def bench_latino():
+    """Benchmark of latino_car_ownership_simple.py."""
+    import latino_car_ownership_simple as latino
+    from charts import render_charts
+
+    with stage('load'):
+        merged_data = latino.load_and_prepare_data()
+    with stage('aggregate'):
+        latino_data_clean, non_latino_data_clean, basic_chart = latino.create_basic_graphs(merged_data)
+        income_chart = latino.create_income_analysis(latino_data_clean)
+        latino.print_summary_statistics(latino_data_clean, non_latino_data_clean)
+    with stage('render'):
+        render_charts([chart for chart in [basic_chart, income_chart] if chart is not None], force=True)
+    return len(merged_data)
+
+
+# Script -> benchmark function; each times its stages and returns the rows processed
+BENCHMARKS = {
+    'police_stops_analysis': _stops_benchmark('race'),
+    'quick_summary': _stops_benchmark('summary'),
+    'violation_analysis': _stops_benchmark('violations'),
+    'cvap_analysis': _stops_benchmark('cvap'),
+    'update_pums_headers_improved': bench_pums_headers,
+    'latino_car_ownership_simple': bench_latino,
+}
+
+# Script -> untimed preparation run before its benchmark
+SETUP = {
+    'latino_car_ownership_simple': setup_latino,
+}
+
+
+def run_benchmark(script, data_dir, warm=False, verbose=False):
+    """
+    Run one script's benchmark in the current process (called in a fresh worker process).
+
+    Args:
+        script (str): Key of BENCHMARKS
+        data_dir (str): Directory holding the input files (the scripts' working directory)
+        warm (bool): Keep the stops/PUMS caches left by earlier runs
+        verbose (bool): Show the script's own output
+
+    Returns:
+        dict: Script name, rows processed, total seconds, peak RSS and per-stage records
+    """
+    os.chdir(data_dir)
+    if not warm:
+        for cache_dir in CACHE_DIRS:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    Path('visualizations').mkdir(exist_ok=True)
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(sys.stdout if verbose else devnull):
+        if script in SETUP:
+            SETUP[script]()
+        with instrumented_run(script, report=False) as record:
+            rows = BENCHMARKS[script]()
+
+    return {'script': script, 'rows': rows, 'seconds': record['seconds'], 'peak_rss_mb': record['peak_rss_mb'],
+            'stages': record['stages']}
+
+
+def prepare_data(rows, households, seed, bench_dir=BENCH_DIR):
+    """
+    Generate the synthetic inputs for a configuration, reusing them when already present.
+
+    Returns:
+        Path: Directory holding the generated files
+    """
+    data_dir = Path(bench_dir) / f"data-{rows}-{households}-{seed}"
+    marker = data_dir / 'synthetic.json'
+    if marker.exists():
+        return data_dir
+
+    print(f"Generating {rows:,} synthetic stops and {households:,} households in {data_dir}/...")
+    outputs = synthetic_data.generate(data_dir, rows, households, seed)
+    with open(marker, 'w', encoding='utf-8') as f:
+        json.dump({'rows': rows, 'households': households, 'seed': seed, 'files': outputs}, f, indent=2)
+    return data_dir
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def read_history(history_file):
+    """Previous benchmark runs (an empty list if there is no history yet)."""
+    try:
+        with open(history_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def append_history(history_file, run):
+    """Append a run to the JSON history, replacing the file atomically."""
+    history = read_history(history_file) + [run]
+    Path(history_file).parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = Path(f"{history_file}.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_file, history_file)
+
+
+def previous_run(history, config):
+    """Most recent run in the history with the same configuration."""
+    for run in reversed(history):
+        if run.get('config') == config:
+            return run
+    return None
+
+
+def compare(result, previous, threshold=DEFAULT_THRESHOLD):
+    """
+    Stages of a script that got slower or larger than in a previous run.
+
+    Args:
+        result (dict): Output of run_benchmark()
+        previous (dict): Earlier run from the history (None if there is none)
+        threshold (float): Relative change that counts as a regression
+
+    Returns:
+        list: (stage, metric, old value, new value) tuples
+    """
+    if previous is None:
+        return []
+    old = next((entry for entry in previous['results'] if entry['script'] == result['script']), None)
+    if old is None:
+        return []
+
+    old_stages = {record['stage']: record for record in old['stages']}
+    regressions = []
+    for record in result['stages'] + [{'stage': 'total', **result}]:
+        before = old_stages.get(record['stage'], old if record['stage'] == 'total' else None)
+        if before is None:
+            continue
+        for metric in ['seconds', 'peak_rss_mb']:
+            if metric == 'seconds' and record[metric] < MIN_SECONDS:
+                continue
+            if before[metric] > 0 and record[metric] > before[metric] * (1 + threshold):
+                regressions.append((record['stage'], metric, before[metric], record[metric]))
+    return regressions
+
+
+def print_result(result, regressions):
+    """Print one script's stage timings and any regressions."""
+    rows = f" ({result['rows']:,} rows)" if result['rows'] is not None else ""
+    print(f"\n⏱️  {result['script']}{rows}: {result['seconds']:.2f}s, peak RSS {result['peak_rss_mb']:,.0f} MB")
+    for record in result['stages']:
+        print(f"   {record['stage']:<20} {record['seconds']:>8.2f}s   {record['peak_rss_mb']:>8,.0f} MB")
+    for stage_name, metric, before, after in regressions:
+        unit = 's' if metric == 'seconds' else ' MB'
+        print(f"   ⚠️  {stage_name} {metric}: {before:,.2f}{unit} -> {after:,.2f}{unit} "
+              f"(+{(after / before - 1) * 100:.0f}%)")
+
+
+def main():
+    """Main function to benchmark the analysis scripts."""
+    parser = argparse.ArgumentParser(description="Benchmark the analysis scripts on synthetic data")
+    parser.add_argument('scripts', nargs='*', help=f"Scripts to benchmark: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--rows', type=synthetic_data.parse_count, default=synthetic_data.DEFAULT_ROWS,
+                        help=f"Synthetic stops, e.g. 100k or 50M (default: {synthetic_data.DEFAULT_ROWS:,})")
+    parser.add_argument('--households', type=synthetic_data.parse_count, default=synthetic_data.DEFAULT_HOUSEHOLDS,
+                        help=f"Synthetic PUMS housing records (default: {synthetic_data.DEFAULT_HOUSEHOLDS:,})")
+    parser.add_argument('--seed', type=int, default=synthetic_data.DEFAULT_SEED, help="Random seed")
+    parser.add_argument('--data', help="Benchmark against the input files in this directory instead of synthetic data")
+    parser.add_argument('--warm', action='store_true', help="Keep the stops/PUMS caches between scripts")
+    parser.add_argument('--cache-format', choices=['parquet', 'mmap'],
+                        default=os.environ.get('STOPS_CACHE_FORMAT', 'parquet'),
+                        help="Stops cache the scripts load from (default: $STOPS_CACHE_FORMAT or parquet)")
+    parser.add_argument('--history', default=HISTORY_FILE, help=f"JSON history file (default: {HISTORY_FILE})")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Relative slowdown reported as a regression (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--verbose', action='store_true', help="Show the scripts' own output")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.scripts if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown script(s): {', '.join(unknown)}")
+    scripts = args.scripts or list(BENCHMARKS)
+
+    if args.data:
+        data_dir = Path(args.data)
+        config = {'data': str(data_dir.resolve()), 'warm': args.warm}
+    else:
+        data_dir = prepare_data(args.rows, args.households, args.seed)
+        config = {'rows': args.rows, 'households': args.households, 'seed': args.seed, 'warm': args.warm}
+    if args.cache_format != 'parquet':
+        config['cache_format'] = args.cache_format
+    # Inherited by the worker processes, where stops_data reads it
+    os.environ['STOPS_CACHE_FORMAT'] = args.cache_format
+
+    previous = previous_run(read_history(args.history), config)
+    print(f"🏁 Benchmarking {len(scripts)} script(s) in {data_dir}/")
+
+    results = []
+    regressed = 0
+    for script in scripts:
+        # A fresh process per script, so peak RSS is the script's own
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+            result = pool.submit(run_benchmark, script, str(data_dir.resolve()), args.warm, args.verbose).result()
+        regressions = compare(result, previous, args.threshold)
+        regressed += bool(regressions)
+        print_result(result, regressions)
+        results.append(result)
+
+    append_history(args.history, {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': results,
+    })
+
+    print(f"\n📁 Results appended to {args.history}")
+    if previous is None:
+        print("   No earlier run with this configuration to compare against")
+    elif regressed:
+        print(f"   ⚠️  {regressed} script(s) regressed since {previous['timestamp']} ({previous['commit']})")
+    else:
+        print(f"   ✅ No regressions since {previous['timestamp']} ({previous['commit']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Chart drawing and parallel rendering for the analysis scripts.
+Every plot_* function is a pure function of aggregated tables that returns a matplotlib Figure;
+render_charts rasterizes a batch of them concurrently in a process pool using the Agg backend.
+Charts whose inputs, style and DPI are unchanged since the existing PNG was written are skipped.
+
+Rendering can be tuned with the CHART_WORKERS and CHART_DPI environment variables.
+"""
+
+import hashlib
+import os
+import types
+from collections import namedtuple
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DPI = int(os.environ.get('CHART_DPI', 300))
+DEFAULT_WORKERS = int(os.environ.get('CHART_WORKERS', os.cpu_count() or 1))
+
+# plot: module-level plot_* function; kwargs: its aggregated inputs;
+# style: matplotlib style sheet; palette: seaborn palette name for the color cycle
+ChartJob = namedtuple('ChartJob', ['plot', 'kwargs', 'output_file', 'style', 'palette'],
+                      defaults=('default', None))
+
+# PNG text chunk holding the input hash of the rendered chart
+HASH_METADATA_KEY = 'InputHash'
+
+
+def _pyplot():
+    """Import pyplot with the Agg backend on first use, so text-only runs never load matplotlib."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+@lru_cache(maxsize=None)
+def _matplotlib_version():
+    from importlib.metadata import version
+    return version('matplotlib')
+
+
+def plot_race_distribution(race_counts):
+    """Pie chart of police stops by subject race."""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(12, 8))
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD']
+    ax.pie(race_counts.values, labels=race_counts.index, autopct='%1.1f%%',
+           colors=colors, startangle=90)
+    ax.set_title('Police Stops by Subject Race', fontsize=16, fontweight='bold', pad=20)
+    fig.tight_layout()
+    return fig
+
+
+def plot_violation_categories(category_counts):
+    """Horizontal bar chart of police stops by violation category."""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(14, 8))
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#FFB6C1', '#98D8C8', '#F7DC6F', '#BB8FCE']
+    bars = ax.barh(range(len(category_counts)), category_counts.values, color=colors[:len(category_counts)])
+    ax.set_yticks(range(len(category_counts)))
+    ax.set_yticklabels(category_counts.index)
+    ax.set_title('Police Stops by Violation Category', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Number of Stops')
+
+    # Add value labels
+    for bar in bars:
+        width = bar.get_width()
+        ax.text(width + width*0.01, bar.get_y() + bar.get_height()/2,
+                f'{int(width):,}', ha='left', va='center', fontweight='bold')
+
+    fig.tight_layout()
+    return fig
+
+
+def plot_violation_categories_pie(category_counts):
+    """Pie chart of the top 8 violation categories."""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(12, 8))
+    top_categories = category_counts.head(8)  # Show top 8 categories
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#FFB6C1', '#98D8C8']
+    ax.pie(top_categories.values, labels=top_categories.index, autopct='%1.1f%%',
+           colors=colors, startangle=90)
+    ax.set_title('Distribution of Violation Categories', fontsize=16, fontweight='bold', pad=20)
+    fig.tight_layout()
+    return fig
+
+
+def plot_violation_categories_by_race(race_violation_cross):
+    """Stacked bars of violation categories for the five most-stopped races."""
+    plt = _pyplot()
+    top_races = race_violation_cross.sum(axis=1).nlargest(5).index
+    race_violation_filtered = race_violation_cross.loc[top_races]
+
+    fig, ax = plt.subplots(figsize=(14, 8))
+    race_violation_filtered.plot(kind='bar', stacked=True, ax=ax, colormap='Set3')
+    ax.set_title('Violation Categories by Race', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Subject Race')
+    ax.set_ylabel('Number of Stops')
+    ax.legend(title='Violation Category', bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.setp(ax.get_xticklabels(), rotation=45)
+    fig.tight_layout()
+    return fig
+
+
+def plot_cvap_vs_police(cvap_distribution, police_distribution):
+    """Side-by-side pies of CVAP and police stops by race."""
+    plt = _pyplot()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+
+    ax1.pie(cvap_distribution.values, labels=cvap_distribution.index, autopct='%1.1f%%', startangle=90)
+    ax1.set_title('CVAP Distribution by Race')
+
+    ax2.pie(police_distribution.values, labels=police_distribution.index, autopct='%1.1f%%', startangle=90)
+    ax2.set_title('Police Stops by Race')
+
+    fig.tight_layout()
+    return fig
+
+
+def plot_disparity(comparison_df):
+    """Bar chart of stop-to-CVAP disparity ratios by race."""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(12, 6))
+    races = comparison_df['Race']
+    ratios = comparison_df['Disparity_Ratio']
+
+    bars = ax.bar(races, ratios, color=['#FF6B6B' if r > 1.5 else '#4ECDC4' if r > 1.0 else '#45B7D1' for r in ratios])
+    ax.axhline(y=1.0, color='red', linestyle='--', alpha=0.7, label='Equal Representation')
+    ax.set_title('Police Stop Disparity Ratio (Stops % / CVAP %)', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Disparity Ratio')
+    ax.set_xlabel('Race')
+    ax.legend()
+
+    # Add value labels
+    for bar, ratio in zip(bars, ratios):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.05,
+                f'{ratio:.2f}', ha='center', va='bottom', fontweight='bold')
+
+    fig.tight_layout()
+    return fig
+
+
+def plot_detailed_comparison(comparison_df):
+    """Grouped bars of CVAP % and police stops % by race."""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(14, 8))
+    x = np.arange(len(comparison_df))
+    width = 0.35
+
+    bars1 = ax.bar(x - width/2, comparison_df['CVAP_Percentage'], width, label='CVAP %', color='#4ECDC4')
+    bars2 = ax.bar(x + width/2, comparison_df['Police_Percentage'], width, label='Police Stops %', color='#FF6B6B')
+
+    ax.set_xlabel('Race')
+    ax.set_ylabel('Percentage')
+    ax.set_title('CVAP vs Police Stops Percentage Comparison', fontsize=14, fontweight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels(comparison_df['Race'])
+    ax.legend()
+
+    # Add value labels
+    for bars in [bars1, bars2]:
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                    f'{height:.1f}%', ha='center', va='bottom', fontsize=9)
+
+    fig.tight_layout()
+    return fig
+
+
+def _no_data(ax, title):
+    ax.text(0.5, 0.5, 'No data available', ha='center', va='center', transform=ax.transAxes)
+    ax.set_title(title)
+
+
+def _labeled_bars(ax, values, ylabel, title):
+    bars = ax.bar(['Latino', 'Non-Latino'], values, color=['#ff7f0e', '#1f77b4'], alpha=0.8)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(True, alpha=0.3)
+
+    # Add percentage labels on bars
+    for bar, value in zip(bars, values):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                f'{value:.1f}%', ha='center', va='bottom', fontweight='bold')
+
+
+def plot_latino_car_ownership_basic(ownership_latino, ownership_non_latino, no_vehicle, multiple_vehicles,
+                                    age_vehicle_pivot):
+    """2x2 panel comparing Latino and non-Latino vehicle ownership."""
+    plt = _pyplot()
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+
+    # 1. Vehicle Ownership Distribution by Ethnicity
+    ax1 = axes[0, 0]
+    x = np.arange(len(ownership_latino))
+    width = 0.35
+
+    ax1.bar(x - width/2, ownership_latino.values, width, label='Latino', alpha=0.8, color='#ff7f0e')
+    ax1.bar(x + width/2, ownership_non_latino.values, width, label='Non-Latino', alpha=0.8, color='#1f77b4')
+
+    ax1.set_xlabel('Number of Vehicles')
+    ax1.set_ylabel('Percentage of Population')
+    ax1.set_title('Vehicle Ownership by Ethnicity')
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(ownership_latino.index, rotation=45)
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    # 2. No Vehicle Ownership Comparison
+    _labeled_bars(axes[0, 1], no_vehicle, 'Percentage with No Vehicles', 'No Vehicle Ownership by Ethnicity')
+
+    # 3. Multiple Vehicle Ownership (2+ vehicles)
+    _labeled_bars(axes[1, 0], multiple_vehicles, 'Percentage with 2+ Vehicles',
+                  'Multiple Vehicle Ownership by Ethnicity')
+
+    # 4. Vehicle Ownership by Age Group (Latino)
+    ax4 = axes[1, 1]
+    if age_vehicle_pivot is not None and not age_vehicle_pivot.empty:
+        age_vehicle_pivot.plot(kind='bar', stacked=True, ax=ax4)
+        ax4.set_title('Vehicle Ownership by Age Group (Latino)')
+        ax4.set_xlabel('Age Group')
+        ax4.set_ylabel('Percentage')
+        ax4.tick_params(axis='x', rotation=45)
+        ax4.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    else:
+        _no_data(ax4, 'Vehicle Ownership by Age Group (Latino)')
+
+    fig.tight_layout()
+    return fig
+
+
+def plot_latino_car_ownership_income(income_vehicle_pivot, no_vehicle_by_income):
+    """Latino vehicle ownership and no-vehicle share by income level."""
+    plt = _pyplot()
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+
+    # 1. Vehicle Ownership by Income Level
+    ax1 = axes[0]
+    if not income_vehicle_pivot.empty:
+        income_vehicle_pivot.plot(kind='bar', stacked=True, ax=ax1)
+        ax1.set_title('Vehicle Ownership by Income Level (Latino)')
+        ax1.set_xlabel('Income Level')
+        ax1.set_ylabel('Percentage')
+        ax1.tick_params(axis='x', rotation=45)
+        ax1.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    else:
+        _no_data(ax1, 'Vehicle Ownership by Income Level (Latino)')
+
+    # 2. No Vehicle Ownership by Income
+    ax2 = axes[1]
+    if len(no_vehicle_by_income) > 0:
+        no_vehicle_by_income.plot(kind='bar', ax=ax2, color='#ff7f0e')
+        ax2.set_title('No Vehicle Ownership by Income (Latino)')
+        ax2.set_xlabel('Income Level')
+        ax2.set_ylabel('Percentage with No Vehicles')
+        ax2.tick_params(axis='x', rotation=45)
+        ax2.grid(True, alpha=0.3)
+
+        # Add percentage labels
+        for i, v in enumerate(no_vehicle_by_income.values):
+            ax2.text(i, v + 0.5, f'{v:.1f}%', ha='center', va='bottom', fontweight='bold')
+    else:
+        _no_data(ax2, 'No Vehicle Ownership by Income (Latino)')
+
+    fig.tight_layout()
+    return fig
+
+
+def _update_hash(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr((list(value.columns), list(value.dtypes.astype(str)))).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(repr((value.name, str(value.dtype))).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(repr(key).encode('utf-8'))
+            _update_hash(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'seq{len(value)}'.encode('utf-8'))
+        for item in value:
+            _update_hash(digest, item)
+    else:
+        digest.update(repr(value).encode('utf-8'))
+
+
+def _code_fingerprint(code):
+    """Bytecode and constants of a function, recursing into nested code objects."""
+    consts = [_code_fingerprint(c) if hasattr(c, 'co_code') else repr(c) for c in code.co_consts]
+    return [code.co_code, consts]
+
+
+def _code_names(code):
+    """Global names referenced by a code object and the code objects nested in it."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            names |= _code_names(const)
+    return names
+
+
+def _function_fingerprint(function, seen=None):
+    """
+    Code of a function plus that of every module-level function it calls, recursively.
+
+    Helpers shared by several plot functions (_labeled_bars, _no_data, ...) are part
+    of the fingerprint, so editing one invalidates every chart drawn with it.
+    """
+    seen = {function.__name__} if seen is None else seen
+    helpers = []
+    for name in sorted(_code_names(function.__code__)):
+        helper = function.__globals__.get(name)
+        if (name not in seen and isinstance(helper, types.FunctionType)
+                and helper.__module__ == function.__module__):
+            seen.add(name)
+            helpers.append([name, _function_fingerprint(helper, seen)])
+    return [_code_fingerprint(function.__code__), helpers]
+
+
+def chart_hash(job, dpi):
+    """
+    Hash everything that determines a chart's pixels.
+
+    Covers the input tables, the code of the plot function and the chart helpers
+    it calls, style, palette, DPI and the matplotlib version.
+
+    Args:
+        job (ChartJob): Chart to hash
+        dpi (int): Output resolution
+
+    Returns:
+        str: Hex digest identifying the rendered output
+    """
+    digest = hashlib.sha256()
+    _update_hash(digest, [job.plot.__name__, _function_fingerprint(job.plot),
+                          job.style, job.palette, dpi, _matplotlib_version()])
+    _update_hash(digest, job.kwargs)
+    return digest.hexdigest()
+
+
+def recorded_hash(output_file):
+    """Return the input hash stored in an existing PNG, or None."""
+    from PIL import Image
+
+    try:
+        with Image.open(output_file) as image:
+            return image.info.get(HASH_METADATA_KEY)
+    except (OSError, ValueError):
+        return None
+
+
+def render_chart(job, dpi=DEFAULT_DPI, input_hash=None):
+    """
+    Draw one chart and save it as a PNG.
+
+    Args:
+        job (ChartJob): Chart to render
+        dpi (int): Output resolution
+        input_hash (str): Hash recorded in the PNG metadata (computed if None)
+
+    Returns:
+        str: Path of the written file
+    """
+    if input_hash is None:
+        input_hash = chart_hash(job, dpi)
+
+    rc = {}
+    if job.palette is not None:
+        import seaborn as sns
+        from cycler import cycler
+        rc['axes.prop_cycle'] = cycler(color=sns.color_palette(job.palette))
+
+    plt = _pyplot()
+    Path(job.output_file).parent.mkdir(parents=True, exist_ok=True)
+    with plt.style.context(job.style), plt.rc_context(rc):
+        fig = job.plot(**job.kwargs)
+        fig.savefig(job.output_file, dpi=dpi, bbox_inches='tight',
+                    metadata={HASH_METADATA_KEY: input_hash})
+        plt.close(fig)
+
+    return str(job.output_file)
+
+
+def render_charts(jobs, workers=None, dpi=None, force=False):
+    """
+    Render a batch of charts concurrently, skipping charts that are already up to date.
+
+    Args:
+        jobs (list): ChartJob entries to render
+        workers (int): Worker processes (default: CHART_WORKERS or the CPU count);
+            1 renders serially in this process
+        dpi (int): Output resolution (default: CHART_DPI or 300)
+        force (bool): Re-render even when the existing PNG's recorded hash matches
+
+    Returns:
+        list: Paths of all output files, in job order
+    """
+    jobs = list(jobs)
+    dpi = dpi or DEFAULT_DPI
+
+    hashes = [chart_hash(job, dpi) for job in jobs]
+    stale = [(job, input_hash) for job, input_hash in zip(jobs, hashes)
+             if force or recorded_hash(job.output_file) != input_hash]
+
+    if len(stale) < len(jobs):
+        print(f"Skipping {len(jobs) - len(stale)} unchanged chart(s)")
+
+    workers = min(workers or DEFAULT_WORKERS, len(stale))
+    if workers <= 1:
+        for job, input_hash in stale:
+            render_chart(job, dpi, input_hash)
+    elif stale:
+        stale_jobs, stale_hashes = zip(*stale)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(render_chart, stale_jobs, [dpi] * len(stale), stale_hashes))
+
+    return [str(job.output_file) for job in jobs]
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Disparity ratios between police stops and CVAP demographics, with a result cache.
+disparity() compares the racial breakdown of a department set's stops with the CVAP
+of a county. Results are cached on disk, keyed on the county, department set, race
+mapping, CVAP file and stops dataset version, so reruns and repeat dashboards return
+without loading either dataset and only changed inputs are recomputed. The least
+recently used results are evicted once more than DISPARITY_CACHE_ENTRIES are stored.
+
+all_disparities() computes the ratios of every department against every county in one
+pass: the CVAP file is pivoted once into a (geography x race) matrix, the stops into a
+(department x race) count matrix, and shares and ratios are array operations on the two.
+
+Usage:
+    results = disparity()                                   # Hillsborough County defaults
+    results = disparity(departments='Tampa Police Department', use_store=True, start='2015-01-01')
+    results['comparison_df']
+
+    python3 cvap_disparity.py                               # every county x department
+    python3 cvap_disparity.py --estimate tot_est --out disparity.parquet
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import add_instrumentation_arguments, instrumented_run, stage
+from stops_data import CACHE_DIR, CACHE_FORMAT_VERSION, STOPS_CSV, load_stops, source_fingerprint
+from stops_schema import clean_department, normalize_categorical
+from stops_store import load_store, read_manifest
+
+CVAP_CSV = 'CVAP_2019-2023_ACS_csv_files/County.csv'
+
+COUNTY = 'Hillsborough County, Florida'
+
+# Departments whose stops fall within Hillsborough County
+HILLSBOROUGH_DEPARTMENTS = 'Tampa Police Department|Hillsborough County Sheriff'
+
+# Map police stop races to CVAP categories
+RACE_MAPPING = {
+    'white': 'White Alone',
+    'black': 'Black or African American Alone',
+    'hispanic': 'Hispanic or Latino',
+    'asian/pacific islander': 'Asian Alone',
+    'other': 'Other Races'
+}
+
+# Stops columns the computation reads
+COLUMNS = ['department_name', 'subject_race']
+
+# Tidy table written by main()
+DISPARITY_TABLE = 'disparity_by_county_department.csv'
+
+# CVAP estimates stops can be compared with
+ESTIMATES = ['cvap_est', 'tot_est', 'adu_est', 'cit_est']
+
+RESULTS_DIR = str(Path(CACHE_DIR) / 'disparity')
+
+# Cached results kept before the least recently used are evicted
+MAX_ENTRIES = int(os.environ.get('DISPARITY_CACHE_ENTRIES', 32))
+
+# Bump when compute_disparity() or the entry layout changes so cached results are recomputed
+DISPARITY_FORMAT_VERSION = 2
+
+
+def read_cvap(csv_file=CVAP_CSV):
+    """Read the CVAP county file (every geography and line)."""
+    try:
+        return pd.read_csv(csv_file, encoding='latin-1')
+    except UnicodeDecodeError:
+        return pd.read_csv(csv_file, encoding='utf-8', encoding_errors='ignore')
+
+
+def load_cvap(county=COUNTY, csv_file=CVAP_CSV):
+    """Load the CVAP rows of one county."""
+    print(f"Loading CVAP data for {county}...")
+    cvap_data = read_cvap(csv_file)
+    return cvap_data[cvap_data['geoname'] == county].copy()
+
+
+def cvap_matrix(cvap_data, estimate='cvap_est'):
+    """
+    Pivot CVAP rows into a geography x line matrix of one estimate.
+
+    Args:
+        cvap_data (pd.DataFrame): Rows of the CVAP county file
+        estimate (str): Estimate column ('cvap_est', 'tot_est', 'adu_est' or 'cit_est')
+
+    Returns:
+        pd.DataFrame: One row per geoname, one column per lntitle (including 'Total')
+    """
+    return cvap_data.pivot_table(index='geoname', columns='lntitle', values=estimate, aggfunc='sum', sort=False)
+
+
+def stops_matrix(departments, races):
+    """
+    Count stops per department and race.
+
+    Args:
+        departments (pd.Series): Department of each stop
+        races (pd.Series): subject_race of each stop
+
+    Returns:
+        pd.DataFrame: One row per department, one column per observed race; stops with a
+            missing race are counted in a NaN column so they stay in the department totals
+    """
+    return (pd.DataFrame({'department': departments, 'race': races})
+            .groupby(['department', 'race'], observed=True, dropna=False).size()
+            .unstack(fill_value=0))
+
+
+def disparity_table(stops_counts, cvap_counts, race_mapping=RACE_MAPPING):
+    """
+    Stop and CVAP shares and their ratio for every geography, department and race at once.
+
+    Shares are computed on the (department x race) and (geography x race) matrices and
+    the ratios by broadcasting one against the other, so no rows are filtered per pair.
+
+    Args:
+        stops_counts (pd.DataFrame): Department x race stop counts (see stops_matrix)
+        cvap_counts (pd.DataFrame): Geography x lntitle estimates with a 'Total' column (see cvap_matrix)
+        race_mapping (dict): Police stop race -> CVAP lntitle; races without a CVAP line are left out
+
+    Returns:
+        pd.DataFrame: Tidy table with one row per geography, department and race
+    """
+    police_races = [race for race, cvap_race in race_mapping.items() if cvap_race in cvap_counts.columns]
+    cvap_races = [race_mapping[race] for race in police_races]
+
+    # departments x races
+    stops = stops_counts.reindex(columns=police_races, fill_value=0).to_numpy(dtype='int64')
+    police_pct = stops / stops_counts.sum(axis=1).to_numpy()[:, None] * 100
+
+    # geographies x races
+    cvap = cvap_counts[cvap_races].to_numpy()
+    cvap_pct = cvap.astype('float64') / cvap_counts['Total'].to_numpy(dtype='float64')[:, None] * 100
+
+    # geographies x departments x races
+    shape = (len(cvap_counts), len(stops_counts), len(police_races))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(cvap_pct[:, None, :] > 0, police_pct[None, :, :] / cvap_pct[:, None, :], 0)
+
+    index = pd.MultiIndex.from_product(
+        [cvap_counts.index.astype(str), stops_counts.index.astype(str), [race.title() for race in police_races]],
+        names=['Geography', 'Department', 'Race'])
+    return pd.DataFrame({
+        'CVAP_Count': np.broadcast_to(cvap[:, None, :], shape).ravel(),
+        'CVAP_Percentage': np.broadcast_to(cvap_pct[:, None, :], shape).ravel(),
+        'Police_Stops': np.broadcast_to(stops[None, :, :], shape).ravel(),
+        'Police_Percentage': np.broadcast_to(police_pct[None, :, :], shape).ravel(),
+        'Disparity_Ratio': ratio.ravel(),
+    }, index=index).reset_index()
+
+
+def all_disparities(df, cvap_data, race_mapping=RACE_MAPPING, estimate='cvap_est'):
+    """
+    Disparity ratios of every department in the stops data against every county in the CVAP file.
+
+    Args:
+        df (pd.DataFrame): Stops with department_name and subject_race columns
+        cvap_data (pd.DataFrame): Rows of the CVAP county file (see read_cvap)
+        race_mapping (dict): Police stop race -> CVAP lntitle
+        estimate (str): CVAP estimate column to compare with
+
+    Returns:
+        pd.DataFrame: Tidy table (see disparity_table), departments by their clean names
+    """
+    departments = normalize_categorical(df['department_name'], clean_department)
+    return disparity_table(stops_matrix(departments, df['subject_race']), cvap_matrix(cvap_data, estimate),
+                           race_mapping)
+
+
+def compute_disparity(df, county_cvap, departments=HILLSBOROUGH_DEPARTMENTS, race_mapping=RACE_MAPPING):
+    """
+    Compare the stops of a department set with the CVAP of a county, race by race.
+
+    Args:
+        df (pd.DataFrame): Stops with department_name and subject_race columns
+        county_cvap (pd.DataFrame): CVAP rows of the county (see load_cvap)
+        departments (str): Regular expression matching the departments' names
+        race_mapping (dict): Police stop race -> CVAP lntitle
+
+    Returns:
+        dict: CVAP rows and total, stop counts by race, the comparison table and the
+            CVAP and police distributions charted by cvap_analysis.py
+    """
+    total_row = county_cvap[county_cvap['lntitle'] == 'Total'].iloc[0]
+
+    department_stops = df[df['department_name'].str.contains(departments, na=False)]
+    total_stops = len(department_stops)
+
+    # Racial breakdown of police stops
+    race_stops = department_stops['subject_race'].value_counts()
+    race_stops = race_stops[race_stops > 0]  # Categorical counts include unobserved races
+
+    # The department set as a single department against the single county
+    department_set = pd.Series(departments, index=department_stops.index)
+    comparison = disparity_table(stops_matrix(department_set, department_stops['subject_race']),
+                                 cvap_matrix(county_cvap), race_mapping)
+    comparison_df = (comparison[comparison['Police_Stops'] > 0]
+                     .drop(columns=['Geography', 'Department'])
+                     .reset_index(drop=True))
+
+    # CVAP Distribution
+    cvap_races = ['White Alone', 'Black or African American Alone', 'Hispanic or Latino', 'Asian Alone']
+    cvap_lines = county_cvap.set_index('lntitle')['cvap_est']
+    cvap_distribution = {race.replace(' Alone', '').replace(' or Latino', ''): cvap_lines[race]
+                         for race in cvap_races if race in cvap_lines.index}
+
+    # Police Stops Distribution
+    police_races = ['white', 'black', 'hispanic', 'other']
+    police_distribution = {race.title(): race_stops[race] for race in police_races if race in race_stops.index}
+
+    return {
+        'cvap': county_cvap,
+        'cvap_total': total_row['cvap_est'],
+        'total_stops': total_stops,
+        'race_stops': race_stops,
+        'comparison_df': comparison_df,
+        'cvap_distribution': pd.Series(cvap_distribution, dtype='float64'),
+        'police_distribution': pd.Series(police_distribution, dtype='float64'),
+    }
+
+
+def save_results(results, entry_dir, inputs):
+    """
+    Write one cached result: tables as Parquet, then entry.json, which marks the entry complete.
+
+    Args:
+        results (dict): Output of compute_disparity()
+        entry_dir (Path): Directory of the cache entry
+        inputs (dict): Inputs the entry was computed from (recorded for inspection)
+    """
+    entry_dir = Path(entry_dir)
+    tmp_dir = entry_dir.with_name(f"{entry_dir.name}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    scalars, series = {}, {}
+    for name, value in results.items():
+        if isinstance(value, pd.DataFrame):
+            value.to_parquet(tmp_dir / f"{name}.parquet")
+        elif isinstance(value, pd.Series):
+            series[name] = value.name
+            value.to_frame('value').to_parquet(tmp_dir / f"{name}.parquet")
+        else:
+            scalars[name] = value.item() if hasattr(value, 'item') else value
+
+    with open(tmp_dir / 'entry.json', 'w', encoding='utf-8') as f:
+        json.dump({'inputs': inputs, 'scalars': scalars, 'series': series,
+                   'created': datetime.now(timezone.utc).isoformat(timespec='seconds')}, f, indent=2)
+
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir)
+
+
+def read_results(entry_dir):
+    """Read a cached result written by save_results()."""
+    entry_dir = Path(entry_dir)
+    with open(entry_dir / 'entry.json', 'r', encoding='utf-8') as f:
+        entry = json.load(f)
+
+    results = dict(entry['scalars'])
+    for table in entry_dir.glob('*.parquet'):
+        frame = pd.read_parquet(table)
+        if table.stem in entry['series']:
+            results[table.stem] = frame['value'].rename(entry['series'][table.stem])
+        else:
+            results[table.stem] = frame
+    return results
+
+
+def evict(results_dir, max_entries):
+    """Remove the least recently used entries beyond max_entries (use is tracked by entry.json's mtime)."""
+    entries = sorted((entry_file.stat().st_mtime_ns, entry_file.parent)
+                     for entry_file in Path(results_dir).glob('*/entry.json'))
+    for _, entry_dir in entries[:max(len(entries) - max_entries, 0)]:
+        shutil.rmtree(entry_dir, ignore_errors=True)
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _fingerprints(results_dir, files):
+    """Content hashes of input files, reusing recorded hashes for files whose size and mtime are unchanged."""
+    sources_file = Path(results_dir) / 'sources.json'
+    recorded = _read_json(sources_file) or {}
+    fingerprints = {str(path): source_fingerprint(path, recorded.get(str(path))) for path in files}
+
+    if any(recorded.get(path) != fingerprint for path, fingerprint in fingerprints.items()):
+        Path(results_dir).mkdir(parents=True, exist_ok=True)
+        tmp_file = sources_file.with_name('sources.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({**recorded, **fingerprints}, f, indent=2)
+        os.replace(tmp_file, sources_file)
+    return fingerprints
+
+
+def disparity(county=COUNTY, departments=HILLSBOROUGH_DEPARTMENTS, race_mapping=RACE_MAPPING,
+              cvap_csv=CVAP_CSV, stops_csv=STOPS_CSV, use_store=False, start=None, end=None,
+              results_dir=RESULTS_DIR, max_entries=MAX_ENTRIES, refresh=False):
+    """
+    Disparity ratios of a department set's stops against a county's CVAP, cached on disk.
+
+    Args:
+        county (str): CVAP geoname, e.g. 'Hillsborough County, Florida'
+        departments (str): Regular expression matching the departments' names
+        race_mapping (dict): Police stop race -> CVAP lntitle
+        cvap_csv (str): CVAP county file (its content hash identifies the vintage)
+        stops_csv (str): Stops CSV (ignored with use_store)
+        use_store (bool): Read the stops from the incremental store (see stops_store.py)
+        start (str): First stop date read from the store
+        end (str): Last stop date read from the store
+        results_dir (str): Directory of the result cache
+        max_entries (int): Cached results kept before the least recently used are evicted
+        refresh (bool): Recompute even when a cached result exists
+
+    Returns:
+        dict: Output of compute_disparity()
+    """
+    results_dir = Path(results_dir)
+    fingerprints = _fingerprints(results_dir, [cvap_csv] if use_store else [cvap_csv, stops_csv])
+
+    # The stops CSV is identified by its hash and the cache format version (which covers the
+    # cleaning rules), the store by its generation and the date range read
+    if use_store:
+        manifest = read_manifest()
+        stops = {'store_generation': manifest['generation'] if manifest is not None else None,
+                 'start': start, 'end': end}
+    else:
+        stops = {'file': str(stops_csv), 'sha256': fingerprints[str(stops_csv)]['sha256'],
+                 'cache_format_version': CACHE_FORMAT_VERSION}
+
+    inputs = {
+        'county': county,
+        'departments': departments,
+        'race_mapping': list(race_mapping.items()),
+        'cvap': {'file': str(cvap_csv), 'sha256': fingerprints[str(cvap_csv)]['sha256']},
+        'stops': stops,
+        'format_version': DISPARITY_FORMAT_VERSION,
+    }
+    key = hashlib.sha256(json.dumps(inputs).encode('utf-8')).hexdigest()[:16]
+    entry_dir = results_dir / key
+
+    if not refresh and (entry_dir / 'entry.json').exists():
+        print(f"Reading cached disparity results from {entry_dir}...")
+        # Mark the entry as recently used
+        os.utime(entry_dir / 'entry.json')
+        return read_results(entry_dir)
+
+    with stage('load') as record:
+        county_cvap = load_cvap(county, cvap_csv)
+        if use_store:
+            df = load_store(COLUMNS, departments=departments, start=start, end=end)
+        else:
+            df = load_stops(COLUMNS, csv_file=stops_csv)
+        record['rows'] = len(df)
+
+    with stage('aggregate'):
+        results = compute_disparity(df, county_cvap, departments, race_mapping)
+
+    save_results(results, entry_dir, inputs)
+    evict(results_dir, max_entries)
+    return results
+
+
+def print_top_disparities(table, top=10, min_stops=100):
+    """Print the largest disparity ratios of the tidy table."""
+    print(f"\n⚠️  HIGHEST DISPARITY RATIOS (at least {min_stops:,} stops):")
+    print(f"   {'Department':<46} {'Geography':<32} {'Race':<24} {'CVAP %':>7} {'Stops %':>8} {'Ratio':>6}")
+    rows = table[table['Police_Stops'] >= min_stops].nlargest(top, 'Disparity_Ratio')
+    for row in rows.itertuples(index=False):
+        print(f"   {row.Department:<46} {row.Geography:<32} {row.Race:<24} "
+              f"{row.CVAP_Percentage:>7.1f} {row.Police_Percentage:>8.1f} {row.Disparity_Ratio:>6.2f}")
+
+
+def main():
+    """Main function to compute the disparity ratios of every county and department."""
+    parser = argparse.ArgumentParser(
+        description="Disparity ratios of every department in the stops data against every county's CVAP")
+    parser.add_argument('--csv', default=STOPS_CSV, help="Path to the stops CSV")
+    parser.add_argument('--cvap', default=CVAP_CSV, help=f"CVAP county file (default: {CVAP_CSV})")
+    parser.add_argument('--estimate', choices=ESTIMATES, default='cvap_est',
+                        help="CVAP estimate to compare with (default: cvap_est)")
+    parser.add_argument('--out', default=DISPARITY_TABLE,
+                        help=f"Output table, .csv or .parquet (default: {DISPARITY_TABLE})")
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumented_run('cvap_disparity', args.run_log, args.profile):
+        with stage('load') as record:
+            print(f"Loading CVAP data from {args.cvap}...")
+            cvap_data = read_cvap(args.cvap)
+            df = load_stops(COLUMNS, csv_file=args.csv)
+            record['rows'] = len(df)
+
+        with stage('aggregate') as record:
+            table = all_disparities(df, cvap_data, estimate=args.estimate)
+            record['rows'] = len(table)
+
+        with stage('write'):
+            if args.out.endswith('.parquet'):
+                table.to_parquet(args.out, index=False)
+            else:
+                table.to_csv(args.out, index=False)
+
+        print(f"\n{'='*60}")
+        print("DISPARITY RATIOS BY COUNTY AND DEPARTMENT")
+        print(f"{'='*60}")
+        print(f"   Counties: {table['Geography'].nunique():,}")
+        print(f"   Departments: {table['Department'].nunique():,}")
+        print(f"   Races: {table['Race'].nunique():,}")
+        print(f"   Rows written: {len(table):,}")
+        print_top_disparities(table)
+        print(f"\n📁 Table saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Stage timers for the analysis scripts.
+A script wraps its body in instrumented_run() and each step in stage('load'), stage('categorize'), ...;
+every stage records its wall time, the peak RSS reached and optionally the rows it
+produced. Stages nest ('load/categorize'). When a run log is given, the run is appended
+to it as one JSON line; with a profile directory, each top-level stage is run under
+cProfile and dumped to <dir>/<script>-<stage>.prof.
+
+Outside instrumented_run() the timers are no-ops, so library code can be instrumented freely.
+The RUN_LOG and PROFILE_DIR environment variables set the defaults of --run-log and --profile.
+"""
+
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFAULT_RUN_LOG = os.environ.get('RUN_LOG')
+DEFAULT_PROFILE_DIR = os.environ.get('PROFILE_DIR')
+
+# The active run (None outside instrumented_run()) and the names of the open stages
+_run = None
+_stack = []
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its finished children, in MB."""
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024  # ru_maxrss is bytes on macOS, KB elsewhere
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / scale
+
+
+def add_instrumentation_arguments(parser):
+    """Add the --run-log and --profile options to a script's argument parser."""
+    parser.add_argument('--run-log', default=DEFAULT_RUN_LOG,
+                        help="Append stage timings and peak memory of this run to a JSON-lines file")
+    parser.add_argument('--profile', metavar='DIR', default=DEFAULT_PROFILE_DIR,
+                        help="Write a cProfile dump of every top-level stage to DIR")
+
+
+@contextlib.contextmanager
+def instrumented_run(script, run_log=None, profile_dir=None, report=None):
+    """
+    Record the stages of one script run.
+
+    Args:
+        script (str): Script name, used in the log and the profile file names
+        run_log (str): JSON-lines file the run is appended to (None: not written)
+        profile_dir (str): Directory for per-stage cProfile dumps (None: no profiling)
+        report (bool): Print the stage timings at the end (default: when logging or profiling)
+
+    Yields:
+        dict: The run record; its 'stages' list fills in as stages complete
+    """
+    global _run
+    previous, _run = _run, {
+        'script': script,
+        'argv': sys.argv[1:],
+        'started': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'status': 'ok',
+        'stages': [],
+        '_profile_dir': profile_dir,
+    }
+    record = _run
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as error:
+        record['status'] = f"error: {type(error).__name__}"
+        raise
+    finally:
+        _run = previous
+        record.pop('_profile_dir')
+        record['seconds'] = round(time.perf_counter() - start, 4)
+        record['peak_rss_mb'] = round(peak_rss_mb(), 1)
+
+        if run_log:
+            Path(run_log).parent.mkdir(parents=True, exist_ok=True)
+            with open(run_log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        if report is None:
+            report = bool(run_log or profile_dir)
+        if report:
+            print_stages(record)
+
+
+@contextlib.contextmanager
+def stage(name):
+    """
+    Time one stage of the active run.
+
+    Yields a dict the caller can add fields to, e.g. record['rows'] = len(df).
+    Outside instrumented_run() nothing is timed or recorded.
+    """
+    if _run is None:
+        yield {}
+        return
+
+    record = {'stage': '/'.join(_stack + [name])}
+    profile_dir = _run['_profile_dir']
+    profiler = cProfile.Profile() if profile_dir and not _stack else None
+    stages = _run['stages']
+
+    # Appended on entry, so stages are listed in start order with parents before their children
+    stages.append(record)
+    _stack.append(name)
+    peak_before = peak_rss_mb()
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield record
+    finally:
+        if profiler:
+            profiler.disable()
+        _stack.pop()
+        record['seconds'] = round(time.perf_counter() - start, 4)
+        record['peak_rss_mb'] = round(peak_rss_mb(), 1)
+        record['peak_rss_growth_mb'] = round(record['peak_rss_mb'] - peak_before, 1)
+
+        if profiler:
+            Path(profile_dir).mkdir(parents=True, exist_ok=True)
+            # Repeated stages get numbered dumps instead of overwriting the first
+            repeat = sum(entry['stage'] == record['stage'] for entry in stages)
+            suffix = f"-{repeat}" if repeat > 1 else ""
+            profile_file = Path(profile_dir) / f"{_run['script']}-{name}{suffix}.prof"
+            profiler.dump_stats(profile_file)
+            record['profile'] = str(profile_file)
+
+
+def timed(name):
+    """Decorator form of stage(): time every call of the function as a stage."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def print_stages(record):
+    """Print the stage timings of a run record, nested stages indented under their parent."""
+    print(f"\n⏱️  STAGE TIMINGS ({record['script']}: {record['seconds']:.2f}s, "
+          f"peak RSS {record['peak_rss_mb']:,.0f} MB)")
+    for entry in record['stages']:
+        depth = entry['stage'].count('/')
+        label = '  ' * depth + entry['stage'].rsplit('/', 1)[-1]
+        rows = f"  {entry['rows']:,} rows" if 'rows' in entry else ""
+        print(f"   {label:<16} {entry['seconds']:>8.2f}s   peak {entry['peak_rss_mb']:>7,.0f} MB{rows}")
+        if 'profile' in entry:
+            print(f"   {'':<16} profile: {entry['profile']}")
@@ -1,54 +1,78 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
-from datetime import datetime
+import argparse
+import glob
 import warnings
+
+from charts import ChartJob, plot_race_distribution, render_charts
+from instrumentation import add_instrumentation_arguments, instrumented_run, stage
+from stops_data import load_stops
+from stops_schema import derive_columns
+
 warnings.filterwarnings('ignore')
 
-# Set style for better looking plots
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+# Style for better looking plots
+PLOT_STYLE = 'seaborn-v0_8'
+PLOT_PALETTE = 'husl'
 
-# Load the data
-print("Loading data...")
-df = pd.read_csv('fl_tampa_2020_04_01.csv')
+# Columns used by this analysis
+COLUMNS = ['date', 'subject_race', 'department_name']
 
-print(f"Dataset shape: {df.shape}")
-print(f"Columns: {list(df.columns)}")
+# Derived columns built by stops_schema.derive_columns
+DERIVED = ['department_name_clean']
 
-# Clean and prepare data
-print("\nCleaning data...")
 
-# Convert date column
-df['date'] = pd.to_datetime(df['date'], errors='coerce')
+def compute(df):
+    """Compute the aggregates behind the main police stops visualizations."""
+    race_counts = df['subject_race'].value_counts()
+    race_counts = race_counts[race_counts > 1000]  # Filter out small categories
 
-# Clean department names (remove pipe-separated values)
-df['department_name_clean'] = df['department_name'].str.split('|').str[0]
+    return {'race_counts': race_counts}
 
-# Create output directory
-import os
-os.makedirs('visualizations', exist_ok=True)
 
-# 1. Race Distribution Pie Chart
-print("\nCreating race distribution visualization...")
-race_counts = df['subject_race'].value_counts()
-race_counts = race_counts[race_counts > 1000]  # Filter out small categories
+def report(results):
+    """Print the main police stops analysis."""
+    # 1. Race Distribution Pie Chart
+    print("\nCreating race distribution visualization...")
 
-fig, ax = plt.subplots(figsize=(12, 8))
-colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD']
-wedges, texts, autotexts = ax.pie(race_counts.values, labels=race_counts.index, autopct='%1.1f%%', 
-                                  colors=colors, startangle=90)
-ax.set_title('Police Stops by Subject Race', fontsize=16, fontweight='bold', pad=20)
-plt.tight_layout()
-plt.savefig('visualizations/1_race_distribution.png', dpi=300, bbox_inches='tight')
-plt.close()
 
-print("\nAll visualizations have been created in the 'visualizations' folder!")
-print("\nGenerated files:")
-import glob
-for file in sorted(glob.glob('visualizations/*')):
-    print(f"  - {file}") 
\ No newline at end of file
+def chart_jobs(results):
+    """Charts drawn from the main police stops aggregates."""
+    return [
+        ChartJob(plot_race_distribution, {'race_counts': results['race_counts']},
+                 'visualizations/1_race_distribution.png', PLOT_STYLE, PLOT_PALETTE),
+    ]
+
+
+def main():
+    """Main function to run the police stops analysis."""
+    parser = argparse.ArgumentParser(description="Main Tampa police stops analysis")
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumented_run('police_stops_analysis', args.run_log, args.profile):
+        # Load the data
+        print("Loading data...")
+        with stage('load') as record:
+            df = load_stops(COLUMNS)
+            record['rows'] = len(df)
+
+        print(f"Dataset shape: {df.shape}")
+        print(f"Columns: {list(df.columns)}")
+
+        # Clean and prepare data
+        print("\nCleaning data...")
+        derive_columns(df, DERIVED)
+
+        with stage('aggregate'):
+            results = compute(df)
+        with stage('render'):
+            report(results)
+            render_charts(chart_jobs(results))
+
+        print("\nAll visualizations have been created in the 'visualizations' folder!")
+        print("\nGenerated files:")
+        for file in sorted(glob.glob('visualizations/*')):
+            print(f"  - {file}")
+
+
+if __name__ == "__main__":
+    main()
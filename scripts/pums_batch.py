@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Batch PUMS header update across states and years.
+Discovers every psam_h*.csv / psam_p*.csv under a root directory, pairs each file
+with the data dictionary of its release, parses every dictionary once and rewrites
+the headers across a process pool.
+
+Expected layout (one directory per release, holding its dictionary):
+    <root>/PUMS-2018-data/PUMS_Data_Dictionary_2018.txt
+    <root>/PUMS-2018-data/csv_hfl/psam_h12.csv
+    <root>/PUMS-2014-2018-data/PUMS_Data_Dictionary_2014-2018.txt
+    <root>/PUMS-2014-2018-data/csv_pca/psam_p06.csv
+
+Usage:
+    python3 pums_batch.py                     # everything under the current directory
+    python3 pums_batch.py /data/pums --in-place --workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from update_pums_headers_improved import describe_column, parse_data_dictionary, rewrite_csv_header
+
+# Raw PUMS file patterns (housing and person records)
+PUMS_PATTERNS = ['psam_h*.csv', 'psam_p*.csv']
+
+# Data dictionary pattern, searched from each CSV's directory upwards
+DICTIONARY_PATTERN = 'PUMS_Data_Dictionary_*.txt'
+
+# Suffix of the copies written when not rewriting in place
+OUTPUT_SUFFIX = '_updated_headers'
+
+
+def find_dictionary(csv_file, root):
+    """
+    Find the data dictionary for a PUMS file: the nearest one in its directory or
+    any parent directory up to root.
+
+    Args:
+        csv_file (Path): PUMS CSV file
+        root (Path): Root directory of the search
+
+    Returns:
+        Path: Dictionary file, or None if there is none
+    """
+    root = root.resolve()
+    for directory in csv_file.resolve().parents:
+        dictionaries = sorted(directory.glob(DICTIONARY_PATTERN))
+        if dictionaries:
+            return dictionaries[0]
+        if directory == root:
+            break
+    return None
+
+
+def discover_pums_files(root):
+    """
+    Discover raw PUMS CSV files under root and pair each with its dictionary.
+
+    Args:
+        root (str): Root directory to search
+
+    Returns:
+        tuple: (dict mapping dictionary path to a sorted list of CSV files,
+                list of CSV files without a dictionary)
+    """
+    root = Path(root)
+    by_dictionary, orphans = {}, []
+
+    csv_files = set()
+    for pattern in PUMS_PATTERNS:
+        csv_files.update(path for path in root.rglob(pattern) if not path.stem.endswith(OUTPUT_SUFFIX))
+
+    for csv_file in sorted(csv_files):
+        dict_file = find_dictionary(csv_file, root)
+        if dict_file is None:
+            orphans.append(csv_file)
+        else:
+            by_dictionary.setdefault(dict_file, []).append(csv_file)
+
+    return by_dictionary, orphans
+
+
+def output_path(csv_file, in_place=False):
+    """Output path for a PUMS file: itself in place, otherwise a *_updated_headers.csv copy."""
+    if in_place:
+        return csv_file
+    return csv_file.with_name(f"{csv_file.stem}{OUTPUT_SUFFIX}{csv_file.suffix}")
+
+
+def update_file(csv_file, var_descriptions, output_file):
+    """
+    Rewrite the header of one PUMS file (runs in a worker process).
+
+    Args:
+        csv_file (str): Path to the CSV file
+        var_descriptions (dict): Mapping of variable names to descriptions
+        output_file (str): Output file path
+
+    Returns:
+        dict: File statistics (bytes, columns found in the dictionary, total columns)
+    """
+    size = os.path.getsize(csv_file)
+    result = rewrite_csv_header(
+        csv_file, lambda header: [describe_column(col, var_descriptions) for col in header], output_file)
+
+    if result is None:
+        return {'csv_file': csv_file, 'output_file': output_file, 'bytes': size, 'found': 0, 'columns': 0}
+
+    header, _ = result
+    return {
+        'csv_file': csv_file,
+        'output_file': output_file,
+        'bytes': size,
+        'found': len([col for col in header if col in var_descriptions]),
+        'columns': len(header),
+    }
+
+
+def run_batch(root, in_place=False, workers=None):
+    """
+    Update the headers of every PUMS file under root.
+
+    Args:
+        root (str): Root directory to search
+        in_place (bool): Rewrite the original files instead of writing copies
+        workers (int): Worker processes (default: CPU count)
+
+    Returns:
+        list: Per-file statistics from update_file() of the files that were updated
+    """
+    print(f"Discovering PUMS files under {root}...")
+    by_dictionary, orphans = discover_pums_files(root)
+
+    for csv_file in orphans:
+        print(f"Warning: no data dictionary found for {csv_file}, skipping")
+
+    total_files = sum(len(files) for files in by_dictionary.values())
+    if total_files == 0:
+        print("No PUMS files found")
+        return []
+
+    # Parse each release's dictionary once
+    print(f"Parsing {len(by_dictionary)} data dictionar{'y' if len(by_dictionary) == 1 else 'ies'}...")
+    descriptions = {}
+    for dict_file, files in by_dictionary.items():
+        descriptions[dict_file] = parse_data_dictionary(dict_file)
+        print(f"  {dict_file}: {len(descriptions[dict_file])} variables, {len(files)} file(s)")
+
+    print(f"\nUpdating {total_files} file(s)...")
+    start = time.perf_counter()
+    stats, failed = [], []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(update_file, str(csv_file), descriptions[dict_file],
+                            str(output_path(csv_file, in_place))): csv_file
+            for dict_file, files in by_dictionary.items()
+            for csv_file in files
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as exc:
+                print(f"  Error updating {futures[future]}: {exc}")
+                failed.append(futures[future])
+                continue
+            if result['columns'] == 0:
+                print(f"  Error: {result['csv_file']} is empty")
+                failed.append(futures[future])
+            else:
+                stats.append(result)
+                print(f"  {result['output_file']}: {result['found']} of {result['columns']} columns in dictionary")
+    elapsed = time.perf_counter() - start
+
+    print_throughput(stats, elapsed, len(failed))
+    return stats
+
+
+def print_throughput(stats, elapsed, failed=0):
+    """Print the batch throughput summary (stats of the updated files only)."""
+    total_bytes = sum(result['bytes'] for result in stats)
+    megabytes = total_bytes / (1024 * 1024)
+    elapsed = max(elapsed, 1e-9)
+
+    print(f"\n{'='*50}")
+    print("BATCH SUMMARY")
+    print(f"{'='*50}")
+    print(f"Files updated: {len(stats)}")
+    if failed:
+        print(f"Files failed: {failed}")
+    print(f"Data processed: {megabytes:,.1f} MB")
+    print(f"Elapsed: {elapsed:.2f} s")
+    print(f"Throughput: {len(stats) / elapsed:,.1f} files/s, {megabytes / elapsed:,.1f} MB/s")
+
+
+def main():
+    """Main function to update PUMS headers for every state and year under a directory."""
+    parser = argparse.ArgumentParser(description="Update headers of all PUMS files under a directory")
+    parser.add_argument('root', nargs='?', default='.', help="Root directory to search (default: current)")
+    parser.add_argument('--in-place', action='store_true',
+                        help="Rewrite the original CSV files instead of writing *_updated_headers.csv copies")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if not Path(args.root).is_dir():
+        print(f"Error: directory not found: {args.root}")
+        sys.exit(1)
+
+    run_batch(args.root, args.in_place, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Typed, column-pruned PUMS loader.
+Analyses name the PUMS variables they need (e.g. 'AGEP', 'VEH'); only the matching
+columns are read, with compact dtypes chosen from the data dictionary.
+The housing file is persisted once as a table sorted by an integer SERIALNO key, so
+person records pick up household attributes through a positional lookup.
+"""
+
+import csv
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from pums_dictionary import BLANK_CODE, CACHE_DIR
+from stops_data import source_fingerprint
+
+# Integer household key column of the persisted housing table
+HOUSEHOLD_KEY = 'household_key'
+
+# Bump when the persisted housing table layout changes
+HOUSEHOLD_FORMAT_VERSION = 1
+
+
+def header_columns(csv_file):
+    """Read just the header row of a CSV."""
+    with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def variable_columns(header, variables):
+    """
+    Map PUMS variable names to their columns in a raw or renamed header.
+
+    Renamed headers look like "AGEP_Age", so a variable matches a column that is
+    either the variable itself or the variable followed by "_<description>".
+
+    Args:
+        header (list): CSV column names
+        variables (list): PUMS variable names
+
+    Returns:
+        dict: Variable name -> column name, in the order of variables
+
+    Raises:
+        KeyError: If a variable is not in the header
+    """
+    by_variable = {}
+    for col in header:
+        by_variable.setdefault(col.split('_', 1)[0], col)
+
+    missing = [var for var in variables if var not in by_variable]
+    if missing:
+        raise KeyError(f"PUMS variable(s) not found in header: {', '.join(missing)}")
+
+    return {var: by_variable[var] for var in variables}
+
+
+def _is_integer(code):
+    try:
+        int(code)
+    except ValueError:
+        return False
+    return True
+
+
+def variable_dtype(entry):
+    """
+    Choose a compact pandas dtype for a PUMS variable from its dictionary entry.
+
+    Variables whose codes are all integers get the smallest integer type that fits
+    their declared length, or float32 when the dictionary has a blank (missing)
+    code. Other variables are read as strings.
+
+    Args:
+        entry (dict): Dictionary entry from pums_dictionary.load_dictionary()
+
+    Returns:
+        str: pandas dtype
+    """
+    codes = [code for code, _ in entry['values']]
+    codes += [bound for low, high, _ in entry['ranges'] for bound in (low, high)]
+    has_blank = any(BLANK_CODE.match(code) for code in codes)
+    codes = [code for code in codes if not BLANK_CODE.match(code)]
+
+    if entry['type'] != 'Numeric' and not (codes and all(_is_integer(code) for code in codes)):
+        return 'str' if entry['length'] > 1 or not codes else 'category'
+
+    length = entry['length']
+    if has_blank:
+        # float32 holds every integer of up to 7 digits exactly
+        return 'float32' if length <= 7 else 'float64'
+    if length <= 2:
+        return 'int8'
+    if length <= 4:
+        return 'int16'
+    if length <= 9:
+        return 'int32'
+    return 'int64'
+
+
+def load_pums(csv_file, variables, dictionary):
+    """
+    Load selected PUMS variables with compact dtypes.
+
+    Args:
+        csv_file (str): PUMS person or housing CSV (raw or with updated headers)
+        variables (list): PUMS variable names to read, e.g. ['SERIALNO', 'AGEP']
+            (None reads every column)
+        dictionary (dict): Parsed dictionary from pums_dictionary.load_dictionary()
+
+    Returns:
+        pd.DataFrame: The requested columns, under their names in the CSV header
+    """
+    header = header_columns(csv_file)
+    if variables is None:
+        variables = list(dict.fromkeys(col.split('_', 1)[0] for col in header))
+    columns = variable_columns(header, variables)
+
+    dtypes = {col: variable_dtype(dictionary[var]) for var, col in columns.items() if var in dictionary}
+
+    return pd.read_csv(csv_file, usecols=list(columns.values()), dtype=dtypes)[list(columns.values())]
+
+
+def encode_serialno(serials):
+    """
+    Encode PUMS serial numbers as int64 keys.
+
+    "2018HU0000001" becomes 201810000001 and "2018GQ0000001" 201800000001;
+    all-digit serial numbers from older releases are used as they are.
+
+    Args:
+        serials (pd.Series): SERIALNO strings
+
+    Returns:
+        np.ndarray: int64 keys, in the order of serials
+
+    Raises:
+        ValueError: If a serial number does not follow either format
+    """
+    digits = serials.astype(str).str.replace('HU', '1', regex=False).str.replace('GQ', '0', regex=False)
+    return digits.astype('int64').to_numpy()
+
+
+def _household_paths(csv_file, cache_dir):
+    stem = Path(csv_file).stem
+    return Path(cache_dir) / f"{stem}.households.json", Path(cache_dir) / stem
+
+
+def build_household_table(csv_file, dictionary, cache_file):
+    """
+    Convert a PUMS housing CSV into a typed Parquet table sorted by household key.
+
+    Args:
+        csv_file (str): PUMS housing CSV (raw or with updated headers)
+        dictionary (dict): Parsed dictionary from pums_dictionary.load_dictionary()
+        cache_file (str): Path of the Parquet file to write
+    """
+    housing = load_pums(csv_file, None, dictionary)
+    serial_column = variable_columns(housing.columns, ['SERIALNO'])['SERIALNO']
+
+    housing.insert(0, HOUSEHOLD_KEY, encode_serialno(housing[serial_column]))
+    housing = housing.drop(columns=serial_column).sort_values(HOUSEHOLD_KEY, kind='stable')
+
+    tmp_file = Path(f"{cache_file}.tmp")
+    housing.to_parquet(tmp_file, index=False)
+    os.replace(tmp_file, cache_file)
+
+
+def load_households(csv_file, variables, dictionary, cache_dir=CACHE_DIR, refresh=False):
+    """
+    Load household attributes from the persisted, key-sorted housing table.
+
+    The table is built from the CSV on first use and rebuilt when the CSV changes.
+
+    Args:
+        csv_file (str): PUMS housing CSV (raw or with updated headers)
+        variables (list): PUMS housing variable names to read, e.g. ['VEH']
+        dictionary (dict): Parsed dictionary from pums_dictionary.load_dictionary()
+        cache_dir (str): Directory holding the persisted table
+        refresh (bool): Rebuild the table even when it is current
+
+    Returns:
+        pd.DataFrame: HOUSEHOLD_KEY (sorted int64) plus the requested columns
+    """
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    manifest_file, cache_stem = _household_paths(csv_file, cache_dir)
+
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    if manifest is not None and manifest.get('format_version') != HOUSEHOLD_FORMAT_VERSION:
+        manifest = None
+
+    fingerprint = source_fingerprint(csv_file, manifest)
+    cache_file = Path(f"{cache_stem}-{fingerprint['sha256'][:16]}.parquet")
+
+    if refresh or manifest is None or manifest.get('sha256') != fingerprint['sha256'] or not cache_file.exists():
+        print(f"Building household table from {csv_file} (one-time)...")
+        build_household_table(csv_file, dictionary, cache_file)
+        for stale in cache_file.parent.glob(f"{cache_stem.name}-*.parquet"):
+            if stale != cache_file:
+                stale.unlink()
+
+    new_manifest = {'source': str(csv_file), 'format_version': HOUSEHOLD_FORMAT_VERSION, **fingerprint}
+    if new_manifest != manifest:
+        tmp_file = Path(f"{manifest_file}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(new_manifest, f, indent=2)
+        os.replace(tmp_file, manifest_file)
+
+    columns = variable_columns(pq.read_schema(cache_file).names, variables)
+    return pd.read_parquet(cache_file, columns=[HOUSEHOLD_KEY] + list(columns.values()))
+
+
+def attach_households(persons, households, serial_column):
+    """
+    Add household attributes to person records by positional lookup on the household key.
+
+    Equivalent to a left merge on SERIALNO: the person keys are located in the sorted
+    household keys with searchsorted and each column is gathered with take. Persons
+    without a matching household get missing values.
+
+    Args:
+        persons (pd.DataFrame): Person records
+        households (pd.DataFrame): Output of load_households()
+        serial_column (str): SERIALNO column of persons
+
+    Returns:
+        pd.DataFrame: persons with every household column (except the key) added
+    """
+    keys = households[HOUSEHOLD_KEY].to_numpy()
+    person_keys = encode_serialno(persons[serial_column])
+
+    positions = np.searchsorted(keys, person_keys)
+    found = positions < len(keys)
+    found[found] = keys[positions[found]] == person_keys[found]
+    indexer = np.where(found, positions, -1)
+
+    attached = persons.copy()
+    for col in households.columns.drop(HOUSEHOLD_KEY):
+        # -1 positions are filled with the column's missing value
+        attached[col] = pd.Series(households[col].array.take(indexer, allow_fill=True), index=persons.index)
+    return attached
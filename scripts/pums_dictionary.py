@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Compiled PUMS data dictionary.
+The dictionary text is parsed once into variable names, types, lengths, descriptions
+and value-label tables, then cached as JSON so later runs load it in milliseconds.
+Analyses build their labels and categoricals from it instead of hardcoding code lists.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+CACHE_DIR = '.pums_cache'
+
+# Bump when the parsed layout changes so stale caches are rebuilt
+CACHE_FORMAT_VERSION = 1
+
+# Variable definition: "AGEP        Numeric 2"
+VARIABLE_PATTERN = re.compile(r'^([A-Z][A-Z0-9]+)\s+(\w+)\s+(\d+)$')
+
+# Value label: "01 .Not Spanish/Hispanic/Latino" or "1..9999 .Integerized Housing Weight"
+VALUE_PATTERN = re.compile(r'^(\S+?)(?:\.\.(\S+))?\s+\.(.*)$')
+
+# Blank codes ("b", "bbbbbbb") mark values that are empty in the CSV
+BLANK_CODE = re.compile(r'^b+$')
+
+
+def parse_dictionary_text(lines):
+    """
+    Parse PUMS data dictionary lines into variable entries.
+
+    Args:
+        lines (iterable): Lines of the dictionary text
+
+    Returns:
+        dict: Variable name -> {'type', 'length', 'description', 'values', 'ranges'} where
+        'values' is a list of [code, label] and 'ranges' a list of [low, high, label]
+    """
+    variables = {}
+    current = None
+
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line:
+            current = None
+            continue
+
+        match = VARIABLE_PATTERN.match(line)
+        if match:
+            var_name, data_type, length = match.groups()
+            current = {'type': data_type, 'length': int(length), 'description': None,
+                       'values': [], 'ranges': []}
+            variables[var_name] = current
+            continue
+
+        if current is None:
+            continue
+
+        if current['description'] is None:
+            if line.startswith('.'):
+                current = None
+            else:
+                current['description'] = line
+            continue
+
+        match = VALUE_PATTERN.match(line)
+        if match:
+            low, high, label = match.groups()
+            if high is None:
+                current['values'].append([low, label.strip()])
+            else:
+                current['ranges'].append([low, high, label.strip()])
+
+    # Variables without a description are not usable as headers
+    return {name: entry for name, entry in variables.items() if entry['description'] is not None}
+
+
+def _cache_path(dict_file, cache_dir):
+    return Path(cache_dir) / f"{Path(dict_file).stem}.json"
+
+
+def _digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_dictionary(dict_file, cache_dir=CACHE_DIR, refresh=False):
+    """
+    Load a PUMS data dictionary, parsing the text only when its cache is missing or stale.
+
+    The cache is keyed on the dictionary's size and modification time, falling back
+    to its SHA-256 when only the timestamp changed.
+
+    Args:
+        dict_file (str): Path to the data dictionary text file
+        cache_dir (str): Directory holding the parsed dictionaries
+        refresh (bool): Re-parse the dictionary even if a valid cache exists
+
+    Returns:
+        dict: Variable name -> entry, as returned by parse_dictionary_text()
+    """
+    stat = os.stat(dict_file)
+    cache_file = _cache_path(dict_file, cache_dir)
+
+    cached = None
+    if not refresh:
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = None
+
+    if cached and cached.get('version') == CACHE_FORMAT_VERSION and cached.get('size') == stat.st_size:
+        if cached.get('mtime_ns') == stat.st_mtime_ns:
+            return cached['variables']
+        if cached.get('sha256') == _digest(dict_file):
+            return cached['variables']
+
+    with open(dict_file, 'r', encoding='utf-8') as f:
+        variables = parse_dictionary_text(f)
+
+    payload = {
+        'version': CACHE_FORMAT_VERSION,
+        'source': str(dict_file),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': _digest(dict_file),
+        'variables': variables,
+    }
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = Path(f"{cache_file}.{os.getpid()}.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(tmp_file, cache_file)
+
+    return variables
+
+
+def descriptions(dictionary):
+    """Mapping of variable names to their descriptions."""
+    return {name: entry['description'] for name, entry in dictionary.items()}
+
+
+def _parse_code(code):
+    """Convert a dictionary code to the value pandas reads from the CSV ("01" -> 1)."""
+    try:
+        return int(code)
+    except ValueError:
+        return code
+
+
+def value_labels(dictionary, variable):
+    """
+    Value labels of a variable, keyed the way pandas reads the codes from the CSV.
+
+    Blank codes ("b") are left out: they are empty (NaN) in the data.
+
+    Args:
+        dictionary (dict): Parsed dictionary from load_dictionary()
+        variable (str): Variable name, e.g. 'VEH'
+
+    Returns:
+        dict: Code -> label, in dictionary order
+    """
+    return {
+        _parse_code(code): label
+        for code, label in dictionary[variable]['values']
+        if not BLANK_CODE.match(code)
+    }
+
+
+def to_categorical(values, dictionary, variable):
+    """
+    Label a column of codes as a categorical whose categories follow the dictionary order.
+
+    Codes without a label (blanks, ranges) become NaN.
+
+    Args:
+        values (pd.Series): Raw codes as read from the CSV
+        dictionary (dict): Parsed dictionary from load_dictionary()
+        variable (str): Variable name, e.g. 'VEH'
+
+    Returns:
+        pd.Series: Categorical series of labels
+    """
+    import pandas as pd
+
+    labels = value_labels(dictionary, variable)
+    return pd.Series(
+        pd.Categorical(values.map(labels), categories=list(dict.fromkeys(labels.values()))),
+        index=values.index,
+        name=values.name,
+    )
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Weighted PUMS estimates with replicate-weight standard errors.
+Every estimate is computed for the full weight and its 80 replicate weights in one
+matrix product; the standard error uses the ACS successive difference replication
+formula SE = sqrt(4/80 * sum((X_r - X)^2)).
+"""
+
+import numpy as np
+import pandas as pd
+
+from pums_data import variable_columns
+
+# Number of replicate weights in the ACS PUMS files
+REPLICATES = 80
+
+# Successive difference replication variance factor
+SDR_FACTOR = 4 / REPLICATES
+
+# Full and replicate weight variables
+PERSON_WEIGHT = 'PWGTP'
+HOUSING_WEIGHT = 'WGTP'
+
+
+def weight_variables(weight=PERSON_WEIGHT, replicates=REPLICATES):
+    """PUMS variable names of a weight and its replicates, e.g. ['PWGTP', 'PWGTP1', ..., 'PWGTP80']."""
+    return [weight] + [f"{weight}{i}" for i in range(1, replicates + 1)]
+
+
+def weight_matrix(df, weight=PERSON_WEIGHT, replicates=REPLICATES):
+    """
+    Gather the full weight and its replicates into one matrix.
+
+    Args:
+        df (pd.DataFrame): PUMS records with the weight columns (raw or renamed headers)
+        weight (str): Weight variable, 'PWGTP' for persons or 'WGTP' for households
+        replicates (int): Number of replicate weights
+
+    Returns:
+        np.ndarray: float64 array of shape (rows, 1 + replicates); column 0 is the full weight
+    """
+    columns = variable_columns(df.columns, weight_variables(weight, replicates))
+    return df[list(columns.values())].to_numpy(dtype='float64')
+
+
+def sdr_standard_error(replicate_estimates):
+    """
+    Successive difference replication standard error.
+
+    Args:
+        replicate_estimates (np.ndarray): Estimates along the last axis, full-weight
+            estimate first, then one per replicate weight
+
+    Returns:
+        np.ndarray: Standard errors (one per leading index)
+    """
+    replicate_estimates = np.asarray(replicate_estimates, dtype='float64')
+    deviations = replicate_estimates[..., 1:] - replicate_estimates[..., :1]
+    return np.sqrt(SDR_FACTOR * (deviations ** 2).sum(axis=-1))
+
+
+def total_replicates(mask, weights):
+    """Weighted total of the records in mask, for the full weight and every replicate."""
+    return np.asarray(mask, dtype='float64') @ weights
+
+
+def share_replicates(mask, weights):
+    """Weighted share of the records in mask, for the full weight and every replicate."""
+    return total_replicates(mask, weights) / weights.sum(axis=0)
+
+
+def estimate(replicate_estimates):
+    """
+    Split replicate estimates into the estimate and its standard error.
+
+    Args:
+        replicate_estimates (np.ndarray): Full-weight estimate first, then the replicates
+
+    Returns:
+        tuple: (estimate, standard error)
+    """
+    return float(replicate_estimates[0]), float(sdr_standard_error(replicate_estimates))
+
+
+def estimate_shares(values, weights):
+    """
+    Weighted totals and shares of every observed category, with standard errors.
+
+    All categories are estimated in a single (categories x rows) @ (rows x weights)
+    product.
+
+    Args:
+        values (pd.Series): Category of each record (missing values are not counted)
+        weights (np.ndarray): Output of weight_matrix() for the same records
+
+    Returns:
+        pd.DataFrame: Indexed by category (in category order when values is categorical,
+        otherwise by descending share) with columns 'total', 'total_se', 'share', 'share_se'
+    """
+    codes, categories = pd.factorize(values, sort=isinstance(values.dtype, pd.CategoricalDtype))
+    observed = np.unique(codes[codes >= 0])
+
+    indicators = (codes[None, :] == observed[:, None]).astype('float64')
+    totals = indicators @ weights
+    shares = totals / weights[codes >= 0].sum(axis=0)
+
+    result = pd.DataFrame({
+        'total': totals[:, 0],
+        'total_se': sdr_standard_error(totals),
+        'share': shares[:, 0],
+        'share_se': sdr_standard_error(shares),
+    }, index=pd.Index(categories.take(observed), name=values.name))
+
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        result = result.sort_values('share', ascending=False, kind='stable')
+    return result
+
+
+def weighted_crosstab(index, columns, weights, normalize='index'):
+    """
+    Weighted crosstab of two categorical variables (full weight only).
+
+    Args:
+        index (pd.Series): Row variable
+        columns (pd.Series): Column variable
+        weights (np.ndarray): Output of weight_matrix() for the same records
+        normalize (str): Passed to pd.crosstab
+
+    Returns:
+        pd.DataFrame: Weighted shares
+    """
+    return pd.crosstab(index, columns, values=weights[:, 0], aggfunc='sum', normalize=normalize)
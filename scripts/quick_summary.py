@@ -1,78 +1,211 @@
+import argparse
+
 import pandas as pd
 import numpy as np
 
-# Load the data
-print("Loading Tampa Police Stops Data...")
-df = pd.read_csv('fl_tampa_2020_04_01.csv')
-
-print(f"\n{'='*50}")
-print("TAMPA POLICE STOPS DATA SUMMARY")
-print(f"{'='*50}")
-
-# Basic statistics
-print(f"\n📊 DATASET OVERVIEW:")
-print(f"   Total Records: {len(df):,}")
-print(f"   Unique Subjects: {df['raw_row_number'].nunique():,}")
-
-# Department analysis
-print(f"\n🏛️  TOP DEPARTMENTS:")
-dept_counts = df['department_name'].str.split('|').str[0].value_counts().head(5)
-for dept, count in dept_counts.items():
-    print(f"   {dept}: {count:,} stops")
-
-# Demographic analysis
-print(f"\n👥 DEMOGRAPHIC BREAKDOWN:")
-print(f"   Race Distribution:")
-race_counts = df['subject_race'].value_counts()
-for race, count in race_counts.head(5).items():
-    percentage = (count / len(df)) * 100
-    print(f"     {race}: {count:,} ({percentage:.1f}%)")
-
-print(f"\n   Gender Distribution:")
-gender_counts = df['subject_sex'].value_counts()
-for gender, count in gender_counts.items():
-    if gender != 'NA':
-        percentage = (count / len(df)) * 100
-        print(f"     {gender}: {count:,} ({percentage:.1f}%)")
-
-# Violation analysis
-print(f"\n🚨 TOP VIOLATION TYPES:")
-# Extract violation codes
-df['violation_code'] = df['violation'].str.extract(r'(\d+)')[0]
-violation_counts = df['violation_code'].value_counts().head(5)
-for code, count in violation_counts.items():
-    print(f"   Code {code}: {count:,} stops")
-
-# Outcome analysis
-print(f"\n📋 OUTCOME BREAKDOWN:")
-outcome_counts = df['outcome'].value_counts()
-for outcome, count in outcome_counts.items():
-    percentage = (count / len(df)) * 100
-    print(f"   {outcome}: {count:,} ({percentage:.1f}%)")
-
-# Temporal analysis
-print(f"\n📅 TEMPORAL PATTERNS:")
-df['date'] = pd.to_datetime(df['date'], errors='coerce')
-df_with_dates = df[df['date'].notna()]
-if len(df_with_dates) > 0:
-    yearly_counts = df_with_dates.groupby(df_with_dates['date'].dt.year).size()
-    print(f"   Peak Year: {yearly_counts.idxmax()} ({yearly_counts.max():,} stops)")
-    print(f"   Recent Year: {yearly_counts.index[-1]} ({yearly_counts.iloc[-1]:,} stops)")
-else:
-    print("   No valid dates found in dataset")
-
-# Vehicle registration
-print(f"\n🚗 VEHICLE REGISTRATION:")
-vehicle_counts = df['vehicle_registration_state'].value_counts().head(5)
-for state, count in vehicle_counts.items():
-    percentage = (count / len(df)) * 100
-    print(f"   {state}: {count:,} ({percentage:.1f}%)")
-
-print(f"\n{'='*50}")
-print("Key Insights:")
-print("• Traffic violations dominate the dataset")
-print("• Tampa Police Department handles most stops")
-print("• Males are stopped more frequently than females")
-print("• Citations are the most common outcome")
-print("• Florida vehicles account for the majority of stops")
-print(f"{'='*50}") 
\ No newline at end of file
+from instrumentation import add_instrumentation_arguments, instrumented_run, stage
+from stops_cube import load_cube
+from stops_data import STOPS_CSV, load_stops
+from stops_schema import derive_columns
+from stops_store import load_store_cube
+from stops_stream import DEFAULT_CHUNKSIZE, HyperLogLog, iter_stops_csv, merge_counts
+
+# Columns used by this summary
+COLUMNS = ['raw_row_number', 'date', 'subject_race', 'subject_sex', 'department_name',
+           'violation', 'outcome', 'vehicle_registration_state']
+
+# Derived columns built by stops_schema.derive_columns
+DERIVED = ['department_name_clean', 'year']
+
+# Counters that are merged across chunks in streaming mode
+COUNT_KEYS = ['dept_counts', 'race_counts', 'gender_counts', 'violation_counts',
+              'outcome_counts', 'yearly_counts', 'vehicle_counts']
+
+
+def compute_summary(df):
+    """Compute the counters behind the summary report for a DataFrame (or one chunk of it)."""
+    derive_columns(df, DERIVED)
+
+    return {
+        'total': len(df),
+        'unique_subjects': df['raw_row_number'].nunique(),
+        'dept_counts': df['department_name_clean'].value_counts(),
+        'race_counts': df['subject_race'].value_counts(),
+        'gender_counts': df['subject_sex'].value_counts(),
+        'violation_counts': df['violation'].str.extract(r'(\d+)')[0].value_counts(),
+        'outcome_counts': df['outcome'].value_counts(),
+        'yearly_counts': df['year'].value_counts().sort_index(),
+        'vehicle_counts': df['vehicle_registration_state'].value_counts(),
+    }
+
+
+def compute_summary_from_cube(cube):
+    """Compute the summary counters from the precomputed stops cube."""
+    # Violation codes come from the per-description counts, in order of first appearance
+    violations = cube.violations.dropna(subset=['violation'])
+    codes = violations['violation'].str.extract(r'(\d+)')[0]
+    violation_counts = violations['count'].groupby(codes.to_numpy(), sort=False).sum()
+
+    return {
+        'total': cube.total(),
+        'unique_subjects': cube.unique_subjects,
+        'dept_counts': cube.counts('department_name_clean'),
+        'race_counts': cube.counts('subject_race'),
+        'gender_counts': cube.counts('subject_sex'),
+        'violation_counts': violation_counts.sort_values(ascending=False),
+        'outcome_counts': cube.counts('outcome'),
+        'yearly_counts': cube.counts('year', sort=False),
+        'vehicle_counts': cube.counts('vehicle_registration_state'),
+    }
+
+
+def compute_summary_streaming(csv_file=STOPS_CSV, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Compute the summary counters by streaming the CSV in fixed-size chunks.
+
+    Memory is bounded by the chunk size and the number of distinct values per
+    counter. Unique subjects are estimated with a HyperLogLog sketch.
+    """
+    summary = {'total': 0, **{key: None for key in COUNT_KEYS}}
+    subjects = HyperLogLog()
+
+    for chunk in iter_stops_csv(csv_file, COLUMNS, chunksize):
+        partial = compute_summary(chunk)
+        summary['total'] += partial['total']
+        subjects.update(chunk['raw_row_number'])
+        for key in COUNT_KEYS:
+            summary[key] = merge_counts(summary[key], partial[key])
+
+    for key in COUNT_KEYS:
+        if summary[key] is None:
+            summary[key] = pd.Series(dtype='int64')
+        elif key == 'yearly_counts':
+            summary[key] = summary[key].sort_index()
+        else:
+            summary[key] = summary[key].sort_values(ascending=False, kind='stable')
+
+    summary['unique_subjects'] = subjects.count()
+    summary['approximate_subjects'] = True
+    return summary
+
+
+def print_summary(summary):
+    """Print the summary report from precomputed counters."""
+    total = summary['total']
+
+    print(f"\n{'='*50}")
+    print("TAMPA POLICE STOPS DATA SUMMARY")
+    print(f"{'='*50}")
+
+    # Basic statistics
+    print(f"\n📊 DATASET OVERVIEW:")
+    print(f"   Total Records: {total:,}")
+    approx = '~' if summary.get('approximate_subjects') else ''
+    print(f"   Unique Subjects: {approx}{summary['unique_subjects']:,}")
+
+    # Department analysis
+    print(f"\n🏛️  TOP DEPARTMENTS:")
+    for dept, count in summary['dept_counts'].head(5).items():
+        print(f"   {dept}: {count:,} stops")
+
+    # Demographic analysis
+    print(f"\n👥 DEMOGRAPHIC BREAKDOWN:")
+    print(f"   Race Distribution:")
+    for race, count in summary['race_counts'].head(5).items():
+        percentage = (count / total) * 100
+        print(f"     {race}: {count:,} ({percentage:.1f}%)")
+
+    print(f"\n   Gender Distribution:")
+    for gender, count in summary['gender_counts'].items():
+        if gender != 'NA':
+            percentage = (count / total) * 100
+            print(f"     {gender}: {count:,} ({percentage:.1f}%)")
+
+    # Violation analysis
+    print(f"\n🚨 TOP VIOLATION TYPES:")
+    for code, count in summary['violation_counts'].head(5).items():
+        print(f"   Code {code}: {count:,} stops")
+
+    # Outcome analysis
+    print(f"\n📋 OUTCOME BREAKDOWN:")
+    for outcome, count in summary['outcome_counts'].items():
+        percentage = (count / total) * 100
+        print(f"   {outcome}: {count:,} ({percentage:.1f}%)")
+
+    # Temporal analysis
+    print(f"\n📅 TEMPORAL PATTERNS:")
+    yearly_counts = summary['yearly_counts']
+    if len(yearly_counts) > 0:
+        print(f"   Peak Year: {yearly_counts.idxmax()} ({yearly_counts.max():,} stops)")
+        print(f"   Recent Year: {yearly_counts.index[-1]} ({yearly_counts.iloc[-1]:,} stops)")
+    else:
+        print("   No valid dates found in dataset")
+
+    # Vehicle registration
+    print(f"\n🚗 VEHICLE REGISTRATION:")
+    for state, count in summary['vehicle_counts'].head(5).items():
+        percentage = (count / total) * 100
+        print(f"   {state}: {count:,} ({percentage:.1f}%)")
+
+    print(f"\n{'='*50}")
+    print("Key Insights:")
+    print("• Traffic violations dominate the dataset")
+    print("• Tampa Police Department handles most stops")
+    print("• Males are stopped more frequently than females")
+    print("• Citations are the most common outcome")
+    print("• Florida vehicles account for the majority of stops")
+    print(f"{'='*50}")
+
+
+def chart_jobs(summary):
+    """The summary is text-only; it draws no charts."""
+    return []
+
+
+# Entry points used by stops_reports
+compute = compute_summary
+report = print_summary
+
+
+def main():
+    """Main function to print the Tampa police stops summary."""
+    parser = argparse.ArgumentParser(description="Quick summary of the Tampa police stops data")
+    parser.add_argument('--stream', action='store_true',
+                        help="Read the CSV in chunks with bounded memory instead of loading it whole")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"Rows per chunk in streaming mode (default: {DEFAULT_CHUNKSIZE:,})")
+    parser.add_argument('--csv', default=STOPS_CSV, help="Path to the stops CSV")
+    parser.add_argument('--no-cube', action='store_true',
+                        help="Recount from the full stops data instead of the precomputed cube")
+    parser.add_argument('--store', action='store_true',
+                        help="Summarize every release ingested into the stops store (see stops_store.py)")
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumented_run('quick_summary', args.run_log, args.profile):
+        # Load the data
+        print("Loading Tampa Police Stops Data...")
+        if args.stream:
+            # Chunks are read and counted together
+            with stage('aggregate') as record:
+                summary = compute_summary_streaming(args.csv, args.chunksize)
+                record['rows'] = summary['total']
+        elif args.no_cube:
+            with stage('load') as record:
+                df = load_stops(COLUMNS, csv_file=args.csv)
+                record['rows'] = len(df)
+            with stage('aggregate'):
+                summary = compute_summary(df)
+        else:
+            with stage('load') as record:
+                cube = load_store_cube() if args.store else load_cube(args.csv)
+                record['rows'] = cube.total()
+            with stage('aggregate'):
+                summary = compute_summary_from_cube(cube)
+
+        with stage('render'):
+            print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
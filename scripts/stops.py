@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the analysis scripts.
+Only the standard library is imported until a subcommand is chosen; the subcommand's
+script (and with it pandas, matplotlib, ...) is imported on dispatch, and its own
+options are parsed by that script.
+
+Usage:
+    python3 stops.py summary --stream
+    python3 stops.py violations --run-log runs.jsonl
+    python3 stops.py cvap --store --start 2015-01-01
+    python3 stops.py disparity --out disparity.parquet
+    python3 stops.py pums-headers --in-place
+    python3 stops.py latino
+    python3 stops.py summary --help
+"""
+
+import argparse
+import importlib
+import sys
+
+# Subcommand -> (script module, description)
+COMMANDS = {
+    'summary': ('quick_summary', "Quick summary of the police stops data (text only)"),
+    'violations': ('violation_analysis', "Violation categories and their charts"),
+    'cvap': ('cvap_analysis', "Hillsborough County stops compared with CVAP demographics"),
+    'disparity': ('cvap_disparity', "Disparity ratios of every department against every county's CVAP"),
+    'pums-headers': ('update_pums_headers_improved', "Rename PUMS CSV headers from the data dictionary"),
+    'latino': ('latino_car_ownership_simple', "Latino car ownership from the ACS PUMS"),
+}
+
+
+def main(argv=None):
+    """Dispatch to the script behind a subcommand."""
+    commands = '\n'.join(f"  {name:<14}{description}" for name, (_, description) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog='stops', description="Tampa police stops and PUMS analyses",
+        epilog=f"commands:\n{commands}\n\nRun 'stops <command> --help' for the options of a command.",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=COMMANDS, metavar='command', help="Analysis to run (see below)")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    module_name, _ = COMMANDS[args.command]
+    # The script parses its own options from sys.argv
+    sys.argv = [f"stops {args.command}"] + args.args
+    importlib.import_module(module_name).main()
+
+
+if __name__ == "__main__":
+    main()
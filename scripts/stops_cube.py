@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Precomputed count cube for the police stops data.
+Stops are counted once per combination of the categorical dimensions (race, sex,
+outcome, department, year, violation category, registration state). Reports then
+marginalize and filter the cube instead of recounting the full dataset.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from instrumentation import stage
+from stops_data import CACHE_DIR, STOPS_CSV, load_stops, source_fingerprint
+from stops_schema import derive_columns
+from violation_categories import ruleset_version
+
+# Dimensions of the cube
+DIMENSIONS = ['subject_race', 'subject_sex', 'outcome', 'department_name_clean', 'year',
+              'violation_category', 'vehicle_registration_state']
+
+# Source columns and derived columns needed to build the cube
+COLUMNS = ['raw_row_number', 'date', 'subject_race', 'subject_sex', 'outcome', 'department_name',
+           'violation', 'vehicle_registration_state']
+DERIVED = ['department_name_clean', 'year', 'violation_category', 'violation_code_main']
+
+# Bump when the cube layout changes so old cubes are rebuilt
+CUBE_FORMAT_VERSION = 2
+
+CUBE_DIR = str(Path(CACHE_DIR) / 'cube')
+
+
+class StopsCube:
+    """
+    Stop counts over the cube dimensions, plus per-description violation counts.
+
+    Filters are keyword arguments naming a dimension and a value or list of values,
+    e.g. cube.counts('subject_race', year=2018, outcome=['citation', 'warning']).
+    """
+
+    def __init__(self, cells, violations, unique_subjects):
+        """
+        Args:
+            cells (pd.DataFrame): One row per observed combination of DIMENSIONS with a 'count' column
+            violations (pd.DataFrame): One row per violation description (in order of first
+                appearance) with 'violation', 'violation_category', 'violation_code_main' and 'count'
+            unique_subjects (int): Distinct raw_row_number values
+        """
+        self.cells = cells
+        self.violations = violations
+        self.unique_subjects = unique_subjects
+
+    def filter(self, **where):
+        """Cube cells matching every filter."""
+        cells = self.cells
+        for dimension, values in where.items():
+            if dimension not in DIMENSIONS:
+                raise KeyError(f"Unknown cube dimension: {dimension}")
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            cells = cells[cells[dimension].isin(values)]
+        return cells
+
+    def total(self, **where):
+        """Number of stops matching the filters."""
+        return int(self.filter(**where)['count'].sum())
+
+    def counts(self, by, sort=True, **where):
+        """
+        Stop counts marginalized onto one or more dimensions.
+
+        Args:
+            by (str or list): Dimension(s) to keep
+            sort (bool): Sort by descending count (like value_counts); otherwise by key
+            **where: Dimension filters
+
+        Returns:
+            pd.Series: Counts indexed by the kept dimension(s); missing keys are dropped
+        """
+        counts = self.filter(**where).groupby(by, observed=True)['count'].sum()
+        counts = counts[counts > 0]
+        if sort:
+            counts = counts.sort_values(ascending=False)
+        return counts.rename('count')
+
+    def crosstab(self, index, columns, **where):
+        """
+        Two-way table of stop counts, like pd.crosstab on the underlying rows.
+
+        Args:
+            index (str): Row dimension
+            columns (str): Column dimension
+            **where: Dimension filters
+
+        Returns:
+            pd.DataFrame: Counts with zeros for unobserved combinations
+        """
+        counts = self.counts([index, columns], sort=False, **where)
+        table = counts.unstack(columns, fill_value=0)
+        table.columns.name = columns
+        return table
+
+
+def build_cube(df):
+    """
+    Count stops over the cube dimensions.
+
+    Args:
+        df (pd.DataFrame): Stops data with COLUMNS and DERIVED columns
+
+    Returns:
+        StopsCube: The materialized cube
+    """
+    cells = df.groupby(DIMENSIONS, observed=True, dropna=False).size().rename('count').reset_index()
+    for dimension in DIMENSIONS:
+        if cells[dimension].dtype == object or pd.api.types.is_string_dtype(cells[dimension]):
+            cells[dimension] = cells[dimension].astype('category')
+
+    # Descriptions in order of first appearance, so per-code "first" descriptions match the rows
+    violations = (df.groupby('violation', sort=False, observed=True)
+                  .agg(violation_category=('violation_category', 'first'),
+                       violation_code_main=('violation_code_main', 'first'),
+                       count=('violation', 'size'))
+                  .reset_index())
+
+    return StopsCube(cells, violations, int(df['raw_row_number'].nunique()))
+
+
+def merge_cubes(cube, delta, unique_subjects):
+    """
+    Add the counts of a cube built from new rows into an existing cube.
+
+    Args:
+        cube (StopsCube): Existing cube (None if there is none yet)
+        delta (StopsCube): Cube of the new rows only
+        unique_subjects (int): Distinct subjects across both
+
+    Returns:
+        StopsCube: The combined cube
+    """
+    if cube is None:
+        return StopsCube(delta.cells, delta.violations, unique_subjects)
+
+    cells = (pd.concat([cube.cells, delta.cells], ignore_index=True)
+             .groupby(DIMENSIONS, observed=True, dropna=False)['count'].sum().reset_index())
+    for dimension in DIMENSIONS:
+        if cells[dimension].dtype == object or pd.api.types.is_string_dtype(cells[dimension]):
+            cells[dimension] = cells[dimension].astype('category')
+
+    # Existing descriptions keep their position; new ones are appended in order of appearance
+    violations = (pd.concat([cube.violations, delta.violations], ignore_index=True)
+                  .groupby('violation', sort=False)
+                  .agg(violation_category=('violation_category', 'first'),
+                       violation_code_main=('violation_code_main', 'first'),
+                       count=('count', 'sum'))
+                  .reset_index())
+
+    return StopsCube(cells, violations, unique_subjects)
+
+
+def _cube_key(fingerprint):
+    return f"{fingerprint['sha256'][:16]}-{ruleset_version()}-v{CUBE_FORMAT_VERSION}"
+
+
+def save_cube(cube, cube_dir, manifest):
+    """Write the cube tables, then the manifest that marks them valid."""
+    cube_dir = Path(cube_dir)
+    cube_dir.mkdir(parents=True, exist_ok=True)
+
+    for name, table in [('cells', cube.cells), ('violations', cube.violations)]:
+        tmp_file = cube_dir / f"{name}.parquet.tmp"
+        table.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, cube_dir / f"{name}.parquet")
+
+    tmp_file = cube_dir / 'cube.json.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({**manifest, 'unique_subjects': cube.unique_subjects}, f, indent=2)
+    os.replace(tmp_file, cube_dir / 'cube.json')
+
+
+def read_cube(cube_dir, manifest):
+    """Read a saved cube whose manifest has already been loaded."""
+    print(f"Reading stops cube from {cube_dir}...")
+    cube_dir = Path(cube_dir)
+    return StopsCube(pd.read_parquet(cube_dir / 'cells.parquet'),
+                     pd.read_parquet(cube_dir / 'violations.parquet'),
+                     manifest['unique_subjects'])
+
+
+def load_cube(csv_file=STOPS_CSV, cube_dir=CUBE_DIR, refresh=False):
+    """
+    Load the stops cube, building it from the stops data when missing or stale.
+
+    The cube is keyed on the source CSV's content hash and the violation ruleset,
+    so it is rebuilt when either changes.
+
+    Args:
+        csv_file (str): Path to the stops CSV
+        cube_dir (str): Directory holding the cube tables
+        refresh (bool): Rebuild the cube even when it is current
+
+    Returns:
+        StopsCube: The stops cube
+    """
+    cube_dir = Path(cube_dir)
+    try:
+        with open(cube_dir / 'cube.json', 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+
+    fingerprint = source_fingerprint(csv_file, manifest)
+    new_manifest = {'source': str(csv_file), 'key': _cube_key(fingerprint), **fingerprint}
+
+    if not refresh and manifest is not None and manifest.get('key') == new_manifest['key']:
+        return read_cube(cube_dir, manifest)
+
+    print("Building stops cube (one-time)...")
+    df = load_stops(COLUMNS, csv_file=csv_file)
+    derive_columns(df, DERIVED)
+    with stage('aggregate'):
+        cube = build_cube(df)
+    save_cube(cube, cube_dir, new_manifest)
+    print(f"Stops cube: {len(cube.cells):,} cells over {len(df):,} stops")
+    return cube
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Shared loader for the Tampa police stops dataset.
+The raw CSV is parsed once into a typed Parquet cache; later loads read the cache directly.
+With STOPS_CACHE_FORMAT=mmap the typed data is served from a memory-mapped store instead
+(see stops_mmap.py).
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from instrumentation import stage
+from stops_schema import apply_schema, csv_dtypes
+
+STOPS_CSV = 'fl_tampa_2020_04_01.csv'
+CACHE_DIR = '.stops_cache'
+
+# Bump when the cached table layout changes so old caches are rebuilt
+CACHE_FORMAT_VERSION = 4
+
+# Cache load_stops() reads from: 'parquet' or 'mmap'
+CACHE_FORMAT = os.environ.get('STOPS_CACHE_FORMAT', 'parquet')
+
+
+def file_digest(path, block_size=1 << 20):
+    """
+    Compute the SHA-256 digest of a file.
+
+    Args:
+        path (str): Path to the file
+        block_size (int): Number of bytes read per iteration
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _manifest_path(csv_file, cache_dir):
+    return Path(cache_dir) / f"{Path(csv_file).stem}.json"
+
+
+def _read_manifest(manifest_file):
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json_atomic(path, payload):
+    tmp_path = Path(f"{path}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def source_fingerprint(csv_file, manifest=None):
+    """
+    Identify a source CSV by size, modification time and content hash.
+
+    The content hash is only recomputed when size or mtime differ from the
+    manifest, so an unchanged multi-GB file is never re-read just to be identified.
+
+    Args:
+        csv_file (str): Path to the source CSV
+        manifest (dict): Previously recorded manifest, if any
+
+    Returns:
+        dict: Fingerprint with 'size', 'mtime_ns' and 'sha256' keys
+    """
+    stat = os.stat(csv_file)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    if (manifest is not None
+            and manifest.get('size') == stat.st_size
+            and manifest.get('mtime_ns') == stat.st_mtime_ns):
+        fingerprint['sha256'] = manifest['sha256']
+    else:
+        fingerprint['sha256'] = file_digest(csv_file)
+
+    return fingerprint
+
+
+def read_stops_csv(csv_file=STOPS_CSV, columns=None):
+    """
+    Read the stops CSV directly with the declared schema, bypassing the cache.
+
+    Args:
+        csv_file (str): Path to the stops CSV
+        columns (list): Columns to read (None reads every column)
+
+    Returns:
+        pd.DataFrame: Stops data with schema dtypes applied
+    """
+    if columns is None:
+        columns = list(pd.read_csv(csv_file, nrows=0).columns)
+
+    df = pd.read_csv(csv_file, usecols=columns, dtype=csv_dtypes(columns), low_memory=False)
+    return apply_schema(df)
+
+
+def convert_csv(csv_file, cache_file):
+    """
+    Parse the stops CSV into a typed DataFrame and write it as Parquet.
+
+    Args:
+        csv_file (str): Path to the source CSV
+        cache_file (str): Path of the Parquet file to write
+
+    Returns:
+        pd.DataFrame: The typed DataFrame that was written
+    """
+    df = read_stops_csv(csv_file)
+
+    tmp_file = Path(f"{cache_file}.tmp")
+    df.to_parquet(tmp_file, index=False)
+    os.replace(tmp_file, cache_file)
+
+    return df
+
+
+def load_stops(columns=None, csv_file=STOPS_CSV, cache_dir=CACHE_DIR, refresh=False, cache_format=CACHE_FORMAT):
+    """
+    Load the police stops dataset, converting the CSV to a columnar cache on first use.
+
+    The cache is keyed by the source file's SHA-256 hash and mtime; a changed
+    source file (or refresh=True) triggers a one-time reconversion. Only the
+    requested columns are read from the cache.
+
+    Args:
+        columns (list): Columns the analysis needs (None loads every column)
+        csv_file (str): Path to the stops CSV
+        cache_dir (str): Directory holding the Parquet cache and its manifest
+        refresh (bool): Force reconversion even when the cache is current
+        cache_format (str): 'parquet', or 'mmap' for the memory-mapped store
+
+    Returns:
+        pd.DataFrame: Stops data with categorical and datetime columns
+    """
+    if cache_format == 'mmap':
+        # Imported here: stops_mmap builds its store from the Parquet cache of this module
+        from stops_mmap import load_stops_mmap
+        return load_stops_mmap(columns, csv_file, cache_dir, refresh)
+    if cache_format != 'parquet':
+        raise ValueError(f"Unknown stops cache format: {cache_format!r} (expected 'parquet' or 'mmap')")
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest_file = _manifest_path(csv_file, cache_dir)
+    manifest = _read_manifest(manifest_file)
+    if manifest is not None and manifest.get('format_version') != CACHE_FORMAT_VERSION:
+        manifest = None
+
+    fingerprint = source_fingerprint(csv_file, manifest)
+    cache_file = cache_dir / f"{Path(csv_file).stem}-{fingerprint['sha256'][:16]}.parquet"
+
+    cache_hit = (not refresh
+                 and manifest is not None
+                 and manifest.get('sha256') == fingerprint['sha256']
+                 and cache_file.exists())
+
+    if cache_hit:
+        print(f"Reading cached stops data from {cache_file}...")
+        df = pd.read_parquet(cache_file, columns=columns)
+    else:
+        print(f"Converting {csv_file} to columnar cache (one-time)...")
+        with stage('read_csv') as record:
+            df = convert_csv(csv_file, cache_file)
+            record['rows'] = len(df)
+        if columns is not None:
+            df = df[columns]
+
+        # Drop caches left behind by earlier versions of the source file
+        for stale in cache_dir.glob(f"{Path(csv_file).stem}-*.parquet"):
+            if stale != cache_file:
+                stale.unlink()
+
+    new_manifest = {
+        'source': str(csv_file),
+        'format_version': CACHE_FORMAT_VERSION,
+        'cache_file': cache_file.name,
+        **fingerprint,
+    }
+    if new_manifest != manifest:
+        _write_json_atomic(manifest_file, new_manifest)
+
+    return df
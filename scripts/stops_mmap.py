@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped binary store for the cleaned stops data.
+Every column is written once as raw fixed-width arrays: integer codes for categoricals,
+int64 timestamps, values + mask for nullable columns, and an offsets + bytes layout for
+free-text strings. Loading maps the files with numpy.memmap and wraps them as pandas
+columns without copying, so opening the dataset costs almost nothing and processes on
+the same machine share the page cache.
+
+Selected with STOPS_CACHE_FORMAT=mmap (see stops_data.load_stops) or used directly:
+    df = load_stops_mmap(['subject_race', 'date'])
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from stops_data import CACHE_DIR, CACHE_FORMAT_VERSION, STOPS_CSV, load_stops, source_fingerprint
+
+# Bump when the on-disk layout changes so old stores are rebuilt
+MMAP_FORMAT_VERSION = 1
+
+MMAP_SUBDIR = 'mmap'
+
+# pandas' nullable dtypes, stored as values + mask
+NULLABLE_DTYPES = (pd.BooleanDtype, pd.Int8Dtype, pd.Int16Dtype, pd.Int32Dtype, pd.Int64Dtype,
+                   pd.UInt8Dtype, pd.UInt16Dtype, pd.UInt32Dtype, pd.UInt64Dtype,
+                   pd.Float32Dtype, pd.Float64Dtype)
+
+# Strings shorter than this in total use int32 offsets (pyarrow 'string'), longer ones int64 ('large_string')
+MAX_STRING_BYTES = 2 ** 31 - 1
+
+
+def _write_array(path, array):
+    np.ascontiguousarray(array).tofile(path)
+
+
+def _map(path, dtype, count):
+    """
+    Map count items of a column file as a plain ndarray view of the mapping.
+    Copy-on-write, so accidental writes never reach the file.
+    """
+    if count == 0:
+        # Empty files cannot be mapped
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='c', shape=(count,)).view(np.ndarray)
+
+
+def _string_array(array):
+    """Wrap an Arrow string array as the NaN-semantics string column pandas reads from Parquet."""
+    try:
+        return pd.arrays.ArrowStringArray(array, dtype=pd.StringDtype('pyarrow', na_value=np.nan))
+    except TypeError:
+        # pandas < 2.3
+        from pandas.core.arrays.string_arrow import ArrowStringArrayNumpySemantics
+        return ArrowStringArrayNumpySemantics(array)
+
+
+def write_column(values, directory, name):
+    """
+    Write one column in its binary layout.
+
+    Args:
+        values (pd.Series): Column as loaded by load_stops
+        directory (Path): Store directory
+        name (str): Column name (used in the file names)
+
+    Returns:
+        dict: Column entry for the manifest ('kind', 'dtype' and layout details)
+    """
+    dtype = values.dtype
+    base = directory / name
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = values.array.codes
+        _write_array(f"{base}.codes", codes)
+        return {'kind': 'category', 'dtype': str(codes.dtype), 'categories': dtype.categories.tolist(),
+                'ordered': bool(dtype.ordered)}
+
+    if pd.api.types.is_datetime64_dtype(dtype):
+        _write_array(f"{base}.values", values.to_numpy().view('int64'))
+        return {'kind': 'datetime', 'dtype': str(dtype)}
+
+    if pd.api.types.is_extension_array_dtype(dtype) and isinstance(dtype, NULLABLE_DTYPES):
+        # Nullable boolean/integer/float: raw values (0 where missing) plus a missing-value mask
+        numpy_dtype = dtype.numpy_dtype
+        _write_array(f"{base}.values", values.to_numpy(dtype=numpy_dtype, na_value=numpy_dtype.type(0)))
+        _write_array(f"{base}.mask", values.isna().to_numpy())
+        return {'kind': 'masked', 'dtype': str(dtype), 'values_dtype': str(numpy_dtype)}
+
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+        _write_array(f"{base}.values", values.to_numpy())
+        return {'kind': 'numeric', 'dtype': str(dtype)}
+
+    # Free text: Arrow's offsets, bytes and validity bitmap buffers are written as they are
+    array = pa.array(values.to_numpy(dtype=object, na_value=None), type=pa.large_string())
+    if np.frombuffer(array.buffers()[1], dtype=np.int64, count=len(array) + 1)[-1] <= MAX_STRING_BYTES:
+        array = array.cast(pa.string())
+    validity, offsets, data = array.buffers()
+
+    offsets_dtype = 'int32' if array.type == pa.string() else 'int64'
+    offsets = np.frombuffer(offsets, dtype=offsets_dtype, count=len(array) + 1)
+    _write_array(f"{base}.offsets", offsets)
+    _write_array(f"{base}.bytes", np.frombuffer(data, dtype=np.uint8, count=int(offsets[-1])))
+    if validity is not None:
+        _write_array(f"{base}.valid", np.frombuffer(validity, dtype=np.uint8, count=(len(array) + 7) // 8))
+    return {'kind': 'string', 'offsets_dtype': offsets_dtype, 'bytes': int(offsets[-1]),
+            'has_nulls': validity is not None}
+
+
+def open_column(directory, name, entry, rows):
+    """
+    Wrap a column's mapped files as a pandas array without copying.
+
+    Args:
+        directory (Path): Store directory
+        name (str): Column name
+        entry (dict): Column entry from the manifest
+        rows (int): Number of rows
+
+    Returns:
+        pandas array backed by the mapped files
+    """
+    base = directory / name
+    kind = entry['kind']
+
+    if kind == 'category':
+        codes = _map(f"{base}.codes", entry['dtype'], rows)
+        categories = pd.Index(entry['categories'])
+        return pd.Categorical.from_codes(codes, categories=categories, ordered=entry['ordered'], validate=False)
+
+    if kind == 'datetime':
+        return _map(f"{base}.values", 'int64', rows).view(entry['dtype'])
+
+    if kind == 'masked':
+        values = _map(f"{base}.values", entry['values_dtype'], rows)
+        mask = _map(f"{base}.mask", 'bool', rows)
+        return pd.api.types.pandas_dtype(entry['dtype']).construct_array_type()(values, mask)
+
+    if kind == 'numeric':
+        return _map(f"{base}.values", entry['dtype'], rows)
+
+    offsets = _map(f"{base}.offsets", entry['offsets_dtype'], rows + 1)
+    data = _map(f"{base}.bytes", 'uint8', entry['bytes'])
+    validity = pa.py_buffer(_map(f"{base}.valid", 'uint8', (rows + 7) // 8)) if entry['has_nulls'] else None
+    array_type = pa.StringArray if entry['offsets_dtype'] == 'int32' else pa.LargeStringArray
+    array = array_type.from_buffers(rows, pa.py_buffer(offsets), pa.py_buffer(data), validity)
+    return _string_array(array)
+
+
+def write_mmap_store(df, store_dir, manifest):
+    """
+    Write a DataFrame as a memory-mappable store, replacing any previous one atomically.
+
+    Args:
+        df (pd.DataFrame): Cleaned stops data (as returned by load_stops)
+        store_dir (Path): Directory of the store
+        manifest (dict): Source details recorded in the store manifest
+    """
+    store_dir = Path(store_dir)
+    tmp_dir = store_dir.with_name(f"{store_dir.name}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    columns = {col: write_column(df[col], tmp_dir, col) for col in df.columns}
+    with open(tmp_dir / 'columns.json', 'w', encoding='utf-8') as f:
+        json.dump({**manifest, 'rows': len(df), 'columns': columns}, f, indent=2)
+
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+
+
+def open_mmap_store(store_dir, columns=None):
+    """
+    Open a memory-mapped store as a DataFrame whose columns share memory with the files.
+
+    Args:
+        store_dir (Path): Directory of the store
+        columns (list): Columns to open (None opens every column)
+
+    Returns:
+        pd.DataFrame: The requested columns
+    """
+    store_dir = Path(store_dir)
+    with open(store_dir / 'columns.json', 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if columns is None:
+        columns = list(manifest['columns'])
+    missing = [col for col in columns if col not in manifest['columns']]
+    if missing:
+        raise KeyError(f"Column(s) not in the stops store: {', '.join(missing)}")
+
+    rows = manifest['rows']
+    arrays = {col: open_column(store_dir, col, manifest['columns'][col], rows) for col in columns}
+    return pd.DataFrame(arrays, index=pd.RangeIndex(rows), copy=False)
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_stops_mmap(columns=None, csv_file=STOPS_CSV, cache_dir=CACHE_DIR, refresh=False):
+    """
+    Load the police stops dataset from the memory-mapped store, building it on first use.
+
+    The store is built from the typed data of load_stops() and keyed on the source
+    CSV's hash, so a new data release is picked up automatically.
+
+    Args:
+        columns (list): Columns the analysis needs (None loads every column)
+        csv_file (str): Path to the stops CSV
+        cache_dir (str): Directory holding the stops caches
+        refresh (bool): Rebuild the store even when it is current
+
+    Returns:
+        pd.DataFrame: Stops data backed by memory-mapped files
+    """
+    mmap_dir = Path(cache_dir) / MMAP_SUBDIR
+    stem = Path(csv_file).stem
+    manifest = _read_json(mmap_dir / f"{stem}.json")
+
+    fingerprint = source_fingerprint(csv_file, manifest)
+    key = f"{fingerprint['sha256'][:16]}-v{CACHE_FORMAT_VERSION}.{MMAP_FORMAT_VERSION}"
+    store_dir = mmap_dir / f"{stem}-{key}"
+
+    if refresh or manifest is None or manifest.get('key') != key or not (store_dir / 'columns.json').exists():
+        df = load_stops(None, csv_file=csv_file, cache_dir=cache_dir, refresh=refresh, cache_format='parquet')
+        print(f"Writing memory-mapped stops store to {store_dir} (one-time)...")
+        write_mmap_store(df, store_dir, {'source': str(csv_file), 'key': key})
+        del df
+
+        # Drop stores left behind by earlier versions of the source file
+        for stale in mmap_dir.glob(f"{stem}-*"):
+            if stale != store_dir and stale.is_dir():
+                shutil.rmtree(stale, ignore_errors=True)
+
+    new_manifest = {'source': str(csv_file), 'key': key, **fingerprint}
+    if new_manifest != manifest:
+        tmp_file = mmap_dir / f"{stem}.json.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(new_manifest, f, indent=2)
+        os.replace(tmp_file, mmap_dir / f"{stem}.json")
+
+    print(f"Mapping stops data from {store_dir}...")
+    return open_mmap_store(store_dir, columns)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Single-pass report engine for the police stops analyses.
+The stops data is loaded and its derived columns are built once, then every requested
+report computes its aggregates from the shared frame and prints/plots them.
+
+Usage:
+    python3 stops_reports.py                      # all reports
+    python3 stops_reports.py summary violations   # selected reports
+"""
+
+import argparse
+import importlib
+
+from charts import render_charts
+from instrumentation import add_instrumentation_arguments, instrumented_run, stage
+from stops_data import STOPS_CSV, load_stops
+from stops_schema import derive_columns
+
+# Report name -> analysis script exposing COLUMNS, DERIVED, compute(df), report(results)
+# and chart_jobs(results)
+REPORT_MODULES = {
+    'race': 'police_stops_analysis',
+    'summary': 'quick_summary',
+    'violations': 'violation_analysis',
+    'cvap': 'cvap_analysis',
+}
+
+
+def load_report_modules(reports):
+    """Import the analysis script behind each requested report."""
+    unknown = [name for name in reports if name not in REPORT_MODULES]
+    if unknown:
+        raise ValueError(f"Unknown report(s): {', '.join(unknown)}")
+    return {name: importlib.import_module(REPORT_MODULES[name]) for name in reports}
+
+
+def compute_reports(reports, csv_file=STOPS_CSV):
+    """
+    Load the stops data once and compute the aggregates for every requested report.
+
+    Args:
+        reports (list): Report names (keys of REPORT_MODULES)
+        csv_file (str): Path to the stops CSV
+
+    Returns:
+        dict: Report name -> results dict produced by that script's compute()
+    """
+    modules = load_report_modules(reports)
+
+    columns, derived = [], set()
+    for module in modules.values():
+        columns += [col for col in module.COLUMNS if col not in columns]
+        derived.update(module.DERIVED)
+
+    print(f"Loading stops data for reports: {', '.join(reports)}...")
+    with stage('load') as record:
+        df = load_stops(columns, csv_file=csv_file)
+        record['rows'] = len(df)
+    derive_columns(df, derived)
+
+    with stage('aggregate'):
+        return {name: module.compute(df) for name, module in modules.items()}
+
+
+def run_reports(reports, csv_file=STOPS_CSV, workers=None, dpi=None, force_charts=False):
+    """
+    Compute every requested report in one pass, print each one, then render all
+    of their charts together in a single process pool.
+    """
+    results = compute_reports(reports, csv_file)
+    modules = load_report_modules(reports)
+
+    jobs = []
+    with stage('report'):
+        for name in reports:
+            modules[name].report(results[name])
+            jobs += modules[name].chart_jobs(results[name])
+
+    print(f"\nRendering {len(jobs)} charts...")
+    with stage('render'):
+        output_files = render_charts(jobs, workers=workers, dpi=dpi, force=force_charts)
+    for output_file in output_files:
+        print(f"  - {output_file}")
+
+
+def main():
+    """Main function to run several stops reports over a single load."""
+    parser = argparse.ArgumentParser(description="Run police stops reports in a single pass")
+    parser.add_argument('reports', nargs='*',
+                        help=f"Reports to run: {', '.join(REPORT_MODULES)} (default: all)")
+    parser.add_argument('--csv', default=STOPS_CSV, help="Path to the stops CSV")
+    parser.add_argument('--workers', type=int, help="Chart rendering processes (default: CPU count)")
+    parser.add_argument('--dpi', type=int, help="Output chart resolution (default: 300)")
+    parser.add_argument('--force-charts', action='store_true',
+                        help="Re-render charts even when their inputs are unchanged")
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+
+    unknown = [name for name in args.reports if name not in REPORT_MODULES]
+    if unknown:
+        parser.error(f"unknown report(s): {', '.join(unknown)}")
+
+    with instrumented_run('stops_reports', args.run_log, args.profile):
+        run_reports(args.reports or list(REPORT_MODULES), args.csv, args.workers, args.dpi, args.force_charts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Declared schema for the Stanford Open Policing Project Tampa stops file (fl_tampa_2020_04_01.csv).
+Column names, storage dtypes, known category sets and date/time formats live here so every
+loader reads the file the same way; derive_columns builds the derived columns the reports,
+the cube and the store share.
+"""
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import stage
+
+DATE_FORMAT = '%Y-%m-%d'
+TIME_FORMAT = '%H:%M:%S'
+
+# Storage dtype for every column in the published Tampa layout.
+# 'category' columns are low-cardinality codes, 'str' columns are free text,
+# 'datetime' columns are parsed with DATETIME_FORMATS below.
+STOPS_SCHEMA = {
+    'raw_row_number': 'str',
+    'date': 'datetime',
+    'time': 'str',
+    'location': 'str',
+    'lat': 'float64',
+    'lng': 'float64',
+    'subject_race': 'category',
+    'subject_sex': 'category',
+    'officer_id_hash': 'category',
+    'department_name': 'category',
+    'type': 'category',
+    'violation': 'str',
+    'arrest_made': 'boolean',
+    'citation_issued': 'boolean',
+    'warning_issued': 'boolean',
+    'outcome': 'category',
+    'vehicle_color': 'category',
+    'vehicle_make': 'category',
+    'vehicle_model': 'category',
+    'vehicle_registration_state': 'category',
+    'vehicle_year': 'float32',
+}
+
+# Known values for categorical columns, in display order.
+# Values found in the data but missing here are appended rather than dropped.
+CATEGORY_SETS = {
+    'subject_race': ['white', 'black', 'hispanic', 'asian/pacific islander', 'other', 'unknown'],
+    'subject_sex': ['male', 'female'],
+    'outcome': ['citation', 'warning', 'arrest', 'summons'],
+    'type': ['vehicular', 'pedestrian'],
+}
+
+# Canonical agency names, keyed by lower-cased name or abbreviation
+DEPARTMENT_ALIASES = {
+    'tpd': 'Tampa Police Department',
+    'tampa police department': 'Tampa Police Department',
+    'tampa pd': 'Tampa Police Department',
+    'hcso': "Hillsborough County Sheriff's Office",
+    "hillsborough county sheriff's office": "Hillsborough County Sheriff's Office",
+    'hillsborough county sheriffs office': "Hillsborough County Sheriff's Office",
+    'fhp': 'Florida Highway Patrol',
+    'florida highway patrol': 'Florida Highway Patrol',
+    'ttpd': 'Temple Terrace Police Department',
+    'temple terrace police department': 'Temple Terrace Police Department',
+}
+
+
+def clean_department(name):
+    """Canonical agency name for a raw department value (first pipe-separated segment)."""
+    first = ' '.join(name.split('|')[0].split())
+    return DEPARTMENT_ALIASES.get(first.lower(), first) or None
+
+
+def clean_state(state):
+    """Upper-case two-letter registration state."""
+    return state.strip().upper() or None
+
+
+def clean_outcome(outcome):
+    """Lower-case stop outcome."""
+    return outcome.strip().lower() or None
+
+
+# Normalization applied to the distinct values of categorical columns on load
+CATEGORY_NORMALIZERS = {
+    'vehicle_registration_state': clean_state,
+    'outcome': clean_outcome,
+}
+
+# Candidate formats, most likely first. The format of each source is detected once
+# from a sample of its distinct values (see detect_format).
+DATETIME_FORMATS = {
+    'date': [DATE_FORMAT, '%m/%d/%Y', '%Y/%m/%d', '%m/%d/%y', '%d-%m-%Y', '%Y%m%d'],
+    'time': [TIME_FORMAT, '%H:%M', '%I:%M:%S %p', '%I:%M %p'],
+}
+
+# Distinct values examined when detecting a format
+FORMAT_SAMPLE_SIZE = 1000
+
+# Combined date + time column added when both are loaded
+TIMESTAMP_COLUMN = 'timestamp'
+
+
+def csv_dtypes(columns):
+    """
+    Build the dtype argument for pd.read_csv for the given columns.
+
+    Numeric, boolean and datetime columns are left to the parser and converted
+    afterwards by apply_schema, so a single dirty value does not abort the load.
+
+    Args:
+        columns (list): Column names that will be read
+
+    Returns:
+        dict: Mapping of column name to read_csv dtype
+    """
+    dtypes = {}
+    for col in columns:
+        kind = STOPS_SCHEMA.get(col)
+        if kind == 'category':
+            dtypes[col] = 'category'
+        elif kind == 'str':
+            dtypes[col] = str
+    return dtypes
+
+
+def normalize_categorical(values, normalize):
+    """
+    Normalize a string column by cleaning each distinct value once.
+
+    The column is dictionary-encoded (factorized) first, so the cleaning function
+    runs once per distinct value and the rows are remapped through integer codes.
+    Values that normalize to the same string are merged.
+
+    Args:
+        values (pd.Series): Raw strings or categorical
+        normalize (callable): Maps one raw string to its clean form (None for missing)
+
+    Returns:
+        pd.Series: Categorical of the clean values
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype('category')
+    values = values.cat.remove_unused_categories()
+
+    cleaned = pd.Series([normalize(str(value)) for value in values.cat.categories], dtype=object)
+    clean_codes, clean_categories = pd.factorize(cleaned, sort=True)
+
+    # Code -1 (missing) indexes the appended -1
+    codes = np.append(clean_codes, -1)[values.cat.codes.to_numpy()]
+    # Rebuilt so the categories take the string dtype pandas infers when reading them back from Parquet
+    categories = pd.Index(list(clean_categories))
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories),
+                     index=values.index, name=values.name)
+
+
+def detect_format(values, candidates, sample_size=FORMAT_SAMPLE_SIZE):
+    """
+    Detect the date/time format of a column from a sample of its distinct values.
+
+    Args:
+        values (pd.Series): Raw strings
+        candidates (list): strptime formats to try, most likely first
+        sample_size (int): Distinct values to test
+
+    Returns:
+        str: The candidate that parses the most sampled values (the first one on ties)
+    """
+    sample = pd.Series(values.dropna().unique()[:sample_size], dtype=object)
+    if sample.empty:
+        return candidates[0]
+
+    parsed = [pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum() for fmt in candidates]
+    return candidates[max(range(len(candidates)), key=lambda i: (parsed[i], -i))]
+
+
+def parse_unique(values, fmt):
+    """
+    Parse date/time strings with a fixed format, converting each distinct string once.
+
+    Args:
+        values (pd.Series): Raw strings
+        fmt (str): strptime format
+
+    Returns:
+        tuple: (pd.Series of datetime64 values, number of non-missing values that did not parse)
+    """
+    codes, uniques = pd.factorize(values)
+    parsed_uniques = pd.to_datetime(pd.Series(uniques, dtype=object), format=fmt, errors='coerce')
+
+    # Broadcast back to the rows; missing values (code -1) become NaT
+    parsed = pd.Series(pd.api.extensions.take(parsed_uniques.to_numpy(), codes, allow_fill=True),
+                       index=values.index, name=values.name)
+
+    unparsable = int(parsed_uniques.isna().to_numpy()[codes[codes >= 0]].sum())
+    return parsed, unparsable
+
+
+def _report_unparsable(df, col, count, values, parsed):
+    """Record and print the number of values of a column that did not parse."""
+    df.attrs.setdefault('unparsable', {})[col] = count
+    if count:
+        examples = values[parsed.isna() & values.notna()].unique()[:3]
+        print(f"Warning: {count:,} unparsable {col} value(s), e.g. {', '.join(map(repr, examples))}")
+
+
+def parse_datetime_column(df, col, formats=None):
+    """
+    Parse a raw date or time column with its detected format.
+
+    Args:
+        df (pd.DataFrame): Stops data
+        col (str): Column to parse ('date' or 'time')
+        formats (dict): Formats detected so far for this source; filled in on first use
+
+    Returns:
+        pd.Series: Parsed datetime64 values
+    """
+    if formats is None:
+        formats = {}
+    if col not in formats:
+        formats[col] = detect_format(df[col], DATETIME_FORMATS[col])
+
+    parsed, unparsable = parse_unique(df[col], formats[col])
+    _report_unparsable(df, col, unparsable, df[col], parsed)
+    return parsed
+
+
+def apply_schema(df, formats=None):
+    """
+    Convert the columns of a freshly read stops DataFrame to their declared dtypes.
+
+    Date and time columns are parsed with a format detected once per source; when
+    both are present they are also combined into TIMESTAMP_COLUMN. Values that do
+    not parse become NaT and are counted in df.attrs['unparsable'].
+
+    Args:
+        df (pd.DataFrame): Stops data as returned by pd.read_csv(dtype=csv_dtypes(...))
+        formats (dict): Date/time formats already detected for this source (for
+            example by an earlier chunk); detected formats are added to it
+
+    Returns:
+        pd.DataFrame: The same DataFrame with schema dtypes applied
+    """
+    if formats is None:
+        formats = {}
+
+    for col in df.columns:
+        kind = STOPS_SCHEMA.get(col)
+
+        if kind == 'category':
+            if col in CATEGORY_NORMALIZERS:
+                df[col] = normalize_categorical(df[col], CATEGORY_NORMALIZERS[col])
+            elif not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+            known = CATEGORY_SETS.get(col)
+            if known is not None:
+                observed = set(df[col].cat.categories)
+                ordered = [c for c in known if c in observed]
+                extra = sorted(observed.difference(known))
+                df[col] = df[col].cat.set_categories(ordered + extra)
+
+        elif kind == 'datetime':
+            if not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = parse_datetime_column(df, col, formats)
+
+        elif kind == 'boolean':
+            if df[col].dtype != bool:
+                df[col] = df[col].map({True: True, False: False, 'TRUE': True, 'FALSE': False,
+                                       'True': True, 'False': False}).astype('boolean')
+
+        elif kind in ('float32', 'float64'):
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(kind)
+
+    if 'date' in df.columns and 'time' in df.columns and TIMESTAMP_COLUMN not in df.columns:
+        times = parse_datetime_column(df, 'time', formats)
+        df[TIMESTAMP_COLUMN] = df['date'] + (times - times.dt.normalize())
+
+    return df
+
+
+def derive_columns(df, derived):
+    """
+    Add shared derived columns to a stops DataFrame in place.
+
+    Args:
+        df (pd.DataFrame): Stops data
+        derived (iterable): Names of derived columns to build. Supported:
+            'department_name_clean', 'year', 'violation_category', 'violation_code_main'
+
+    Returns:
+        pd.DataFrame: The same DataFrame with the derived columns added
+    """
+    derived = set(derived)
+
+    with stage('clean'):
+        if 'department_name_clean' in derived and 'department_name_clean' not in df.columns:
+            # Clean department names (first pipe-separated value, canonical agency name)
+            df['department_name_clean'] = normalize_categorical(df['department_name'], clean_department)
+
+        if 'year' in derived and 'year' not in df.columns:
+            dates = df['date']
+            if not pd.api.types.is_datetime64_any_dtype(dates):
+                dates = parse_datetime_column(df, 'date')
+            df['year'] = dates.dt.year.astype('Int16')
+
+    violation_columns = {'violation_category', 'violation_code_main'}
+    if derived & violation_columns and not violation_columns.issubset(df.columns):
+        # Imported here: violation_categories imports stops_data, which imports this module
+        from violation_categories import classify_violations
+
+        with stage('categorize'):
+            classified = classify_violations(df['violation'])
+            df['violation_category'] = classified['violation_category']
+            df['violation_code_main'] = classified['violation_code_main']
+
+    return df
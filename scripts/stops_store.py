@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Append-only store for successive police stops releases, partitioned by year and department.
+Each ingest finds the rows of a release that are not stored yet (by raw_row_number
+and date), appends them as new Parquet parts under year=YYYY/department=NAME/ and folds
+their counts into the stored cube, so a refresh costs time proportional to the new rows.
+Filtered loads read only the partitions matching the requested departments and dates.
+
+Usage:
+    python3 stops_store.py fl_tampa_2020_04_01.csv    # first release: ingests everything
+    python3 stops_store.py fl_tampa_2021_01_01.csv    # later releases: only the new rows
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from stops_cube import COLUMNS as CUBE_COLUMNS, DERIVED as CUBE_DERIVED, build_cube, merge_cubes, read_cube, save_cube
+from stops_data import CACHE_DIR, source_fingerprint
+from stops_schema import apply_schema, clean_department, derive_columns, normalize_categorical
+from stops_stream import DEFAULT_CHUNKSIZE, iter_stops_csv
+from violation_categories import ruleset_version
+
+STORE_DIR = str(Path(CACHE_DIR) / 'store')
+
+# Bump when the store layout changes; an incompatible store must be re-ingested
+STORE_FORMAT_VERSION = 4
+
+# Partition label for rows without a parsable date or a department
+UNKNOWN_YEAR = 'unknown'
+UNKNOWN_DEPARTMENT = 'unknown'
+
+
+def row_keys(df):
+    """Hash each row's (raw_row_number, date) pair into a uint64 key."""
+    return pd.util.hash_pandas_object(df[['raw_row_number', 'date']], index=False).to_numpy()
+
+
+def subject_keys(df):
+    """Hash each row's raw_row_number into a uint64 key."""
+    return pd.util.hash_pandas_object(df['raw_row_number'], index=False).to_numpy()
+
+
+def isin_sorted(values, sorted_keys):
+    """Vectorized membership test of values in a sorted key array."""
+    if len(sorted_keys) == 0:
+        return np.zeros(len(values), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_keys, values), len(sorted_keys) - 1)
+    return sorted_keys[positions] == values
+
+
+def read_manifest(store_dir=STORE_DIR):
+    """Read the store manifest (None if there is no store yet)."""
+    try:
+        with open(Path(store_dir) / 'store.json', 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format_version') != STORE_FORMAT_VERSION:
+        raise ValueError(f"{store_dir} was written by an incompatible version; remove it and re-ingest")
+    return manifest
+
+
+def _write_manifest(store_dir, manifest):
+    tmp_file = Path(store_dir) / 'store.json.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, Path(store_dir) / 'store.json')
+
+
+def _load_keys(store_dir, manifest, name):
+    if manifest is None:
+        return np.array([], dtype=np.uint64)
+    return np.load(Path(store_dir) / manifest[name])
+
+
+def department_slug(department):
+    """Directory-safe partition name for a clean department name."""
+    return re.sub(r'[^A-Za-z0-9]+', '_', department).strip('_') or UNKNOWN_DEPARTMENT
+
+
+def select_parts(parts, departments=None, start=None, end=None):
+    """
+    Select the partitions that can hold rows matching the filters.
+
+    Args:
+        parts (list): Part records from the store manifest
+        departments (str or list): Clean department names, or a regular expression
+            searched in the raw department names (like str.contains)
+        start (str or Timestamp): First date to include
+        end (str or Timestamp): Last date to include
+
+    Returns:
+        list: Matching part records
+    """
+    selected = parts
+
+    if departments is not None:
+        if isinstance(departments, str):
+            # Raw names can match where their clean (first) segment does not, e.g. 'A|Tampa Police Department'
+            pattern = re.compile(departments)
+            selected = [part for part in selected if any(pattern.search(name) for name in part['department_names'])]
+        else:
+            departments = set(departments)
+            selected = [part for part in selected if part['department'] in departments]
+
+    if start is not None or end is not None:
+        first = pd.Timestamp(start).year if start is not None else None
+        last = pd.Timestamp(end).year if end is not None else None
+        selected = [part for part in selected
+                    if part['year'] != UNKNOWN_YEAR
+                    and (first is None or int(part['year']) >= first)
+                    and (last is None or int(part['year']) <= last)]
+
+    return selected
+
+
+def read_parts(store_dir, parts, columns=None):
+    """Read and concatenate part files, restoring the schema dtypes."""
+    frames = [pd.read_parquet(Path(store_dir) / part['file'], columns=columns) for part in parts]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    # Categories differ between parts, so restore the schema dtypes after concatenating
+    return apply_schema(pd.concat(frames, ignore_index=True))
+
+
+def load_store(columns=None, store_dir=STORE_DIR, departments=None, start=None, end=None):
+    """
+    Load stored stops rows, reading only the partitions that match the filters.
+
+    Args:
+        columns (list): Columns to read (None reads every column)
+        store_dir (str): Store directory
+        departments (str or list): Clean department names, or a regular expression
+            searched in the raw department names (None keeps every department)
+        start (str or Timestamp): First date to include (None: no lower bound)
+        end (str or Timestamp): Last date to include (None: no upper bound)
+
+    Returns:
+        pd.DataFrame: Matching stops rows with schema dtypes applied
+    """
+    manifest = read_manifest(store_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No stops store in {store_dir}; ingest a release first")
+
+    parts = select_parts(manifest['parts'], departments, start, end)
+    rows = sum(part['rows'] for part in parts)
+    print(f"Reading {len(parts)} of {len(manifest['parts'])} store partitions "
+          f"({rows:,} of {manifest['rows']:,} rows)...")
+
+    department_filter = isinstance(departments, str)
+    date_filter = start is not None or end is not None
+    extra = []
+    if columns is not None:
+        extra = [col for col, needed in [('department_name', department_filter), ('date', date_filter)]
+                 if needed and col not in columns]
+
+    df = read_parts(store_dir, parts, list(columns) + extra if columns is not None else None)
+
+    if (department_filter or date_filter) and len(df):
+        keep = pd.Series(True, index=df.index)
+        # A selected partition can also hold raw names the pattern does not match
+        if department_filter:
+            keep &= df['department_name'].str.contains(departments, na=False)
+        # Year partitions are coarser than the date range; trim the edge years
+        if start is not None:
+            keep &= df['date'] >= pd.Timestamp(start)
+        if end is not None:
+            keep &= df['date'] <= pd.Timestamp(end)
+        df = df[keep].reset_index(drop=True)
+
+    return df.drop(columns=extra)
+
+
+def read_new_rows(csv_file, known_keys, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Read the rows of a release whose (raw_row_number, date) key is not stored yet.
+
+    Args:
+        csv_file (str): Release CSV
+        known_keys (np.ndarray): Sorted keys of the stored rows
+        chunksize (int): Rows per chunk while scanning the release
+
+    Returns:
+        tuple: (new rows as a DataFrame, their keys, rows scanned)
+    """
+    delta, scanned = [], 0
+    for chunk in iter_stops_csv(csv_file, None, chunksize):
+        scanned += len(chunk)
+        keys = row_keys(chunk)
+        new = ~isin_sorted(keys, known_keys)
+        if new.any():
+            delta.append(chunk[new])
+
+    if not delta:
+        return None, np.array([], dtype=np.uint64), scanned
+
+    delta = apply_schema(pd.concat(delta, ignore_index=True))
+    return delta, row_keys(delta), scanned
+
+
+def write_partitions(delta, store_dir, generation):
+    """
+    Append new rows as one Parquet part per year and clean department.
+
+    Returns:
+        list: Part records ({'file', 'year', 'department', 'department_names', 'rows'}) relative
+            to store_dir; department_names lists the distinct raw names, for pruning by pattern
+    """
+    years = delta['date'].dt.year
+    year_labels = years.astype('Int64').astype(str).where(years.notna(), UNKNOWN_YEAR)
+    departments = normalize_categorical(delta['department_name'], clean_department).astype(object)
+    department_labels = departments.where(departments.notna(), UNKNOWN_DEPARTMENT)
+
+    parts = []
+    for (year, department), rows in delta.groupby([year_labels, department_labels], sort=True):
+        part = Path(f"year={year}") / f"department={department_slug(department)}" / f"part-{generation:05d}.parquet"
+        (Path(store_dir) / part.parent).mkdir(parents=True, exist_ok=True)
+        rows.to_parquet(Path(store_dir) / part, index=False)
+        names = sorted(rows['department_name'].dropna().astype(str).unique())
+        parts.append({'file': part.as_posix(), 'year': year, 'department': department,
+                      'department_names': names, 'rows': len(rows)})
+    return parts
+
+
+def store_cube_rows(df):
+    """Prepare stops rows for the cube (adds the derived columns)."""
+    return derive_columns(df[CUBE_COLUMNS].copy(), CUBE_DERIVED)
+
+
+def ingest(csv_file, store_dir=STORE_DIR, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Ingest a stops release: append its new rows and update the stored cube.
+
+    Args:
+        csv_file (str): Release CSV
+        store_dir (str): Store directory
+        chunksize (int): Rows per chunk while scanning the release
+
+    Returns:
+        dict: Ingest record (rows scanned and added, elapsed seconds)
+    """
+    start = time.perf_counter()
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = read_manifest(store_dir)
+    fingerprint = source_fingerprint(csv_file)
+    if manifest is not None and any(r['sha256'] == fingerprint['sha256'] for r in manifest['releases']):
+        print(f"{csv_file} has already been ingested")
+        return None
+
+    generation = manifest['generation'] + 1 if manifest is not None else 1
+    known = _load_keys(store_dir, manifest, 'row_keys')
+
+    print(f"Scanning {csv_file} for new rows...")
+    delta, keys, scanned = read_new_rows(csv_file, known, chunksize)
+    added = 0 if delta is None else len(delta)
+    print(f"Found {added:,} new rows out of {scanned:,}")
+
+    parts = list(manifest['parts']) if manifest is not None else []
+    cube_name = manifest['cube'] if manifest is not None else None
+    row_keys_name = manifest['row_keys'] if manifest is not None else None
+    subject_keys_name = manifest['subject_keys'] if manifest is not None else None
+
+    if delta is not None:
+        new_parts = write_partitions(delta, store_dir, generation)
+        parts += new_parts
+        print(f"Wrote {len(new_parts)} partition(s) for generation {generation}")
+
+        row_keys_name = f"row_keys-{generation:05d}.npy"
+        np.save(store_dir / row_keys_name, np.union1d(known, keys))
+
+        subjects = np.union1d(_load_keys(store_dir, manifest, 'subject_keys'), subject_keys(delta))
+        subject_keys_name = f"subject_keys-{generation:05d}.npy"
+        np.save(store_dir / subject_keys_name, subjects)
+
+        # Fold the new rows into the cube; rebuild it if the violation rules changed
+        if manifest is None:
+            cube = merge_cubes(None, build_cube(store_cube_rows(delta)), len(subjects))
+        elif manifest.get('ruleset_version') == ruleset_version():
+            cube = merge_cubes(read_cube(store_dir / cube_name, {'unique_subjects': 0}),
+                               build_cube(store_cube_rows(delta)), len(subjects))
+        else:
+            print("Building stops cube from the whole store...")
+            rows = read_parts(store_dir, parts, CUBE_COLUMNS)
+            cube = merge_cubes(None, build_cube(store_cube_rows(rows)), len(subjects))
+
+        cube_name = f"cube-{generation:05d}"
+        save_cube(cube, store_dir / cube_name, {'generation': generation})
+
+    record = {
+        'source': str(csv_file),
+        'sha256': fingerprint['sha256'],
+        'rows_scanned': scanned,
+        'rows_added': added,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    new_manifest = {
+        'format_version': STORE_FORMAT_VERSION,
+        'generation': generation,
+        'ruleset_version': ruleset_version(),
+        'rows': sum(part['rows'] for part in parts),
+        'parts': parts,
+        'row_keys': row_keys_name,
+        'subject_keys': subject_keys_name,
+        'cube': cube_name,
+        'releases': (manifest['releases'] if manifest is not None else []) + [record],
+    }
+    _write_manifest(store_dir, new_manifest)
+
+    # Keys and cubes of earlier generations are no longer referenced
+    if manifest is not None and delta is not None:
+        for name in ('row_keys', 'subject_keys'):
+            (store_dir / manifest[name]).unlink(missing_ok=True)
+        shutil.rmtree(store_dir / manifest['cube'], ignore_errors=True)
+
+    print(f"Ingested {added:,} rows in {record['seconds']:.2f} s ({new_manifest['rows']:,} rows stored)")
+    return record
+
+
+def load_store_cube(store_dir=STORE_DIR):
+    """Load the cube maintained by ingest()."""
+    manifest = read_manifest(store_dir)
+    if manifest is None or manifest['cube'] is None:
+        raise FileNotFoundError(f"No stops store in {store_dir}; ingest a release first")
+    with open(Path(store_dir) / manifest['cube'] / 'cube.json', 'r', encoding='utf-8') as f:
+        return read_cube(Path(store_dir) / manifest['cube'], json.load(f))
+
+
+def main():
+    """Main function to ingest police stops releases into the store."""
+    parser = argparse.ArgumentParser(description="Ingest police stops releases into the partitioned store")
+    parser.add_argument('releases', nargs='+', help="Release CSV file(s), oldest first")
+    parser.add_argument('--store', default=STORE_DIR, help=f"Store directory (default: {STORE_DIR})")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"Rows per chunk while scanning a release (default: {DEFAULT_CHUNKSIZE:,})")
+    args = parser.parse_args()
+
+    for csv_file in args.releases:
+        ingest(csv_file, args.store, args.chunksize)
+
+
+if __name__ == "__main__":
+    main()
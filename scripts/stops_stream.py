@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Bounded-memory aggregation helpers for the police stops data.
+Partial results from fixed-size chunks are merged, so the full DataFrame never has to fit in memory.
+"""
+
+import numpy as np
+import pandas as pd
+
+from stops_data import STOPS_CSV
+from stops_schema import apply_schema, csv_dtypes
+
+DEFAULT_CHUNKSIZE = 250_000
+
+
+def iter_stops_csv(csv_file=STOPS_CSV, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Read the stops CSV in fixed-size chunks with the declared schema.
+
+    Args:
+        csv_file (str): Path to the stops CSV
+        columns (list): Columns to read (None reads every column)
+        chunksize (int): Rows per chunk
+
+    Yields:
+        pd.DataFrame: Successive chunks with schema dtypes applied
+    """
+    if columns is None:
+        columns = list(pd.read_csv(csv_file, nrows=0).columns)
+
+    reader = pd.read_csv(csv_file, usecols=columns, dtype=csv_dtypes(columns),
+                         chunksize=chunksize, low_memory=False)
+
+    # Date/time formats are detected on the first chunk and reused for the rest
+    formats = {}
+    for chunk in reader:
+        yield apply_schema(chunk, formats)
+
+
+def merge_counts(total, partial):
+    """
+    Add a partial value_counts Series into a running total.
+
+    Args:
+        total (pd.Series): Running counts (None for the first chunk)
+        partial (pd.Series): Counts from the current chunk
+
+    Returns:
+        pd.Series: Merged integer counts
+    """
+    partial = partial[partial > 0]
+    if total is None:
+        return partial.astype('int64')
+    return total.add(partial, fill_value=0).astype('int64')
+
+
+def _bit_length(values):
+    """Vectorized int.bit_length() for uint64 arrays."""
+    values = values.copy()
+    length = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= (np.uint64(1) << np.uint64(shift))
+        length[high] += shift
+        values[high] >>= np.uint64(shift)
+    return length + (values > 0)
+
+
+class HyperLogLog:
+    """
+    Mergeable approximate distinct counter.
+
+    Uses 2**precision one-byte registers (16 KB at the default precision) and
+    has a relative standard error of about 1.04 / sqrt(2**precision), ~0.8%.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        """Add the non-null values of a Series or array to the sketch."""
+        values = pd.Series(values).dropna()
+        if values.empty:
+            return
+
+        hashes = pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+        tail_bits = 64 - self.precision
+        index = (hashes >> np.uint64(tail_bits)).astype(np.int64)
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+        rank = (tail_bits - _bit_length(tail) + 1).astype(np.uint8)
+
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        """Fold another sketch with the same precision into this one."""
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self):
+        """Return the estimated number of distinct values."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+
+        # Small-range correction via linear counting
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+
+        return int(round(estimate))
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Synthetic input data for benchmarking the analysis scripts.
+Writes a stops CSV with the published Tampa column layout, a PUMS person/housing pair
+with a matching data dictionary, and a CVAP County.csv for every Florida county. Values
+are drawn from fixed distributions shaped like the real files, so the same seed and
+sizes always produce the same files.
+
+Usage:
+    python3 synthetic_data.py --rows 1M --out bench-data
+    cd bench-data && python3 ../quick_summary.py
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from stops_data import STOPS_CSV
+from stops_schema import STOPS_SCHEMA
+
+# Default sizes and block size of the generated files
+DEFAULT_ROWS = 100_000
+DEFAULT_HOUSEHOLDS = 20_000
+DEFAULT_CHUNKSIZE = 1_000_000
+DEFAULT_SEED = 0
+
+# Output layout, relative to the output directory (the layout the scripts expect)
+PUMS_DIR = 'PUMS-2018-data'
+PUMS_DICTIONARY = 'PUMS_Data_Dictionary_2018.txt'
+HOUSING_CSV = 'csv_hfl/psam_h12.csv'
+PERSON_CSV = 'csv_pfl/psam_p12.csv'
+CVAP_CSV = 'CVAP_2019-2023_ACS_csv_files/County.csv'
+
+FIRST_DATE = pd.Timestamp('2003-01-01')
+LAST_DATE = pd.Timestamp('2018-12-31')
+
+# Value -> probability of each categorical stops column (None is a missing value)
+STOPS_DISTRIBUTIONS = {
+    'subject_race': {'white': .45, 'black': .33, 'hispanic': .17, 'asian/pacific islander': .02,
+                     'other': .02, 'unknown': .01},
+    'subject_sex': {'male': .67, 'female': .32, None: .01},
+    'department_name': {
+        'Tampa Police Department': .52,
+        "Hillsborough County Sheriff's Office": .30,
+        'Florida Highway Patrol': .10,
+        'Temple Terrace Police Department': .03,
+        'Plant City Police Department': .02,
+        'University of South Florida Police Department': .01,
+        'Tampa Police Department|Tampa Police Department': .02,
+    },
+    'type': {'vehicular': .97, 'pedestrian': .03},
+    'outcome': {'citation': .92, 'warning': .03, 'arrest': .04, None: .01},
+    'vehicle_color': {'BLK': .2, 'WHI': .2, 'SIL': .15, 'GRY': .12, 'BLU': .1, 'RED': .1, 'GRN': .05,
+                      'TAN': .04, None: .04},
+    'vehicle_make': {'TOYT': .16, 'FORD': .14, 'CHEV': .12, 'HOND': .12, 'NISS': .1, 'DODG': .07,
+                     'HYUN': .06, 'JEEP': .05, 'KIA': .05, 'BMW': .04, 'MERZ': .03, None: .06},
+    'vehicle_model': {'CAMRY': .08, 'ACCORD': .08, 'CIVIC': .07, 'F150': .07, 'ALTIMA': .07,
+                      'COROLLA': .07, 'MALIBU': .05, 'SILVERADO': .05, 'IMPALA': .04, None: .42},
+    'vehicle_registration_state': {'FL': .9, 'GA': .02, 'NY': .015, 'OH': .01, 'MI': .01, 'NC': .01,
+                                   'TX': .01, 'fl': .005, None: .02},
+}
+
+# Violation descriptions, roughly in order of frequency
+VIOLATIONS = [
+    'UNLAWFUL SPEED 316.183(2)', 'DRIVER NOT BELTED 316.614(4)', 'RED LIGHT CAMERA 316.075(1)(c)1',
+    'NO VALID DL 322.03(1)', 'EXPIRED REG MORE THAN 6 MONTHS 320.07(3)(b)', 'NO PROOF OF INSURANCE 316.646(1)',
+    'CARELESS DRIVING 316.1925(1)', 'FAIL TO YIELD RIGHT OF WAY 316.121', 'DUI 316.193(1)',
+    'DEFECTIVE EQUIPMENT 316.610', 'DWLS KNOWINGLY 322.34(2)', 'IMPROPER LANE CHANGE 316.085(2)',
+    'FAIL TO STOP AT STOP SIGN 316.123(2)(a)', 'TAG LIGHT REQUIRED 316.221(2)', 'SPEED IN SCHOOL ZONE 316.1895(10)',
+    'WINDOW TINT 316.2953', 'CHILD RESTRAINT 316.613', 'RECKLESS DRIVING 316.192(1)(a)',
+    'TRAFFIC CONTROL DEVICE 316.074(1)', 'LEFT SCENE OF CRASH 316.061(1)', 'OPEN CONTAINER 316.1936(2)',
+    'TEXTING WHILE DRIVING 316.305(3)(a)', 'FOLLOWING TOO CLOSELY 316.0895(1)', 'IMPROPER U TURN 316.1515',
+    'PEDESTRIAN VIOLATION 316.130(11)', 'OBSTRUCTED VIEW 316.2004(2)', 'HEADLIGHTS REQUIRED 316.217(1)(a)',
+    'ATTACHED TAG NOT ASSIGNED 320.261', 'UNSAFE VEHICLE 316.610(1)', 'HIGHWAY MINIMUM SPEED 316.183(5)',
+]
+VIOLATION_MISSING = .01
+
+LOCATIONS = [
+    'N DALE MABRY HWY / W KENNEDY BLVD', 'E FOWLER AVE / N 56TH ST', 'W HILLSBOROUGH AVE / N ARMENIA AVE',
+    'E BUSCH BLVD / N NEBRASKA AVE', 'S DALE MABRY HWY / W GANDY BLVD', 'I-275 / E BUSCH BLVD',
+    'N FLORIDA AVE / E WATERS AVE', 'E COLUMBUS DR / N 22ND ST', 'BAYSHORE BLVD / W PLATT ST',
+    'W BRANDON BLVD / S KINGS AVE',
+]
+
+# Share of stops per hour of the day (busier during the day)
+HOUR_WEIGHTS = np.array([2, 1.5, 1.5, 1, .8, 1, 2, 4, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 4.5, 4, 3.5, 3, 2.5, 2.5])
+
+# Hispanic origin code -> probability in the PUMS person file
+HISP_DISTRIBUTION = {1: .74, 2: .05, 3: .06, 4: .08, 5: .01, 24: .06}
+
+# Vehicles available (NaN: no vehicle data) -> probability per household
+VEH_DISTRIBUTION = {0: .07, 1: .35, 2: .35, 3: .13, 4: .05, 5: .02, 6: .01, np.nan: .02}
+
+# Share of housing records that are group quarters
+GROUP_QUARTERS = .02
+
+# CVAP line titles in file order, with the Hillsborough-like population share of each race line
+CVAP_LINES = [
+    ('Total', None),
+    ('Not Hispanic or Latino', None),
+    ('American Indian or Alaska Native Alone', .002),
+    ('Asian Alone', .04),
+    ('Black or African American Alone', .16),
+    ('Native Hawaiian or Other Pacific Islander Alone', .001),
+    ('White Alone', .47),
+    ('American Indian or Alaska Native and White', .004),
+    ('Asian and White', .004),
+    ('Black or African American and White', .008),
+    ('American Indian or Alaska Native and Black or African American', .001),
+    ('Remainder of Two or More Race Responses', .01),
+    ('Hispanic or Latino', .30),
+]
+
+# Florida counties (FIPS code, name) for County.csv
+FLORIDA_COUNTIES = [
+    (1, 'Alachua'), (3, 'Baker'), (5, 'Bay'), (7, 'Bradford'), (9, 'Brevard'), (11, 'Broward'),
+    (13, 'Calhoun'), (15, 'Charlotte'), (17, 'Citrus'), (19, 'Clay'), (21, 'Collier'), (23, 'Columbia'),
+    (27, 'DeSoto'), (29, 'Dixie'), (31, 'Duval'), (33, 'Escambia'), (35, 'Flagler'), (37, 'Franklin'),
+    (39, 'Gadsden'), (41, 'Gilchrist'), (43, 'Glades'), (45, 'Gulf'), (47, 'Hamilton'), (49, 'Hardee'),
+    (51, 'Hendry'), (53, 'Hernando'), (55, 'Highlands'), (57, 'Hillsborough'), (59, 'Holmes'),
+    (61, 'Indian River'), (63, 'Jackson'), (65, 'Jefferson'), (67, 'Lafayette'), (69, 'Lake'), (71, 'Lee'),
+    (73, 'Leon'), (75, 'Levy'), (77, 'Liberty'), (79, 'Madison'), (81, 'Manatee'), (83, 'Marion'),
+    (85, 'Martin'), (86, 'Miami-Dade'), (87, 'Monroe'), (89, 'Nassau'), (91, 'Okaloosa'), (93, 'Okeechobee'),
+    (95, 'Orange'), (97, 'Osceola'), (99, 'Palm Beach'), (101, 'Pasco'), (103, 'Pinellas'), (105, 'Polk'),
+    (107, 'Putnam'), (109, 'St. Johns'), (111, 'St. Lucie'), (113, 'Santa Rosa'), (115, 'Sarasota'),
+    (117, 'Seminole'), (119, 'Sumter'), (121, 'Suwannee'), (123, 'Taylor'), (125, 'Union'), (127, 'Volusia'),
+    (129, 'Wakulla'), (131, 'Walton'), (133, 'Washington'),
+]
+HILLSBOROUGH_POPULATION = 1_450_000
+
+
+def parse_count(text):
+    """Parse a row count such as '250000', '100k' or '50M'."""
+    text = str(text).strip().lower().replace('_', '').replace(',', '')
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    if scale > 1:
+        text = text[:-1]
+    return int(float(text) * scale)
+
+
+def _choice(rng, distribution, size):
+    """Draw values from a value -> probability mapping (probabilities are normalized)."""
+    values = np.array(list(distribution), dtype=object)
+    probabilities = np.array(list(distribution.values()), dtype='float64')
+    return values[rng.choice(len(values), size, p=probabilities / probabilities.sum())]
+
+
+def _zipf_weights(count, exponent=1.1):
+    weights = 1 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def generate_stops_chunk(rng, first_row, size):
+    """
+    Generate one block of synthetic stops in the published Tampa column layout.
+
+    Args:
+        rng (np.random.Generator): Random source
+        first_row (int): raw_row_number of the first stop in the block
+        size (int): Number of stops
+
+    Returns:
+        pd.DataFrame: Columns in STOPS_SCHEMA order, formatted as in the source CSV
+    """
+    # Dates and times are formatted once per distinct value and broadcast to the rows
+    days = (LAST_DATE - FIRST_DATE).days + 1
+    all_dates = pd.date_range(FIRST_DATE, periods=days).strftime('%Y-%m-%d').to_numpy(dtype=object)
+    # Stops grow over the years: later days are drawn more often
+    day_weights = np.linspace(.6, 1.4, days)
+    dates = all_dates[rng.choice(days, size, p=day_weights / day_weights.sum())]
+    dates[rng.random(size) < .001] = None
+
+    all_times = np.array([f"{hour:02d}:{minute:02d}:00" for hour in range(24) for minute in range(60)], dtype=object)
+    hours = rng.choice(24, size, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    times = all_times[hours * 60 + rng.integers(0, 60, size)]
+    times[rng.random(size) < .002] = None
+
+    officers = np.array([f"{value:010x}" for value in rng.integers(0, 16 ** 10, 1500)], dtype=object)
+
+    violations = np.array(VIOLATIONS, dtype=object)[rng.choice(len(VIOLATIONS), size, p=_zipf_weights(len(VIOLATIONS)))]
+    violations[rng.random(size) < VIOLATION_MISSING] = None
+
+    outcome = _choice(rng, STOPS_DISTRIBUTIONS['outcome'], size)
+
+    lat = (27.95 + rng.normal(0, .06, size)).round(6)
+    lng = (-82.46 + rng.normal(0, .06, size)).round(6)
+    no_location = rng.random(size) < .05
+    lat[no_location] = np.nan
+    lng[no_location] = np.nan
+
+    vehicle_year = pd.array(rng.integers(1985, 2020, size), dtype='Int16')
+    vehicle_year[rng.random(size) < .05] = pd.NA
+
+    chunk = {
+        'raw_row_number': np.arange(first_row, first_row + size),
+        'date': dates,
+        'time': times,
+        'location': np.array(LOCATIONS, dtype=object)[rng.integers(0, len(LOCATIONS), size)],
+        'lat': lat,
+        'lng': lng,
+        'officer_id_hash': officers[rng.choice(len(officers), size, p=_zipf_weights(len(officers), .8))],
+        'violation': violations,
+        'arrest_made': outcome == 'arrest',
+        'citation_issued': outcome == 'citation',
+        'warning_issued': outcome == 'warning',
+        'outcome': outcome,
+        'vehicle_year': vehicle_year,
+    }
+    for col, distribution in STOPS_DISTRIBUTIONS.items():
+        if col != 'outcome':
+            chunk[col] = _choice(rng, distribution, size)
+
+    return pd.DataFrame(chunk)[list(STOPS_SCHEMA)]
+
+
+def write_stops_csv(csv_file, rows, seed=DEFAULT_SEED, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Write a synthetic stops CSV block by block, so any size fits in memory.
+
+    Args:
+        csv_file (str): Output path
+        rows (int): Number of stops
+        seed (int): Random seed
+        chunksize (int): Stops generated per block
+    """
+    rng = np.random.default_rng(seed)
+    Path(csv_file).parent.mkdir(parents=True, exist_ok=True)
+
+    with open(csv_file, 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, rows, chunksize):
+            chunk = generate_stops_chunk(rng, start + 1, min(chunksize, rows - start))
+            chunk.to_csv(f, index=False, header=start == 0)
+        if rows == 0:
+            f.write(','.join(STOPS_SCHEMA) + '\n')
+
+
+def _dictionary_entry(name, data_type, length, description, values):
+    lines = [f"{name:<12}{data_type} {length}", f"    {description}"]
+    lines += [f"          {code} .{label}" for code, label in values]
+    return '\n'.join(lines) + '\n\n'
+
+
+def _weight_entries(weight, description):
+    return [(f"{weight}{i}", 'Numeric', 5, f"{description} replicate {i}",
+             [('-9999..09999', f"Integerized {description} replicate {i}")]) for i in range(1, 81)]
+
+
+HOUSING_VARIABLES = [
+    ('RT', 'Character', 1, 'Record Type', [('H', 'Housing Record or Group Quarters Unit')]),
+    ('SERIALNO', 'Character', 13, 'Housing unit/GQ person serial number',
+     [('2018GQ0000001..2018GQ9999999', 'GQ Unique identifier'),
+      ('2018HU0000001..2018HU9999999', 'HU Unique identifier')]),
+    ('DIVISION', 'Character', 1, 'Division code based on 2010 Census definitions', [('5', 'South Atlantic (Statistical Area)')]),
+    ('PUMA', 'Character', 5, 'Public use microdata area code (PUMA) based on 2010 Census definition',
+     [('00100..70301', 'Public use microdata area codes')]),
+    ('REGION', 'Character', 1, 'Region code based on 2010 Census definitions', [('3', 'South')]),
+    ('ST', 'Character', 2, 'State Code based on 2010 Census definitions', [('12', 'Florida/FL')]),
+    ('ADJINC', 'Character', 7, 'Adjustment factor for income and earnings dollar amounts (6 implied decimal places)',
+     [('1013097', '2018 factor (1.013097)')]),
+    ('WGTP', 'Numeric', 5, 'Housing Unit Weight',
+     [('0', 'Group Quarter placeholder record'), ('1..9999', 'Integerized Housing Weight')]),
+    ('NP', 'Numeric', 2, 'Number of persons in this household',
+     [('0', 'Vacant unit'), ('1', 'One person in household or any person in group quarters'),
+      ('2..20', 'Number of persons in household')]),
+    ('VEH', 'Numeric', 1, 'Vehicles (1 ton or less) available',
+     [('b', 'N/A (GQ/vacant)'), ('0', 'No vehicles'), ('1', '1 vehicle'), ('2', '2 vehicles'),
+      ('3', '3 vehicles'), ('4', '4 vehicles'), ('5', '5 vehicles'), ('6', '6 or more vehicles')]),
+] + _weight_entries('WGTP', 'Housing Weight')
+
+PERSON_VARIABLES = [
+    ('RT', 'Character', 1, 'Record Type', [('P', 'Person Record')]),
+    ('SERIALNO', 'Character', 13, 'Housing unit/GQ person serial number',
+     [('2018GQ0000001..2018GQ9999999', 'GQ Unique identifier'),
+      ('2018HU0000001..2018HU9999999', 'HU Unique identifier')]),
+    ('SPORDER', 'Numeric', 2, 'Person number', [('01..20', 'Person number')]),
+    ('PUMA', 'Character', 5, 'Public use microdata area code (PUMA) based on 2010 Census definition',
+     [('00100..70301', 'Public use microdata area codes')]),
+    ('ST', 'Character', 2, 'State Code based on 2010 Census definitions', [('12', 'Florida/FL')]),
+    ('ADJINC', 'Character', 7, 'Adjustment factor for income and earnings dollar amounts (6 implied decimal places)',
+     [('1013097', '2018 factor (1.013097)')]),
+    ('PWGTP', 'Numeric', 5, "Person's weight", [('1..9999', "Integerized Person's Weight")]),
+    ('AGEP', 'Numeric', 2, 'Age', [('0', 'Under 1 year'), ('1..99', '1 to 99 years (Top-coded)')]),
+    ('SEX', 'Character', 1, 'Sex', [('1', 'Male'), ('2', 'Female')]),
+    ('HISP', 'Character', 2, 'Recoded detailed Hispanic origin',
+     [('01', 'Not Spanish/Hispanic/Latino'), ('02', 'Mexican'), ('03', 'Puerto Rican'), ('04', 'Cuban'),
+      ('05', 'Dominican'), ('24', 'All Other Spanish/Hispanic/Latino')]),
+    ('PINCP', 'Numeric', 7, "Total person's income (signed, use ADJINC to adjust to constant dollars)",
+     [('bbbbbbb', 'N/A (less than 15 years old)'), ('0', 'None'), ('-19999', 'Loss of $19999 or more'),
+      ('-19998..-1', 'Loss $1 to $19998'), ('1..4209995', "Total person's income in dollars")]),
+] + _weight_entries('PWGTP', "Person's Weight")
+
+
+def write_pums_dictionary(dict_file):
+    """Write a data dictionary for the synthetic PUMS variables in the 2018 text layout."""
+    Path(dict_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(dict_file, 'w', encoding='utf-8') as f:
+        f.write("2018 ACS PUMS DATA DICTIONARY\n\nHOUSING RECORD\n\n")
+        for entry in HOUSING_VARIABLES:
+            f.write(_dictionary_entry(*entry))
+        f.write("PERSON RECORD\n\n")
+        for entry in PERSON_VARIABLES:
+            f.write(_dictionary_entry(*entry))
+
+
+def _replicate_weights(rng, weights, prefix):
+    """80 replicate weights scattered around the full weight."""
+    scale = rng.uniform(.5, 1.5, (len(weights), 80))
+    replicates = np.maximum(0, np.round(weights[:, None] * scale)).astype('int64')
+    return pd.DataFrame(replicates, columns=[f"{prefix}{i}" for i in range(1, 81)])
+
+
+def generate_pums_chunk(rng, serials, group_quarters):
+    """
+    Generate the housing records of a block of households and the records of their persons.
+
+    Args:
+        rng (np.random.Generator): Random source
+        serials (np.ndarray): Sorted serial numbers (without year and record type)
+        group_quarters (np.ndarray): Whether each record is a group quarters unit
+
+    Returns:
+        tuple: (housing DataFrame, person DataFrame)
+    """
+    count = len(serials)
+    serialno = np.where(group_quarters, '2018GQ', '2018HU') + pd.Series(serials).map('{:07d}'.format).to_numpy(dtype=str)
+
+    persons_per_record = np.where(group_quarters, 1, rng.integers(1, 7, count))
+    vehicles = _choice(rng, VEH_DISTRIBUTION, count).astype('float64')
+    vehicles[group_quarters] = np.nan
+
+    housing_weight = np.where(group_quarters, 0, rng.integers(5, 200, count))
+    housing = pd.DataFrame({
+        'RT': 'H', 'SERIALNO': serialno, 'DIVISION': 5, 'PUMA': rng.choice([101, 102, 5701, 5702, 5703], count),
+        'REGION': 3, 'ST': 12, 'ADJINC': 1013097, 'WGTP': housing_weight, 'NP': persons_per_record,
+        'VEH': pd.array(vehicles, dtype='Float64').astype('Int64'),
+    })
+    housing = pd.concat([housing, _replicate_weights(rng, housing_weight, 'WGTP')], axis=1)
+
+    size = int(persons_per_record.sum())
+    person_weight = rng.integers(5, 200, size)
+    age = rng.integers(0, 95, size)
+    income = rng.lognormal(10.3, 1, size).round()
+    income[age < 15] = np.nan
+    persons = pd.DataFrame({
+        'RT': 'P',
+        'SERIALNO': np.repeat(serialno, persons_per_record),
+        'SPORDER': np.concatenate([np.arange(1, k + 1) for k in persons_per_record]) if count else [],
+        'PUMA': np.repeat(housing['PUMA'].to_numpy(), persons_per_record), 'ST': 12, 'ADJINC': 1013097,
+        'PWGTP': person_weight, 'AGEP': age, 'SEX': rng.integers(1, 3, size),
+        'HISP': _choice(rng, HISP_DISTRIBUTION, size).astype('int64'),
+        'PINCP': pd.array(income, dtype='Float64').astype('Int64'),
+    })
+    persons = pd.concat([persons, _replicate_weights(rng, person_weight, 'PWGTP')], axis=1)
+    return housing, persons
+
+
+def write_pums(pums_dir, households, seed=DEFAULT_SEED, chunksize=DEFAULT_CHUNKSIZE // 10):
+    """
+    Write a synthetic PUMS housing file, person file and data dictionary.
+
+    Args:
+        pums_dir (str): Output directory (gets the dictionary, csv_hfl/ and csv_pfl/)
+        households (int): Number of housing records
+        seed (int): Random seed
+        chunksize (int): Housing records generated per block
+    """
+    rng = np.random.default_rng(seed + 1)
+    pums_dir = Path(pums_dir)
+    write_pums_dictionary(pums_dir / PUMS_DICTIONARY)
+
+    # Sorted, distinct serial numbers, as in the published files
+    serials = np.sort(rng.choice(9_999_999, households, replace=False) + 1)
+    group_quarters = rng.random(households) < GROUP_QUARTERS
+
+    for csv_file in [pums_dir / HOUSING_CSV, pums_dir / PERSON_CSV]:
+        csv_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(pums_dir / HOUSING_CSV, 'w', encoding='utf-8', newline='') as housing_file, \
+            open(pums_dir / PERSON_CSV, 'w', encoding='utf-8', newline='') as person_file:
+        for start in range(0, max(households, 1), chunksize):
+            block = slice(start, start + chunksize)
+            housing, persons = generate_pums_chunk(rng, serials[block], group_quarters[block])
+            housing.to_csv(housing_file, index=False, header=start == 0)
+            persons.to_csv(person_file, index=False, header=start == 0)
+
+
+def write_cvap(csv_file, seed=DEFAULT_SEED):
+    """
+    Write a synthetic CVAP County.csv with every line of every Florida county.
+
+    Hillsborough County keeps its real population size; the other counties get
+    random sizes and race shares scattered around the Hillsborough shares.
+
+    Args:
+        csv_file (str): Output path
+        seed (int): Random seed
+    """
+    rng = np.random.default_rng(seed + 2)
+    race_lines = [(title, share) for title, share in CVAP_LINES if share is not None]
+    base_shares = np.array([share for _, share in race_lines])
+
+    rows = []
+    for fips, name in FLORIDA_COUNTIES:
+        if name == 'Hillsborough':
+            total, shares = HILLSBOROUGH_POPULATION, base_shares / base_shares.sum()
+        else:
+            total = int(rng.lognormal(11.8, 1.2))
+            shares = rng.dirichlet(base_shares * 200)
+
+        # Adults, citizens and citizens of voting age as fixed-ish fractions of the population
+        counts = {title: total * share for (title, _), share in zip(race_lines, shares)}
+        counts['Total'] = total
+        counts['Not Hispanic or Latino'] = total - counts['Hispanic or Latino']
+        fractions = {'tot': 1.0, 'adu': rng.uniform(.74, .82), 'cit': rng.uniform(.82, .95)}
+        fractions['cvap'] = fractions['adu'] * fractions['cit'] * rng.uniform(.95, 1.0)
+
+        for number, (title, _) in enumerate(CVAP_LINES, start=1):
+            row = {'geoname': f"{name} County, Florida", 'lntitle': title, 'geoid': f"0500000US12{fips:03d}",
+                   'lnnumber': number}
+            for prefix, fraction in fractions.items():
+                row[f"{prefix}_est"] = int(round(counts[title] * fraction, -1))
+                row[f"{prefix}_moe"] = int(rng.integers(5, 500))
+            rows.append(row)
+
+    Path(csv_file).parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(rows).to_csv(csv_file, index=False, encoding='latin-1')
+
+
+def generate(out_dir, rows=DEFAULT_ROWS, households=DEFAULT_HOUSEHOLDS, seed=DEFAULT_SEED,
+             chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Write every synthetic input file under out_dir, in the layout the scripts expect.
+
+    Args:
+        out_dir (str): Output directory
+        rows (int): Number of stops
+        households (int): Number of PUMS housing records
+        seed (int): Random seed
+        chunksize (int): Stops generated per block
+
+    Returns:
+        dict: Output file -> size in bytes
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    write_stops_csv(out_dir / STOPS_CSV, rows, seed, chunksize)
+    write_pums(out_dir / PUMS_DIR, households, seed)
+    write_cvap(out_dir / CVAP_CSV, seed)
+
+    outputs = [out_dir / STOPS_CSV, out_dir / PUMS_DIR / PUMS_DICTIONARY, out_dir / PUMS_DIR / HOUSING_CSV,
+               out_dir / PUMS_DIR / PERSON_CSV, out_dir / CVAP_CSV]
+    return {str(path): path.stat().st_size for path in outputs}
+
+
+def main():
+    """Main function to write the synthetic benchmark inputs."""
+    parser = argparse.ArgumentParser(description="Generate synthetic stops, PUMS and CVAP files for benchmarks")
+    parser.add_argument('--rows', type=parse_count, default=DEFAULT_ROWS,
+                        help=f"Stops to generate, e.g. 100k or 50M (default: {DEFAULT_ROWS:,})")
+    parser.add_argument('--households', type=parse_count, default=DEFAULT_HOUSEHOLDS,
+                        help=f"PUMS housing records to generate (default: {DEFAULT_HOUSEHOLDS:,})")
+    parser.add_argument('--out', default='synthetic-data', help="Output directory (default: synthetic-data)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Random seed")
+    parser.add_argument('--chunksize', type=parse_count, default=DEFAULT_CHUNKSIZE,
+                        help=f"Stops generated per block (default: {DEFAULT_CHUNKSIZE:,})")
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} stops and {args.households:,} households in {args.out}/...")
+    start = time.perf_counter()
+    outputs = generate(args.out, args.rows, args.households, args.seed, args.chunksize)
+    for path, size in outputs.items():
+        print(f"  - {path} ({size / 1e6:,.1f} MB)")
+    print(f"✅ Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,12 @@ Script to update PUMS CSV headers using the data dictionary.
 This script reads the PUMS data dictionary and updates CSV headers with full descriptions.
 """
 
-import csv
 import re
 import sys
 from pathlib import Path
 
+from update_pums_headers_improved import rewrite_csv_header
+
 def parse_data_dictionary(dict_file):
     """
     Parse the PUMS data dictionary to extract variable names and descriptions.
@@ -59,6 +60,8 @@ def update_csv_headers(csv_file, var_descriptions, output_file=None):
     """
     Update CSV headers with full descriptions from the data dictionary.
     
+    Only the header line is parsed; the data rows are streamed through untouched.
+    
     Args:
         csv_file (str): Path to the CSV file
         var_descriptions (dict): Mapping of variable names to descriptions
@@ -67,36 +70,27 @@ def update_csv_headers(csv_file, var_descriptions, output_file=None):
     if output_file is None:
         output_file = csv_file
     
-    # Read the CSV file
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        rows = list(reader)
+    def rename_header(header):
+        new_header = []
+        
+        # Update each column name
+        for col in header:
+            if col in var_descriptions:
+                # Use the description from the dictionary
+                new_header.append(f"{col}_{var_descriptions[col]}")
+            else:
+                # Keep original if not found in dictionary
+                new_header.append(col)
+        
+        return new_header
+    
+    result = rewrite_csv_header(csv_file, rename_header, output_file)
     
-    if not rows:
+    if result is None:
         print(f"Error: {csv_file} is empty")
         return
     
-    # Get the header row
-    header = rows[0]
-    new_header = []
-    
-    # Update each column name
-    for col in header:
-        if col in var_descriptions:
-            # Use the description from the dictionary
-            new_header.append(f"{col}_{var_descriptions[col]}")
-        else:
-            # Keep original if not found in dictionary
-            new_header.append(col)
-    
-    # Replace the header
-    rows[0] = new_header
-    
-    # Write the updated CSV
-    with open(output_file, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
-    
+    header, _ = result
     print(f"Updated headers in {output_file}")
     print(f"Found {len([col for col in header if col in var_descriptions])} out of {len(header)} columns in dictionary")
 
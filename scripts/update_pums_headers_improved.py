@@ -4,64 +4,116 @@ Improved script to update PUMS CSV headers using the data dictionary.
 This script correctly parses the PUMS data dictionary format and updates CSV headers.
 """
 
+import argparse
 import csv
+import io
+import os
 import re
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
+from instrumentation import add_instrumentation_arguments, instrumented_run, stage, timed
+from pums_dictionary import descriptions, load_dictionary
+
 def parse_data_dictionary(dict_file):
     """
     Parse the PUMS data dictionary to extract variable names and descriptions.
     
+    The parsed dictionary is cached (see pums_dictionary.py), so the text is only
+    scanned again when the dictionary file changes.
+    
     Args:
         dict_file (str): Path to the data dictionary file
         
     Returns:
         dict: Mapping of variable names to their descriptions
     """
-    var_descriptions = {}
+    return descriptions(load_dictionary(dict_file))
+
+# Block size for copying the CSV body; large blocks keep the copy at disk speed
+COPY_BLOCK_SIZE = 16 * 1024 * 1024
+
+def rewrite_csv_header(csv_file, rename_header, output_file=None):
+    """
+    Rewrite only the header line of a CSV, streaming the body through unchanged.
     
-    with open(dict_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+    The header is parsed and rewritten with the csv module; the remaining bytes
+    are copied in large blocks without being re-tokenized, so memory use is
+    constant regardless of file size. Output is written to a temporary file in
+    the destination directory and atomically renamed into place.
     
-    # Split content into lines
-    lines = content.split('\n')
+    Args:
+        csv_file (str): Path to the CSV file
+        rename_header (callable): Maps the list of column names to the new list
+        output_file (str): Output file path (if None, rewrites csv_file in place)
+        
+    Returns:
+        tuple: (original header, new header), or None if the file is empty
+    """
+    if output_file is None:
+        output_file = csv_file
+    output_dir = Path(output_file).resolve().parent
     
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
+    with open(csv_file, 'rb') as src:
+        header_line = src.readline()
+        if not header_line:
+            return None
         
-        # Look for variable definitions (format: VARNAME followed by data type)
-        # Pattern: VARNAME followed by whitespace, then data type and length
-        match = re.match(r'^([A-Z][A-Z0-9]+)\s+(\w+)\s+(\d+)$', line)
+        # Keep the file's own line terminator for the rewritten header
+        stripped = header_line.rstrip(b'\r\n')
+        newline = header_line[len(stripped):]
         
-        if match:
-            var_name = match.group(1)
-            data_type = match.group(2)
-            length = match.group(3)
-            
-            # Look for the description on the next line
-            if i + 1 < len(lines):
-                next_line = lines[i + 1].strip()
-                if next_line and not next_line.startswith('.'):
-                    # This is the description
-                    description = next_line
-                    var_descriptions[var_name] = description
-                    
-                    # Skip the value codes that follow (lines starting with spaces and containing dots)
-                    i += 2
-                    while i < len(lines) and lines[i].strip().startswith(' ') and '.' in lines[i]:
-                        i += 1
-                    continue
+        header = next(csv.reader([stripped.decode('utf-8')]))
+        new_header = rename_header(header)
         
-        i += 1
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='').writerow(new_header)
+        
+        fd, tmp_file = tempfile.mkstemp(dir=output_dir, prefix=f".{Path(output_file).name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as dst:
+                dst.write(buffer.getvalue().encode('utf-8') + newline)
+                shutil.copyfileobj(src, dst, COPY_BLOCK_SIZE)
+            shutil.copymode(csv_file, tmp_file)
+            os.replace(tmp_file, output_file)
+        except BaseException:
+            os.unlink(tmp_file)
+            raise
+    
+    return header, new_header
+
+def describe_column(col, var_descriptions):
+    """
+    Build the descriptive column name for a PUMS variable.
     
-    return var_descriptions
+    Args:
+        col (str): Original column name
+        var_descriptions (dict): Mapping of variable names to descriptions
+        
+    Returns:
+        str: "<VAR>_<cleaned description>", or col if it is not in the dictionary
+    """
+    if col not in var_descriptions:
+        # Keep original if not found in dictionary
+        return col
+    
+    # Use the description from the dictionary
+    # Clean up the description for use as a column name
+    description = var_descriptions[col]
+    # Replace spaces and special characters with underscores
+    clean_description = re.sub(r'[^\w\s-]', '', description)
+    clean_description = re.sub(r'\s+', '_', clean_description)
+    return f"{col}_{clean_description}"
 
+@timed('write')
 def update_csv_headers(csv_file, var_descriptions, output_file=None):
     """
     Update CSV headers with full descriptions from the data dictionary.
     
+    Only the header line is parsed; the data rows are streamed through untouched.
+    
     Args:
         csv_file (str): Path to the CSV file
         var_descriptions (dict): Mapping of variable names to descriptions
@@ -70,85 +122,66 @@ def update_csv_headers(csv_file, var_descriptions, output_file=None):
     if output_file is None:
         output_file = csv_file
     
-    # Read the CSV file
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        rows = list(reader)
+    result = rewrite_csv_header(
+        csv_file, lambda header: [describe_column(col, var_descriptions) for col in header], output_file)
     
-    if not rows:
+    if result is None:
         print(f"Error: {csv_file} is empty")
         return
     
-    # Get the header row
-    header = rows[0]
-    new_header = []
-    
-    # Update each column name
-    for col in header:
-        if col in var_descriptions:
-            # Use the description from the dictionary
-            # Clean up the description for use as a column name
-            description = var_descriptions[col]
-            # Replace spaces and special characters with underscores
-            clean_description = re.sub(r'[^\w\s-]', '', description)
-            clean_description = re.sub(r'\s+', '_', clean_description)
-            new_header.append(f"{col}_{clean_description}")
-        else:
-            # Keep original if not found in dictionary
-            new_header.append(col)
-    
-    # Replace the header
-    rows[0] = new_header
-    
-    # Write the updated CSV
-    with open(output_file, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
-    
+    header, _ = result
     print(f"Updated headers in {output_file}")
     print(f"Found {len([col for col in header if col in var_descriptions])} out of {len(header)} columns in dictionary")
 
 def main():
     """Main function to update PUMS CSV headers."""
+    parser = argparse.ArgumentParser(description="Update PUMS CSV headers using the data dictionary")
+    parser.add_argument('--in-place', action='store_true',
+                        help="Rewrite the original CSV files instead of writing *_updated_headers.csv copies")
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+    
     # File paths
     dict_file = "PUMS-2018-data/PUMS_Data_Dictionary_2018.txt"
     housing_file = "PUMS-2018-data/csv_hfl/psam_h12.csv"
     person_file = "PUMS-2018-data/csv_pfl/psam_p12.csv"
     
-    # Check if files exist
-    if not Path(dict_file).exists():
-        print(f"Error: Data dictionary file not found: {dict_file}")
-        sys.exit(1)
-    
-    if not Path(housing_file).exists():
-        print(f"Error: Housing CSV file not found: {housing_file}")
-        sys.exit(1)
-    
-    if not Path(person_file).exists():
-        print(f"Error: Person CSV file not found: {person_file}")
-        sys.exit(1)
-    
-    # Parse the data dictionary
-    print("Parsing PUMS data dictionary...")
-    var_descriptions = parse_data_dictionary(dict_file)
-    print(f"Found {len(var_descriptions)} variable descriptions")
-    
-    # Show some examples
-    print("\nExample variable descriptions:")
-    for i, (var, desc) in enumerate(list(var_descriptions.items())[:5]):
-        print(f"  {var}: {desc}")
-    
-    # Update housing file headers
-    print("\nUpdating housing file headers...")
-    update_csv_headers(housing_file, var_descriptions, 
-                      housing_file.replace('.csv', '_updated_headers.csv'))
-    
-    # Update person file headers
-    print("\nUpdating person file headers...")
-    update_csv_headers(person_file, var_descriptions, 
-                      person_file.replace('.csv', '_updated_headers.csv'))
-    
-    print("\nHeader update complete!")
+    with instrumented_run('update_pums_headers_improved', args.run_log, args.profile):
+        # Check if files exist
+        if not Path(dict_file).exists():
+            print(f"Error: Data dictionary file not found: {dict_file}")
+            sys.exit(1)
+    
+        if not Path(housing_file).exists():
+            print(f"Error: Housing CSV file not found: {housing_file}")
+            sys.exit(1)
+    
+        if not Path(person_file).exists():
+            print(f"Error: Person CSV file not found: {person_file}")
+            sys.exit(1)
+    
+        # Parse the data dictionary
+        print("Parsing PUMS data dictionary...")
+        with stage('load'):
+            var_descriptions = parse_data_dictionary(dict_file)
+        print(f"Found {len(var_descriptions)} variable descriptions")
+    
+        # Show some examples
+        print("\nExample variable descriptions:")
+        for i, (var, desc) in enumerate(list(var_descriptions.items())[:5]):
+            print(f"  {var}: {desc}")
+    
+        # Update housing file headers
+        print("\nUpdating housing file headers...")
+        update_csv_headers(housing_file, var_descriptions, 
+                          None if args.in_place else housing_file.replace('.csv', '_updated_headers.csv'))
+    
+        # Update person file headers
+        print("\nUpdating person file headers...")
+        update_csv_headers(person_file, var_descriptions, 
+                          None if args.in_place else person_file.replace('.csv', '_updated_headers.csv'))
+    
+        print("\nHeader update complete!")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Violation categorization rules for the police stops data.
+Violations are categorized once per unique description and broadcast back to rows through categorical codes.
+Results are persisted in a lookup table so later runs only classify descriptions they have not seen.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from stops_data import CACHE_DIR
+
+LOOKUP_FILE = str(Path(CACHE_DIR) / 'violation_lookup.json')
+
+# Main statute code: first run of 3-6 digits in the description
+CODE_PATTERN = r'(\d{3,6})'
+
+UNKNOWN_CATEGORY = "Unknown"
+OTHER_CATEGORY = "Other Violations"
+
+# Ordered rules: the first category with a matching term wins
+VIOLATION_RULES = [
+    ("Seat Belt Violations", ['belted', 'belt', 'seat belt']),
+    ("Red Light Violations", ['red light', 'red lt', 'fail to stop']),
+    ("Speed Violations", ['speed', 'speeding']),
+    ("License Violations", ['dl', 'license', 'driving license']),
+    ("Registration Violations", ['reg', 'registration', 'motor vehicle reg']),
+    ("Insurance Violations", ['insurance', 'insured', 'proof of ins']),
+    ("Equipment Violations", ['equipment', 'light', 'signal']),
+    ("Traffic Control Violations", ['yield', 'stop sign', 'traffic control']),
+    ("DUI/DWI Violations", ['dui', 'dwi', 'alcohol', 'intoxicated']),
+    ("Reckless Driving", ['reckless', 'careless']),
+    ("Other Traffic Violations", ['traffic', 'highway', 'road']),
+]
+
+# One compiled substring alternation per rule, in priority order
+COMPILED_RULES = [
+    (category, re.compile('|'.join(re.escape(term) for term in terms)))
+    for category, terms in VIOLATION_RULES
+]
+
+
+def categorize_violation(violation_text):
+    """
+    Categorize one violation description (the per-row reference implementation).
+
+    classify_violations() must label every row exactly as this function does; it is
+    kept as the oracle for that equivalence and is not used on the data path.
+    """
+    if pd.isna(violation_text):
+        return UNKNOWN_CATEGORY
+
+    violation_lower = violation_text.lower()
+
+    for category, pattern in COMPILED_RULES:
+        if pattern.search(violation_lower):
+            return category
+
+    return OTHER_CATEGORY
+
+
+def categorize_unique(descriptions):
+    """
+    Categorize an array of distinct, non-null violation descriptions.
+
+    Args:
+        descriptions (array-like): Unique violation descriptions
+
+    Returns:
+        np.ndarray: Category label for each description
+    """
+    lowered = pd.Series(descriptions, dtype=object).str.lower()
+    labels = np.full(len(lowered), OTHER_CATEGORY, dtype=object)
+    unassigned = np.ones(len(lowered), dtype=bool)
+
+    for category, pattern in COMPILED_RULES:
+        hit = unassigned & lowered.str.contains(pattern.pattern, regex=True).to_numpy(dtype=bool)
+        labels[hit] = category
+        unassigned &= ~hit
+
+    return labels
+
+
+def ruleset_version():
+    """
+    Fingerprint the categorization rules and code pattern.
+
+    Any edit to VIOLATION_RULES, the fallback labels or CODE_PATTERN changes the
+    version, which invalidates previously persisted lookup tables.
+
+    Returns:
+        str: Short hex digest identifying the current ruleset
+    """
+    spec = json.dumps([VIOLATION_RULES, OTHER_CATEGORY, UNKNOWN_CATEGORY, CODE_PATTERN])
+    return hashlib.sha256(spec.encode('utf-8')).hexdigest()[:16]
+
+
+def load_lookup(lookup_file=LOOKUP_FILE):
+    """
+    Load the persisted violation lookup table.
+
+    Args:
+        lookup_file (str): Path to the lookup table
+
+    Returns:
+        dict: Mapping of violation description to [category, main code]; empty
+        if the file is missing or was built with a different ruleset
+    """
+    try:
+        with open(lookup_file, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if payload.get('ruleset_version') != ruleset_version():
+        print("Violation rules changed, rebuilding lookup table...")
+        return {}
+
+    return payload['violations']
+
+
+def save_lookup(table, lookup_file=LOOKUP_FILE):
+    """
+    Persist the violation lookup table atomically.
+
+    Args:
+        table (dict): Mapping of violation description to [category, main code]
+        lookup_file (str): Path to the lookup table
+    """
+    Path(lookup_file).parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = Path(f"{lookup_file}.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'ruleset_version': ruleset_version(), 'violations': table}, f)
+    os.replace(tmp_file, lookup_file)
+
+
+def classify_violations(violations, lookup_file=LOOKUP_FILE):
+    """
+    Categorize violations and extract their main codes through the persisted lookup table.
+
+    Distinct descriptions already in the table are resolved by a hash lookup;
+    only new descriptions are run through the rules, and they are added to the table.
+
+    Args:
+        violations (pd.Series): Violation descriptions (object, string or categorical)
+        lookup_file (str): Path to the lookup table
+
+    Returns:
+        pd.DataFrame: 'violation_category' (categorical) and 'violation_code_main'
+        columns aligned with the input index
+    """
+    codes, uniques = pd.factorize(violations)
+    uniques = np.asarray(uniques, dtype=object)
+
+    table = load_lookup(lookup_file)
+    is_new = np.fromiter((u not in table for u in uniques), dtype=bool, count=len(uniques))
+
+    if is_new.any():
+        new = uniques[is_new]
+        new_codes = pd.Series(new, dtype=object).str.extract(CODE_PATTERN)[0]
+        for description, category, code in zip(new, categorize_unique(new), new_codes):
+            table[description] = [category, None if pd.isna(code) else code]
+        save_lookup(table, lookup_file)
+        print(f"Classified {is_new.sum():,} new violation descriptions "
+              f"({len(uniques) - is_new.sum():,} from lookup table)")
+
+    resolved = [table[u] for u in uniques]
+    categories = np.array([entry[0] for entry in resolved] + [UNKNOWN_CATEGORY], dtype=object)
+    main_codes = np.array([np.nan if entry[1] is None else entry[1] for entry in resolved] + [np.nan],
+                          dtype=object)
+
+    # Missing descriptions factorize to -1 and map onto the trailing Unknown entry
+    codes = np.where(codes < 0, len(categories) - 1, codes)
+
+    label_codes, labels = pd.factorize(categories)
+    category = pd.Categorical.from_codes(label_codes[codes], categories=labels)
+    return pd.DataFrame({
+        'violation_category': pd.Series(category, index=violations.index).cat.remove_unused_categories(),
+        'violation_code_main': pd.Series(main_codes[codes], index=violations.index, dtype=object),
+    })
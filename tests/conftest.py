@@ -0,0 +1,172 @@
+"""Shared fixtures for the analysis script tests."""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The scripts import each other by module name, as they do when run from scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+# Charts are drawn without a display
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+STOPS_ROWS = 2000
+
+# Raw values of the categorical stops columns (None is a missing value), with the
+# spelling variants found in the published file
+STOPS_VALUES = {
+    'subject_race': ['white', 'black', 'hispanic', 'asian/pacific islander', 'other', 'unknown'],
+    'subject_sex': ['male', 'female', None],
+    'officer_id_hash': ['a1b2c3d4e5', 'f6a7b8c9d0', '0e1f2a3b4c', '5d6e7f8a9b'],
+    'department_name': ['Tampa Police Department', "Hillsborough County Sheriff's Office",
+                        'Florida Highway Patrol', 'Temple Terrace Police Department',
+                        'Tampa Police Department|Tampa Police Department'],
+    'type': ['vehicular', 'pedestrian'],
+    'vehicle_color': ['BLK', 'WHI', 'SIL', 'RED', None],
+    'vehicle_make': ['TOYT', 'FORD', 'CHEV', 'HOND', None],
+    'vehicle_model': ['CAMRY', 'F150', 'CIVIC', None],
+    'vehicle_registration_state': ['FL', 'GA', 'NY', 'fl', None],
+}
+
+VIOLATIONS = [
+    'UNLAWFUL SPEED 316.183(2)', 'DRIVER NOT BELTED 316.614(4)', 'RED LIGHT CAMERA 316.075(1)(c)1',
+    'NO VALID DL 322.03(1)', 'EXPIRED REG MORE THAN 6 MONTHS 320.07(3)(b)', 'NO PROOF OF INSURANCE 316.646(1)',
+    'CARELESS DRIVING 316.1925(1)', 'FAIL TO YIELD RIGHT OF WAY 316.121', 'DUI 316.193(1)',
+    'DEFECTIVE EQUIPMENT 316.610', 'WINDOW TINT 316.2953', 'HIGHWAY MINIMUM SPEED 316.183(5)', None,
+]
+
+OUTCOMES = ['citation', 'warning', 'arrest', None]
+
+# CVAP race lines with their approximate population shares
+CVAP_SHARES = {
+    'White Alone': .47,
+    'Black or African American Alone': .16,
+    'Asian Alone': .04,
+    'American Indian or Alaska Native Alone': .002,
+    'Native Hawaiian or Other Pacific Islander Alone': .001,
+    'Hispanic or Latino': .30,
+}
+CVAP_FILE = 'CVAP_2019-2023_ACS_csv_files/County.csv'
+
+# PUMS variables in the 2018 data dictionary layout: (name, type, length, description, value labels)
+PUMS_VARIABLES = [
+    ('RT', 'Character', 1, 'Record Type', [('H', 'Housing Record or Group Quarters Unit'), ('P', 'Person Record')]),
+    ('SERIALNO', 'Character', 13, 'Housing unit/GQ person serial number',
+     [('2018GQ0000001..2018GQ9999999', 'GQ Unique identifier'),
+      ('2018HU0000001..2018HU9999999', 'HU Unique identifier')]),
+    ('VEH', 'Numeric', 1, 'Vehicles (1 ton or less) available',
+     [('b', 'N/A (GQ/vacant)'), ('0', 'No vehicles'), ('1', '1 vehicle'), ('2', '2 vehicles')]),
+    ('AGEP', 'Numeric', 2, 'Age', [('0', 'Under 1 year'), ('1..99', '1 to 99 years (Top-coded)')]),
+]
+
+
+def make_stops(rows, seed=0):
+    """
+    Random stops in the published Tampa column layout, as they appear in the CSV.
+
+    Args:
+        rows (int): Number of stops
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: Raw column values, raw_row_number counting from 1
+    """
+    rng = np.random.default_rng(seed)
+
+    def choice(values):
+        return np.array(values, dtype=object)[rng.integers(0, len(values), rows)]
+
+    dates = choice(pd.date_range('2003-01-01', '2018-12-31').strftime('%Y-%m-%d').to_list())
+    dates[rng.random(rows) < .01] = None
+    outcome = choice(OUTCOMES)
+    vehicle_year = pd.array(rng.integers(1985, 2020, rows), dtype='Int16')
+    vehicle_year[rng.random(rows) < .05] = pd.NA
+    values = {col: choice(options) for col, options in STOPS_VALUES.items()}
+
+    return pd.DataFrame({
+        'raw_row_number': np.arange(1, rows + 1),
+        'date': dates,
+        'time': [f"{hour:02d}:{minute:02d}:00" for hour, minute in zip(rng.integers(0, 24, rows),
+                                                                      rng.integers(0, 60, rows))],
+        'location': choice(['N DALE MABRY HWY / W KENNEDY BLVD', 'E FOWLER AVE / N 56TH ST']),
+        'lat': (27.95 + rng.normal(0, .06, rows)).round(6),
+        'lng': (-82.46 + rng.normal(0, .06, rows)).round(6),
+        'subject_race': values['subject_race'],
+        'subject_sex': values['subject_sex'],
+        'officer_id_hash': values['officer_id_hash'],
+        'department_name': values['department_name'],
+        'type': values['type'],
+        'violation': choice(VIOLATIONS),
+        'arrest_made': outcome == 'arrest',
+        'citation_issued': outcome == 'citation',
+        'warning_issued': outcome == 'warning',
+        'outcome': outcome,
+        'vehicle_color': values['vehicle_color'],
+        'vehicle_make': values['vehicle_make'],
+        'vehicle_model': values['vehicle_model'],
+        'vehicle_registration_state': values['vehicle_registration_state'],
+        'vehicle_year': vehicle_year,
+    })
+
+
+def make_cvap(counties=('Hillsborough', 'Pinellas', 'Pasco'), seed=0):
+    """
+    Random CVAP county lines in the layout of the published County.csv.
+
+    Args:
+        counties (tuple): County names (Florida)
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: One row per county and line title
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for county in counties:
+        total = int(rng.integers(200_000, 1_500_000))
+        counts = {title: total * share * rng.uniform(.8, 1.2) for title, share in CVAP_SHARES.items()}
+        counts['Not Hispanic or Latino'] = total - counts['Hispanic or Latino']
+        counts['Total'] = total
+        for title, count in counts.items():
+            rows.append({'geoname': f"{county} County, Florida", 'lntitle': title,
+                         'tot_est': int(count), 'adu_est': int(count * .78),
+                         'cit_est': int(count * .9), 'cvap_est': int(count * .7)})
+    return pd.DataFrame(rows)
+
+
+def write_pums_dictionary(dict_file, variables=PUMS_VARIABLES):
+    """Write a PUMS data dictionary in the 2018 text layout."""
+    Path(dict_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(dict_file, 'w', encoding='utf-8') as f:
+        f.write("2018 ACS PUMS DATA DICTIONARY\n\n")
+        for name, data_type, length, description, values in variables:
+            f.write(f"{name:<12}{data_type} {length}\n    {description}\n")
+            f.write(''.join(f"          {code} .{label}\n" for code, label in values) + '\n')
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    """Run every test in its own directory, so the relative cache paths stay inside it."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def stops_csv(work_dir):
+    """Small random stops CSV in the published Tampa layout."""
+    csv_file = work_dir / 'stops.csv'
+    make_stops(STOPS_ROWS, seed=1).to_csv(csv_file, index=False)
+    return csv_file
+
+
+@pytest.fixture
+def cvap_csv(work_dir):
+    """CVAP County.csv at the relative path the CVAP analysis reads."""
+    csv_file = work_dir / CVAP_FILE
+    csv_file.parent.mkdir(parents=True)
+    make_cvap().to_csv(csv_file, index=False, encoding='latin-1')
+    return csv_file
@@ -0,0 +1,93 @@
+"""Chart rendering: pool output, the input hash and the skip-unchanged cache."""
+
+import pandas as pd
+
+import charts
+from charts import ChartJob, chart_hash, recorded_hash, render_charts
+
+DPI = 20
+
+
+def _race_job(output_file='race.png', counts=(50, 30, 20)):
+    race_counts = pd.Series(counts, index=['white', 'black', 'hispanic'], name='count')
+    return ChartJob(charts.plot_race_distribution, {'race_counts': race_counts}, output_file)
+
+
+def _ownership_job():
+    percentages = pd.Series([60.0, 30.0, 10.0], index=['1', '2', '3+'])
+    return ChartJob(charts.plot_latino_car_ownership_basic, {
+        'ownership_latino': percentages, 'ownership_non_latino': percentages,
+        'no_vehicle': [5.0, 4.0], 'multiple_vehicles': [40.0, 45.0], 'age_vehicle_pivot': None,
+    }, 'ownership.png')
+
+
+def _jobs(directory):
+    category_counts = pd.Series([40, 25, 10], index=['Speed Violations', 'Seat Belt Violations', 'Unknown'])
+    return [
+        _race_job(f"{directory}/race.png"),
+        ChartJob(charts.plot_violation_categories, {'category_counts': category_counts},
+                 f"{directory}/categories.png", 'seaborn-v0_8', 'husl'),
+        ChartJob(charts.plot_violation_categories_pie, {'category_counts': category_counts},
+                 f"{directory}/categories_pie.png"),
+    ]
+
+
+def test_pool_matches_serial(work_dir):
+    serial = render_charts(_jobs('serial'), workers=1, dpi=DPI)
+    pooled = render_charts(_jobs('pooled'), workers=3, dpi=DPI)
+
+    assert serial == [job.output_file for job in _jobs('serial')]
+    assert pooled == [job.output_file for job in _jobs('pooled')]
+    for serial_file, pooled_file in zip(serial, pooled):
+        assert (work_dir / serial_file).read_bytes() == (work_dir / pooled_file).read_bytes()
+
+
+def test_hash_is_stable():
+    assert chart_hash(_race_job(), DPI) == chart_hash(_race_job(), DPI)
+
+
+def test_hash_covers_inputs_and_dpi():
+    base = chart_hash(_race_job(), DPI)
+    assert chart_hash(_race_job(counts=(50, 30, 21)), DPI) != base
+    assert chart_hash(_race_job(), DPI + 1) != base
+    assert chart_hash(_race_job()._replace(palette='husl'), DPI) != base
+
+
+def test_unchanged_chart_skipped(work_dir, capsys):
+    render_charts([_race_job()], workers=1, dpi=DPI)
+    assert recorded_hash('race.png') == chart_hash(_race_job(), DPI)
+    modified = (work_dir / 'race.png').stat().st_mtime_ns
+
+    capsys.readouterr()
+    render_charts([_race_job()], workers=1, dpi=DPI)
+    assert 'Skipping 1 unchanged chart(s)' in capsys.readouterr().out
+    assert (work_dir / 'race.png').stat().st_mtime_ns == modified
+
+    render_charts([_race_job(counts=(10, 30, 20))], workers=1, dpi=DPI)
+    assert recorded_hash('race.png') == chart_hash(_race_job(counts=(10, 30, 20)), DPI)
+
+
+
+def test_hash_covers_chart_helpers(monkeypatch):
+    base = chart_hash(_ownership_job(), DPI)
+
+    def _labeled_bars(ax, values, ylabel, title):
+        ax.bar(['Latino', 'Non-Latino'], values)
+
+    _labeled_bars.__module__ = 'charts'
+    monkeypatch.setattr(charts, '_labeled_bars', _labeled_bars)
+    assert chart_hash(_ownership_job(), DPI) != base
+
+
+def test_unchanged_chart_skipped(work_dir, capsys):
+    render_charts([_race_job()], workers=1, dpi=DPI)
+    assert recorded_hash('race.png') == chart_hash(_race_job(), DPI)
+    modified = (work_dir / 'race.png').stat().st_mtime_ns
+
+    capsys.readouterr()
+    render_charts([_race_job()], workers=1, dpi=DPI)
+    assert 'Skipping 1 unchanged chart(s)' in capsys.readouterr().out
+    assert (work_dir / 'race.png').stat().st_mtime_ns == modified
+
+    render_charts([_race_job(counts=(10, 30, 20))], workers=1, dpi=DPI)
+    assert recorded_hash('race.png') == chart_hash(_race_job(counts=(10, 30, 20)), DPI)
@@ -0,0 +1,153 @@
+"""CVAP disparity ratios and their result cache: hits, invalidation and LRU eviction."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cvap_disparity
+from conftest import make_cvap
+from cvap_disparity import RACE_MAPPING, all_disparities, compute_disparity, disparity, evict, load_cvap, read_cvap
+from stops_data import read_stops_csv
+from stops_schema import clean_department
+
+
+def _assert_same(left, right):
+    assert left.keys() == right.keys()
+    for name, value in left.items():
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(value, right[name], check_dtype=False, check_categorical=False)
+        elif isinstance(value, pd.Series):
+            pd.testing.assert_series_equal(value, right[name], check_dtype=False, check_index_type=False,
+                                           check_categorical=False)
+        else:
+            assert value == right[name], name
+
+
+def _pair_ratios(df, county_cvap, departments):
+    """Disparity ratios of one department set against one county, race by race."""
+    stops = df[departments]
+    total_row = county_cvap[county_cvap['lntitle'] == 'Total'].iloc[0]
+    ratios = {}
+    for police_race, cvap_race in RACE_MAPPING.items():
+        if cvap_race not in county_cvap['lntitle'].values:
+            continue
+        police_pct = (stops['subject_race'] == police_race).sum() / len(stops) * 100
+        cvap_pct = county_cvap.loc[county_cvap['lntitle'] == cvap_race, 'cvap_est'].iloc[0] / total_row['cvap_est'] * 100
+        ratios[police_race.title()] = police_pct / cvap_pct
+    return ratios
+
+
+def test_all_disparities_match_pairwise(stops_csv, cvap_csv):
+    df = read_stops_csv(stops_csv, columns=cvap_disparity.COLUMNS)
+    cvap_data = read_cvap(cvap_csv)
+
+    table = all_disparities(df, cvap_data)
+
+    clean = df['department_name'].map(clean_department, na_action='ignore')
+    mapped_races = cvap_data['lntitle'].isin(RACE_MAPPING.values()).groupby(cvap_data['geoname']).sum().iloc[0]
+    assert len(table) == cvap_data['geoname'].nunique() * clean.nunique() * mapped_races
+    for (county, department), rows in table.groupby(['Geography', 'Department']):
+        expected = _pair_ratios(df, cvap_data[cvap_data['geoname'] == county], (clean == department).to_numpy())
+        np.testing.assert_allclose(rows.set_index('Race')['Disparity_Ratio'].reindex(list(expected)),
+                                   list(expected.values()))
+
+
+def test_compute_disparity_counts_missing_race(stops_csv, cvap_csv):
+    df = read_stops_csv(stops_csv, columns=cvap_disparity.COLUMNS)
+    df.loc[df.index[::7], 'subject_race'] = None
+    county_cvap = load_cvap(csv_file=cvap_csv)
+
+    results = compute_disparity(df, county_cvap)
+
+    in_set = df['department_name'].str.contains(cvap_disparity.HILLSBOROUGH_DEPARTMENTS, na=False).to_numpy()
+    assert results['total_stops'] == in_set.sum()
+    expected = _pair_ratios(df, county_cvap, in_set)
+    comparison = results['comparison_df'].set_index('Race')
+    np.testing.assert_allclose(comparison['Disparity_Ratio'], [expected[race] for race in comparison.index])
+
+
+@pytest.fixture
+def compute_calls(monkeypatch):
+    """Count the disparity computations (cache misses)."""
+    calls = []
+
+    def recording(*args, **kwargs):
+        calls.append(args[2:])
+        return compute_disparity(*args, **kwargs)
+
+    monkeypatch.setattr(cvap_disparity, 'compute_disparity', recording)
+    return calls
+
+
+def _entries(results_dir):
+    return sorted(path.name for path in results_dir.iterdir() if (path / 'entry.json').exists())
+
+
+def test_cached_result_matches_computation(stops_csv, cvap_csv, compute_calls, work_dir):
+    expected = compute_disparity(read_stops_csv(stops_csv, columns=cvap_disparity.COLUMNS), load_cvap(csv_file=cvap_csv))
+
+    first = disparity(cvap_csv=cvap_csv, stops_csv=stops_csv, results_dir=work_dir / 'results')
+    second = disparity(cvap_csv=cvap_csv, stops_csv=stops_csv, results_dir=work_dir / 'results')
+
+    assert len(compute_calls) == 1
+    _assert_same(first, expected)
+    _assert_same(second, expected)
+
+    disparity(cvap_csv=cvap_csv, stops_csv=stops_csv, results_dir=work_dir / 'results', refresh=True)
+    assert len(compute_calls) == 2
+
+
+def test_cvap_change_invalidates(stops_csv, cvap_csv, compute_calls, work_dir):
+    results_dir = work_dir / 'results'
+    before = disparity(cvap_csv=cvap_csv, stops_csv=stops_csv, results_dir=results_dir)
+
+    # A new vintage of the CVAP file (mtime moved on in case the rewrite lands in the same tick)
+    mtime = os.stat(cvap_csv).st_mtime_ns
+    make_cvap(seed=1).to_csv(cvap_csv, index=False, encoding='latin-1')
+    os.utime(cvap_csv, ns=(mtime + 10**9, mtime + 10**9))
+
+    after = disparity(cvap_csv=cvap_csv, stops_csv=stops_csv, results_dir=results_dir)
+
+    assert len(compute_calls) == 2
+    assert after['cvap_total'] != before['cvap_total']
+    assert after['total_stops'] == before['total_stops']
+    assert len(_entries(results_dir)) == 2
+
+
+def test_other_county_is_a_separate_entry(stops_csv, cvap_csv, compute_calls, work_dir):
+    results_dir = work_dir / 'results'
+    for county in ['Hillsborough County, Florida', 'Pinellas County, Florida', 'Hillsborough County, Florida']:
+        disparity(county=county, cvap_csv=cvap_csv, stops_csv=stops_csv, results_dir=results_dir)
+
+    assert len(compute_calls) == 2
+    assert len(_entries(results_dir)) == 2
+
+
+def test_hit_marks_entry_recently_used(stops_csv, cvap_csv, work_dir):
+    results_dir = work_dir / 'results'
+    disparity(cvap_csv=cvap_csv, stops_csv=stops_csv, results_dir=results_dir)
+    entry_file = results_dir / _entries(results_dir)[0] / 'entry.json'
+    os.utime(entry_file, ns=(0, 0))
+
+    disparity(cvap_csv=cvap_csv, stops_csv=stops_csv, results_dir=results_dir)
+
+    assert entry_file.stat().st_mtime_ns > 0
+
+
+def test_evict_least_recently_used(work_dir):
+    results_dir = work_dir / 'results'
+    for name, used in [('a', 3), ('b', 1), ('c', 4), ('d', 2)]:
+        (results_dir / name).mkdir(parents=True)
+        (results_dir / name / 'entry.json').write_text('{}', encoding='utf-8')
+        os.utime(results_dir / name / 'entry.json', ns=(used * 10**9, used * 10**9))
+
+    evict(results_dir, 2)
+    assert _entries(results_dir) == ['a', 'c']
+
+    evict(results_dir, 2)
+    assert _entries(results_dir) == ['a', 'c']
+
+    evict(results_dir, 0)
+    assert _entries(results_dir) == []
@@ -0,0 +1,65 @@
+"""Stage timers: nesting, run log, profiling and the no-op default."""
+
+import json
+
+import pytest
+
+from instrumentation import instrumented_run, stage, timed
+
+
+@timed('work')
+def _work(n):
+    return sum(range(n))
+
+
+def test_stages_nest_and_log(work_dir, capsys):
+    run_log = work_dir / 'logs' / 'runs.jsonl'
+
+    with instrumented_run('demo', run_log=run_log) as record:
+        with stage('load') as load:
+            with stage('clean'):
+                _work(1000)
+            load['rows'] = 42
+        _work(10)
+
+    logged = json.loads(run_log.read_text(encoding='utf-8'))
+    assert logged == record
+    assert logged['status'] == 'ok'
+    assert [entry['stage'] for entry in logged['stages']] == ['load', 'load/clean', 'load/clean/work', 'work']
+    assert logged['stages'][0]['rows'] == 42
+    assert all(entry['seconds'] >= 0 for entry in logged['stages'])
+    assert '_profile_dir' not in logged
+    assert 'STAGE TIMINGS (demo' in capsys.readouterr().out
+
+
+def test_failed_run_is_logged(work_dir):
+    run_log = work_dir / 'runs.jsonl'
+
+    with pytest.raises(ValueError):
+        with instrumented_run('demo', run_log=run_log):
+            with stage('load'):
+                raise ValueError('bad input')
+    with instrumented_run('demo', run_log=run_log):
+        pass
+
+    runs = [json.loads(line) for line in run_log.read_text(encoding='utf-8').splitlines()]
+    assert [run['status'] for run in runs] == ['error: ValueError', 'ok']
+    assert runs[1]['stages'] == []
+
+
+def test_profile_per_top_level_stage(work_dir):
+    with instrumented_run('demo', profile_dir=work_dir / 'prof') as record:
+        for _ in range(2):
+            with stage('load'):
+                _work(100)
+
+    assert sorted(path.name for path in (work_dir / 'prof').iterdir()) == ['demo-load-2.prof', 'demo-load.prof']
+    assert 'profile' not in record['stages'][1]
+
+
+def test_no_op_outside_run(capsys):
+    with stage('load') as record:
+        record['rows'] = 1
+
+    assert _work(4) == 6
+    assert capsys.readouterr().out == ''
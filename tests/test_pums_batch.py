@@ -0,0 +1,71 @@
+"""Batch PUMS header update: file discovery and the pooled rewrite."""
+
+from pathlib import Path
+
+from conftest import write_pums_dictionary
+from pums_batch import discover_pums_files, output_path, run_batch
+
+BODY = b'H,2018HU0000001,2\nH,2018HU0000002,0\n'
+
+
+def _release(root, year, csv_files):
+    release = Path(root) / f"PUMS-{year}-data"
+    write_pums_dictionary(release / f"PUMS_Data_Dictionary_{year}.txt")
+    for csv_file in csv_files:
+        (release / csv_file).parent.mkdir(parents=True, exist_ok=True)
+        (release / csv_file).write_bytes(b'RT,SERIALNO,VEH\n' + BODY)
+    return release
+
+
+def test_discovery_pairs_files_with_their_dictionary(work_dir):
+    first = _release(work_dir, 2018, ['csv_hfl/psam_h12.csv', 'csv_pfl/psam_p12.csv'])
+    second = _release(work_dir, 2017, ['csv_hca/psam_h06.csv'])
+    (work_dir / 'stray').mkdir()
+    (work_dir / 'stray' / 'psam_h01.csv').write_bytes(b'RT\n')
+    (first / 'csv_hfl' / 'psam_h12_updated_headers.csv').write_bytes(b'RT\n')
+
+    by_dictionary, orphans = discover_pums_files(work_dir)
+
+    assert {path.name: [csv_file.name for csv_file in files] for path, files in by_dictionary.items()} == {
+        'PUMS_Data_Dictionary_2018.txt': ['psam_h12.csv', 'psam_p12.csv'],
+        'PUMS_Data_Dictionary_2017.txt': ['psam_h06.csv'],
+    }
+    assert second / 'PUMS_Data_Dictionary_2017.txt' in by_dictionary
+    assert orphans == [work_dir / 'stray' / 'psam_h01.csv']
+
+
+def test_batch_rewrites_every_header(work_dir):
+    release = _release(work_dir, 2018, ['csv_hfl/psam_h12.csv', 'csv_pfl/psam_p12.csv'])
+
+    stats = run_batch(work_dir, workers=2)
+
+    assert len(stats) == 2
+    for csv_file in ('csv_hfl/psam_h12.csv', 'csv_pfl/psam_p12.csv'):
+        updated = output_path(release / csv_file).read_bytes()
+        assert updated == b'RT_Record_Type,SERIALNO_Housing_unitGQ_person_serial_number,VEH_Vehicles_1_ton_or_less_available\n' + BODY
+        assert (release / csv_file).read_bytes() == b'RT,SERIALNO,VEH\n' + BODY
+
+    # Written copies are not picked up again
+    assert len(run_batch(work_dir, workers=2)) == 2
+
+
+def test_batch_in_place(work_dir):
+    release = _release(work_dir, 2018, ['csv_hfl/psam_h12.csv'])
+
+    run_batch(work_dir, in_place=True, workers=1)
+
+    assert (release / 'csv_hfl' / 'psam_h12.csv').read_bytes().startswith(b'RT_Record_Type,')
+    assert not output_path(release / 'csv_hfl' / 'psam_h12.csv').exists()
+
+
+def test_failed_files_reported_separately(work_dir, capsys):
+    release = _release(work_dir, 2018, ['csv_hfl/psam_h12.csv', 'csv_pfl/psam_p12.csv', 'csv_hga/psam_h13.csv'])
+    (release / 'csv_pfl' / 'psam_p12.csv').write_bytes(b'')
+    (release / 'csv_hga' / 'psam_h13.csv').write_bytes(b'RT,\xff\xfe\n' + BODY)
+
+    stats = run_batch(work_dir, workers=2)
+
+    assert [Path(result['csv_file']).name for result in stats] == ['psam_h12.csv']
+    out = capsys.readouterr().out
+    assert 'Files updated: 1\n' in out
+    assert 'Files failed: 2\n' in out
@@ -0,0 +1,99 @@
+"""Typed, column-pruned PUMS loader and the indexed person-to-household join."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import write_pums_dictionary
+from pums_data import HOUSEHOLD_KEY, attach_households, encode_serialno, load_households, load_pums, variable_columns
+from pums_dictionary import load_dictionary
+
+HOUSING = b'RT,SERIALNO,VEH\nH,2018HU0000002,1\nH,2018HU0000001,2\nH,2018GQ0000001,\n'
+PERSONS = b'RT,SERIALNO,SPORDER,AGEP,VEH\nP,2018HU0000001,1,34,2\nP,2018HU0000001,2,7,\nP,2018GQ0000001,1,81,0\n'
+
+
+@pytest.fixture
+def dictionary(work_dir):
+    write_pums_dictionary(work_dir / 'dictionary.txt')
+    return load_dictionary(work_dir / 'dictionary.txt')
+
+
+def test_compact_dtypes(work_dir, dictionary):
+    (work_dir / 'psam_p12.csv').write_bytes(PERSONS)
+
+    df = load_pums(work_dir / 'psam_p12.csv', ['SERIALNO', 'AGEP', 'VEH', 'RT'], dictionary)
+
+    assert list(df.columns) == ['SERIALNO', 'AGEP', 'VEH', 'RT']
+    assert df['AGEP'].dtype == np.int8
+    assert df['VEH'].dtype == np.float32
+    assert isinstance(df['RT'].dtype, pd.CategoricalDtype)
+    assert df['SERIALNO'].tolist() == ['2018HU0000001', '2018HU0000001', '2018GQ0000001']
+    assert df['VEH'].isna().tolist() == [False, True, False]
+
+
+def test_renamed_header_matches_raw(work_dir, dictionary):
+    (work_dir / 'raw.csv').write_bytes(PERSONS)
+    body = PERSONS.split(b'\n', 1)[1]
+    (work_dir / 'renamed.csv').write_bytes(b'RT_Record_Type,SERIALNO_Serial,SPORDER,AGEP_Age,VEH_Vehicles\n' + body)
+
+    raw = load_pums(work_dir / 'raw.csv', ['SERIALNO', 'AGEP', 'VEH'], dictionary)
+    renamed = load_pums(work_dir / 'renamed.csv', ['SERIALNO', 'AGEP', 'VEH'], dictionary)
+
+    assert list(renamed.columns) == ['SERIALNO_Serial', 'AGEP_Age', 'VEH_Vehicles']
+    pd.testing.assert_frame_equal(renamed.set_axis(raw.columns, axis=1), raw)
+
+
+def test_missing_variable():
+    with pytest.raises(KeyError, match='PWGTP'):
+        variable_columns(['SERIALNO', 'AGEP_Age'], ['AGEP', 'PWGTP'])
+
+
+def test_encode_serialno_examples():
+    serials = pd.Series(['2018HU0000001', '2018GQ0000001', '2013000000042'])
+    keys = encode_serialno(serials)
+
+    assert keys.dtype == np.int64
+    assert keys.tolist() == [201810000001, 201800000001, 2013000000042]
+
+
+def test_encode_serialno_keeps_order():
+    serials = pd.Series(['2018GQ0000002', '2018HU0000001', '2018HU0000010', '2018HU0000002'])
+    keys = encode_serialno(serials)
+
+    assert np.argsort(keys, kind='stable').tolist() == np.argsort(serials.to_numpy(), kind='stable').tolist()
+
+
+def test_encode_serialno_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        encode_serialno(pd.Series(['2018XX0000001']))
+
+
+def test_attach_households_matches_merge():
+    by_serial = pd.DataFrame({
+        'SERIALNO': ['2018HU0000003', '2018GQ0000001', '2018HU0000001'],
+        'VEH': pd.array([2, 0, 1], dtype='Int8'),
+        'TEN': pd.Categorical(['Owned', 'Rented', 'Owned']),
+    })
+    households = (by_serial.assign(**{HOUSEHOLD_KEY: encode_serialno(by_serial['SERIALNO'])})
+                  .drop(columns='SERIALNO').sort_values(HOUSEHOLD_KEY, ignore_index=True))
+    persons = pd.DataFrame({
+        'SERIALNO': ['2018HU0000001', '2018HU0000002', '2018HU0000003', '2018HU0000001', '2018GQ0000001'],
+        'AGEP': [30, 41, 52, 8, 77],
+    })
+
+    attached = attach_households(persons, households, 'SERIALNO')
+
+    pd.testing.assert_frame_equal(attached, persons.merge(by_serial, on='SERIALNO', how='left'))
+
+
+def test_load_households_sorted_and_cached(work_dir, dictionary, capsys):
+    (work_dir / 'psam_h12.csv').write_bytes(HOUSING)
+
+    households = load_households(work_dir / 'psam_h12.csv', ['VEH'], dictionary, cache_dir='cache')
+    assert 'Building household table' in capsys.readouterr().out
+    assert households[HOUSEHOLD_KEY].tolist() == [201800000001, 201810000001, 201810000002]
+    pd.testing.assert_series_equal(households['VEH'], pd.Series([np.nan, 2, 1], dtype='float32', name='VEH'))
+
+    cached = load_households(work_dir / 'psam_h12.csv', ['VEH'], dictionary, cache_dir='cache')
+    assert 'Building household table' not in capsys.readouterr().out
+    pd.testing.assert_frame_equal(cached, households)
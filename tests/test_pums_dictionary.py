@@ -0,0 +1,98 @@
+"""PUMS data dictionary: parsing, value labels and cache invalidation."""
+
+import os
+
+import pandas as pd
+import pytest
+
+import pums_dictionary
+from conftest import write_pums_dictionary
+from pums_dictionary import load_dictionary, to_categorical, value_labels
+
+
+@pytest.fixture
+def dict_file(work_dir):
+    dict_file = work_dir / 'PUMS_Data_Dictionary_2018.txt'
+    write_pums_dictionary(dict_file)
+    return dict_file
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """Count how often the dictionary text is parsed."""
+    calls = []
+    parse = pums_dictionary.parse_dictionary_text
+
+    def counting_parse(lines):
+        calls.append(1)
+        return parse(lines)
+
+    monkeypatch.setattr(pums_dictionary, 'parse_dictionary_text', counting_parse)
+    return calls
+
+
+def _bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_parsed_entries(dict_file):
+    dictionary = load_dictionary(dict_file)
+
+    assert dictionary['VEH']['type'] == 'Numeric'
+    assert dictionary['VEH']['description'] == 'Vehicles (1 ton or less) available'
+    assert dictionary['AGEP']['ranges'] == [['1', '99', '1 to 99 years (Top-coded)']]
+    assert value_labels(dictionary, 'VEH') == {0: 'No vehicles', 1: '1 vehicle', 2: '2 vehicles'}
+
+
+def test_to_categorical(dict_file):
+    dictionary = load_dictionary(dict_file)
+    labeled = to_categorical(pd.Series([2, None, 0, 7], name='VEH'), dictionary, 'VEH')
+
+    assert list(labeled.cat.categories) == ['No vehicles', '1 vehicle', '2 vehicles']
+    assert labeled.cat.codes.tolist() == [2, -1, 0, -1]
+
+
+def test_cache_reused(dict_file, parse_calls):
+    first = load_dictionary(dict_file)
+    second = load_dictionary(dict_file)
+
+    assert len(parse_calls) == 1
+    assert first == second
+
+
+def test_touched_dictionary_reuses_cache(dict_file, parse_calls):
+    load_dictionary(dict_file)
+    _bump_mtime(dict_file)
+    load_dictionary(dict_file)
+
+    assert len(parse_calls) == 1
+
+
+def test_same_size_edit_reparses(dict_file, parse_calls):
+    load_dictionary(dict_file)
+    text = dict_file.read_text(encoding='utf-8')
+    dict_file.write_text(text.replace('Record Type', 'Record Kind'), encoding='utf-8')
+    _bump_mtime(dict_file)
+
+    assert load_dictionary(dict_file)['RT']['description'] == 'Record Kind'
+    assert len(parse_calls) == 2
+
+
+def test_changed_dictionary_reparses(dict_file, parse_calls):
+    load_dictionary(dict_file)
+    with open(dict_file, 'a', encoding='utf-8') as f:
+        f.write("HISP        Character 2\n    Recoded detailed Hispanic origin\n          01 .Not Spanish/Hispanic/Latino\n")
+
+    assert value_labels(load_dictionary(dict_file), 'HISP') == {1: 'Not Spanish/Hispanic/Latino'}
+    assert len(parse_calls) == 2
+
+
+def test_refresh_and_format_version(dict_file, parse_calls, monkeypatch):
+    load_dictionary(dict_file)
+    load_dictionary(dict_file, refresh=True)
+    assert len(parse_calls) == 2
+
+    monkeypatch.setattr(pums_dictionary, 'CACHE_FORMAT_VERSION', pums_dictionary.CACHE_FORMAT_VERSION + 1)
+    load_dictionary(dict_file)
+    assert len(parse_calls) == 3
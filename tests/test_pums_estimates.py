@@ -0,0 +1,40 @@
+"""Weighted PUMS estimates with successive difference replication standard errors."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pums_estimates import REPLICATES, estimate, estimate_shares, sdr_standard_error
+
+
+def test_sdr_known_value():
+    # Every replicate 1 away from the estimate: sqrt(4/80 * 80 * 1) = 2
+    replicates = np.full(1 + REPLICATES, 101.0)
+    replicates[0] = 100.0
+
+    assert estimate(replicates) == (100.0, 2.0)
+
+
+def test_sdr_is_vectorized_over_rows():
+    rng = np.random.default_rng(0)
+    rows = rng.normal(100, 5, size=(4, 1 + REPLICATES))
+
+    expected = [np.sqrt(4 / REPLICATES * sum((r - row[0]) ** 2 for r in row[1:])) for row in rows]
+    np.testing.assert_allclose(sdr_standard_error(rows), expected)
+
+
+def test_estimate_shares_matches_per_category():
+    rng = np.random.default_rng(1)
+    values = pd.Series(rng.choice(['a', 'b', 'c', None], size=500), name='group')
+    weights = rng.integers(1, 50, size=(500, 1 + REPLICATES)).astype('float64')
+
+    result = estimate_shares(values, weights)
+
+    counted = values.notna().to_numpy()
+    for category, row in result.iterrows():
+        mask = (values == category).to_numpy()
+        totals = mask @ weights
+        shares = totals / weights[counted].sum(axis=0)
+        assert (row['total'], row['total_se']) == pytest.approx(estimate(totals))
+        assert (row['share'], row['share_se']) == pytest.approx(estimate(shares))
+    assert sorted(result.index) == ['a', 'b', 'c']
@@ -0,0 +1,73 @@
+"""Stops cube: marginal counts and cube-backed reports against the underlying rows."""
+
+import pandas as pd
+
+import quick_summary
+import violation_analysis
+from stops_cube import load_cube
+from stops_data import read_stops_csv
+from stops_schema import derive_columns
+
+
+def _assert_counts_equal(left, right):
+    right = right[right > 0]
+    pd.testing.assert_series_equal(left.sort_index(), right.sort_index(), check_names=False, check_index_type=False,
+                                   check_categorical=False, check_dtype=False)
+
+
+def test_counts_match_value_counts(stops_csv):
+    cube = load_cube(stops_csv, cube_dir='cube')
+    full = derive_columns(read_stops_csv(stops_csv), ['department_name_clean', 'year'])
+
+    assert cube.total() == len(full)
+    assert cube.unique_subjects == full['raw_row_number'].nunique()
+    for dimension in ('subject_race', 'outcome', 'department_name_clean', 'year'):
+        _assert_counts_equal(cube.counts(dimension), full[dimension].value_counts())
+
+
+def test_filtered_crosstab_matches_rows(stops_csv):
+    cube = load_cube(stops_csv, cube_dir='cube')
+    full = derive_columns(read_stops_csv(stops_csv), ['year'])
+
+    rows = full[full['year'] == 2015]
+    assert len(rows)
+    expected = pd.crosstab(rows['subject_race'], rows['outcome'])
+    table = cube.crosstab('subject_race', 'outcome', year=2015)
+    pd.testing.assert_frame_equal(table, expected, check_names=False, check_index_type=False,
+                                  check_column_type=False, check_categorical=False, check_dtype=False)
+
+
+def test_cached_cube_reused(stops_csv, capsys):
+    load_cube(stops_csv, cube_dir='cube')
+    capsys.readouterr()
+    load_cube(stops_csv, cube_dir='cube')
+
+    assert 'Building stops cube' not in capsys.readouterr().out
+
+
+def test_summary_from_cube_matches_rows(stops_csv):
+    cube = load_cube(stops_csv, cube_dir='cube')
+    rows = read_stops_csv(stops_csv, quick_summary.COLUMNS)
+
+    from_cube = quick_summary.compute_summary_from_cube(cube)
+    expected = quick_summary.compute_summary(rows)
+
+    assert from_cube['total'] == expected['total']
+    assert from_cube['unique_subjects'] == expected['unique_subjects']
+    for key in quick_summary.COUNT_KEYS:
+        _assert_counts_equal(from_cube[key], expected[key])
+
+
+def test_violation_report_from_cube_matches_rows(stops_csv):
+    cube = load_cube(stops_csv, cube_dir='cube')
+    rows = derive_columns(read_stops_csv(stops_csv, violation_analysis.COLUMNS), violation_analysis.DERIVED)
+
+    from_cube = violation_analysis.compute_from_cube(cube)
+    expected = violation_analysis.compute(rows)
+
+    for key in ('total', 'unique_violations', 'category_total'):
+        assert from_cube[key] == expected[key], key
+    _assert_counts_equal(from_cube['category_counts'], expected['category_counts'])
+    pd.testing.assert_frame_equal(from_cube['race_violation_cross'], expected['race_violation_cross'],
+                                  check_names=False, check_index_type=False, check_column_type=False,
+                                  check_categorical=False, check_dtype=False)
@@ -0,0 +1,69 @@
+"""Parquet cache of the stops loader: reuse, invalidation and column projection."""
+
+import os
+
+import pandas as pd
+
+from stops_data import load_stops, read_stops_csv
+
+
+def _parquet_files(cache_dir):
+    return sorted(path.name for path in cache_dir.glob('*.parquet'))
+
+
+def test_cache_hit_matches_conversion(stops_csv, work_dir, capsys):
+    converted = load_stops(csv_file=stops_csv, cache_dir=work_dir / 'cache')
+    cached = load_stops(csv_file=stops_csv, cache_dir=work_dir / 'cache')
+
+    assert 'Reading cached stops data' in capsys.readouterr().out
+    pd.testing.assert_frame_equal(converted, cached)
+    pd.testing.assert_frame_equal(cached, read_stops_csv(stops_csv))
+
+
+def test_touched_source_reuses_cache(stops_csv, work_dir, capsys):
+    cache_dir = work_dir / 'cache'
+    load_stops(csv_file=stops_csv, cache_dir=cache_dir)
+    before = _parquet_files(cache_dir)
+
+    # Same content, new mtime: the hash is recomputed and still matches
+    stat = os.stat(stops_csv)
+    os.utime(stops_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    capsys.readouterr()
+    load_stops(csv_file=stops_csv, cache_dir=cache_dir)
+
+    assert 'Reading cached stops data' in capsys.readouterr().out
+    assert _parquet_files(cache_dir) == before
+
+
+def test_changed_source_reconverts(stops_csv, work_dir, capsys):
+    cache_dir = work_dir / 'cache'
+    load_stops(csv_file=stops_csv, cache_dir=cache_dir)
+    before = _parquet_files(cache_dir)
+
+    # Drop the last row, as a corrected data release would
+    lines = stops_csv.read_text(encoding='utf-8').splitlines(keepends=True)
+    stops_csv.write_text(''.join(lines[:-1]), encoding='utf-8')
+    capsys.readouterr()
+    df = load_stops(csv_file=stops_csv, cache_dir=cache_dir)
+
+    assert 'Converting' in capsys.readouterr().out
+    assert len(df) == len(lines) - 2
+    after = _parquet_files(cache_dir)
+    assert len(after) == 1 and after != before
+
+
+def test_refresh_reconverts(stops_csv, work_dir, capsys):
+    load_stops(csv_file=stops_csv, cache_dir=work_dir / 'cache')
+    capsys.readouterr()
+    load_stops(csv_file=stops_csv, cache_dir=work_dir / 'cache', refresh=True)
+
+    assert 'Converting' in capsys.readouterr().out
+
+
+def test_column_projection(stops_csv, work_dir):
+    columns = ['date', 'subject_race', 'department_name']
+    full = load_stops(csv_file=stops_csv, cache_dir=work_dir / 'cache')
+    projected = load_stops(columns, csv_file=stops_csv, cache_dir=work_dir / 'cache')
+
+    assert list(projected.columns) == columns
+    pd.testing.assert_frame_equal(projected, full[columns])
@@ -0,0 +1,37 @@
+"""Memory-mapped stops store: equivalence with the Parquet cache and column round trips."""
+
+import numpy as np
+import pandas as pd
+
+from stops_data import load_stops
+from stops_mmap import open_mmap_store, write_mmap_store
+
+
+def test_matches_parquet_cache(stops_csv, work_dir):
+    parquet = load_stops(csv_file=stops_csv, cache_dir=work_dir / 'cache')
+    mapped = load_stops(csv_file=stops_csv, cache_dir=work_dir / 'cache', cache_format='mmap')
+
+    pd.testing.assert_frame_equal(mapped, parquet)
+
+
+def test_column_selection(stops_csv, work_dir):
+    columns = ['date', 'violation', 'subject_race']
+    mapped = load_stops(columns, csv_file=stops_csv, cache_dir=work_dir / 'cache', cache_format='mmap')
+
+    assert list(mapped.columns) == columns
+    pd.testing.assert_frame_equal(mapped, load_stops(columns, csv_file=stops_csv, cache_dir=work_dir / 'cache'))
+
+
+def test_nullable_round_trip(work_dir):
+    df = pd.DataFrame({
+        'flag': pd.array([True, None, False], dtype='boolean'),
+        'small': pd.array([1, None, -3], dtype='Int16'),
+        'unsigned': pd.array([None, 7, 9], dtype='UInt32'),
+        'ratio': pd.array([0.5, 1.5, None], dtype='Float64'),
+        'count': np.array([1, 2, 3], dtype='int64'),
+        'when': pd.to_datetime(['2018-01-01', None, '2018-12-31']),
+        'state': pd.Categorical(['FL', None, 'GA']),
+    })
+
+    write_mmap_store(df, work_dir / 'store', {'source': 'test'})
+    pd.testing.assert_frame_equal(open_mmap_store(work_dir / 'store'), df)
@@ -0,0 +1,44 @@
+"""Single-pass report engine: one load for every report, same results as separate runs."""
+
+import pandas as pd
+
+import stops_reports
+from stops_data import load_stops
+from stops_reports import REPORT_MODULES, compute_reports, load_report_modules
+from stops_schema import derive_columns
+
+
+def _assert_same(left, right):
+    assert left.keys() == right.keys()
+    for key, value in left.items():
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(value, right[key])
+        elif isinstance(value, pd.Series):
+            pd.testing.assert_series_equal(value, right[key])
+        else:
+            assert value == right[key], key
+
+
+def test_single_load_for_union_of_columns(stops_csv, cvap_csv, monkeypatch):
+    calls = []
+
+    def recording_load(columns=None, **kwargs):
+        calls.append(list(columns))
+        return load_stops(columns, **kwargs)
+
+    monkeypatch.setattr(stops_reports, 'load_stops', recording_load)
+    results = compute_reports(list(REPORT_MODULES), csv_file=stops_csv)
+
+    modules = load_report_modules(list(REPORT_MODULES))
+    assert len(calls) == 1
+    assert set(calls[0]) == {col for module in modules.values() for col in module.COLUMNS}
+    assert len(calls[0]) == len(set(calls[0]))
+    assert set(results) == set(REPORT_MODULES)
+
+
+def test_results_match_separate_loads(stops_csv, cvap_csv):
+    results = compute_reports(list(REPORT_MODULES), csv_file=stops_csv)
+
+    for name, module in load_report_modules(list(REPORT_MODULES)).items():
+        df = derive_columns(load_stops(module.COLUMNS, csv_file=stops_csv), module.DERIVED)
+        _assert_same(results[name], module.compute(df))
@@ -0,0 +1,108 @@
+"""Declared stops schema: dtypes, category order, value normalization and date/time parsing."""
+
+import pandas as pd
+
+from stops_data import read_stops_csv
+from stops_schema import (CATEGORY_SETS, DATETIME_FORMATS, STOPS_SCHEMA, TIMESTAMP_COLUMN, apply_schema, clean_department,
+                          clean_state, detect_format, normalize_categorical, parse_unique)
+from stops_stream import iter_stops_csv
+
+
+def test_declared_dtypes(stops_csv):
+    df = read_stops_csv(stops_csv)
+
+    assert list(df.columns) == list(STOPS_SCHEMA) + [TIMESTAMP_COLUMN]
+    assert pd.api.types.is_datetime64_dtype(df['date'])
+    assert pd.api.types.is_bool_dtype(df['arrest_made'])
+    for col, kind in STOPS_SCHEMA.items():
+        if kind == 'category':
+            assert isinstance(df[col].dtype, pd.CategoricalDtype), col
+
+
+def test_known_categories_first(stops_csv):
+    df = read_stops_csv(stops_csv)
+
+    for col, known in CATEGORY_SETS.items():
+        categories = list(df[col].cat.categories)
+        observed = [value for value in known if value in categories]
+        assert categories[:len(observed)] == observed, col
+
+
+def test_normalize_merges_values_that_clean_to_the_same_string():
+    raw = pd.Series([' fl', 'FL', 'ga ', None, 'fl', 'GA', ''], name='vehicle_registration_state')
+
+    normalized = normalize_categorical(raw, clean_state)
+
+    assert normalized.cat.categories.tolist() == ['FL', 'GA']
+    assert normalized.isna().tolist() == [False, False, False, True, False, False, True]
+    assert normalized.dropna().tolist() == ['FL', 'FL', 'GA', 'FL', 'GA']
+    assert normalized.name == 'vehicle_registration_state'
+
+
+def test_normalize_categorical_input_matches_strings():
+    raw = pd.Series(['TPD', 'Tampa Police Department|Tampa Police Department', 'tampa pd', 'HCSO', None])
+
+    from_strings = normalize_categorical(raw, clean_department)
+    from_categorical = normalize_categorical(raw.astype('category'), clean_department)
+
+    pd.testing.assert_series_equal(from_strings, from_categorical)
+    assert from_strings.cat.categories.tolist() == ["Hillsborough County Sheriff's Office", 'Tampa Police Department']
+    assert from_strings.value_counts()['Tampa Police Department'] == 3
+
+
+def test_clean_department():
+    assert clean_department('  Tampa   Police Department |Tampa Police Department') == 'Tampa Police Department'
+    assert clean_department('hcso') == "Hillsborough County Sheriff's Office"
+    assert clean_department('Plant City Police Department') == 'Plant City Police Department'
+    assert clean_department('|') is None
+
+
+def test_loaded_states_are_normalized(stops_csv):
+    states = read_stops_csv(stops_csv, columns=['vehicle_registration_state'])['vehicle_registration_state']
+
+    assert 'fl' not in states.cat.categories
+    raw = pd.read_csv(stops_csv, usecols=['vehicle_registration_state'])['vehicle_registration_state']
+    assert (states == 'FL').sum() == raw.isin(['FL', 'fl']).sum()
+
+
+def test_detect_format():
+    us_dates = pd.Series(['03/14/2015', '12/01/2016', None, '07/04/2017'])
+
+    assert detect_format(us_dates, DATETIME_FORMATS['date']) == '%m/%d/%Y'
+    assert detect_format(pd.Series(['14:05', '09:30']), DATETIME_FORMATS['time']) == '%H:%M'
+    # Ambiguous and empty samples fall back to the first candidate
+    assert detect_format(pd.Series(['2015-03-04']), ['%Y-%m-%d', '%Y-%d-%m']) == '%Y-%m-%d'
+    assert detect_format(pd.Series([None], dtype=object), DATETIME_FORMATS['date']) == DATETIME_FORMATS['date'][0]
+
+
+def test_parse_unique_matches_to_datetime():
+    values = pd.Series(['2015-03-04', 'not a date', None, '2015-03-04', '2018-12-31', '2016-02-30'] * 5)
+
+    parsed, unparsable = parse_unique(values, '%Y-%m-%d')
+
+    pd.testing.assert_series_equal(parsed, pd.to_datetime(values, format='%Y-%m-%d', errors='coerce'))
+    assert unparsable == 10
+
+
+def test_unparsable_values_counted(capsys):
+    df = apply_schema(pd.DataFrame({'date': ['2015-03-04', '2015-13-01', None]}))
+
+    assert df.attrs['unparsable'] == {'date': 1}
+    assert "1 unparsable date value(s), e.g. '2015-13-01'" in capsys.readouterr().out
+
+
+def test_timestamp_combines_date_and_time():
+    df = apply_schema(pd.DataFrame({'date': ['2015-03-04', '2015-03-05', None], 'time': ['13:45:10', None, '08:00:00']}))
+
+    expected = pd.Series(pd.to_datetime(['2015-03-04 13:45:10', None, None]), name=TIMESTAMP_COLUMN)
+    pd.testing.assert_series_equal(df[TIMESTAMP_COLUMN], expected, check_dtype=False)
+
+
+def test_chunks_reuse_detected_format(work_dir):
+    # Only the first chunk has enough distinct values to identify %m/%d/%Y; 01/02/2015 alone is ambiguous
+    dates = ['03/14/2015', '12/31/2016'] + ['01/02/2015'] * 6
+    pd.DataFrame({'date': dates}).to_csv(work_dir / 'us_dates.csv', index=False)
+
+    chunks = list(iter_stops_csv(work_dir / 'us_dates.csv', ['date'], chunksize=2))
+
+    assert pd.concat(chunks)['date'].tolist() == list(pd.to_datetime(dates, format='%m/%d/%Y'))
@@ -0,0 +1,105 @@
+"""Incremental store: delta ingest, equivalence with a full load and partition pruning."""
+
+import pandas as pd
+import pytest
+
+import cvap_disparity
+from stops_cube import DIMENSIONS, load_cube
+from stops_data import read_stops_csv
+from stops_schema import derive_columns
+from stops_store import ingest, load_store, load_store_cube, read_manifest, select_parts
+
+FIRST_RELEASE_ROWS = 1500
+
+
+def _sorted(df):
+    return df.sort_values(['raw_row_number', 'date'], ignore_index=True)
+
+
+def _cells(cube):
+    cells = cube.cells.astype({dimension: object for dimension in DIMENSIONS})
+    return cells.sort_values(DIMENSIONS, ignore_index=True)
+
+
+@pytest.fixture
+def store(stops_csv, work_dir):
+    """Store built from two releases: the first 1500 rows, then the full file."""
+    first_release = work_dir / 'first_release.csv'
+    lines = stops_csv.read_text(encoding='utf-8').splitlines(keepends=True)
+    first_release.write_text(''.join(lines[:1 + FIRST_RELEASE_ROWS]), encoding='utf-8')
+
+    store_dir = work_dir / 'store'
+    ingest(first_release, store_dir, chunksize=400)
+    ingest(stops_csv, store_dir, chunksize=400)
+    return store_dir
+
+
+@pytest.fixture
+def full(stops_csv):
+    return read_stops_csv(stops_csv)
+
+
+def test_second_release_adds_only_new_rows(store, full):
+    releases = read_manifest(store)['releases']
+
+    assert [release['rows_added'] for release in releases] == [FIRST_RELEASE_ROWS, len(full) - FIRST_RELEASE_ROWS]
+    assert read_manifest(store)['rows'] == len(full)
+
+
+def test_reingest_is_noop(store, stops_csv):
+    manifest = read_manifest(store)
+
+    assert ingest(stops_csv, store) is None
+    assert read_manifest(store) == manifest
+
+
+def test_store_matches_full_load(store, full):
+    pd.testing.assert_frame_equal(_sorted(load_store(store_dir=store)), _sorted(full), check_categorical=False)
+
+
+def test_pruned_load_matches_filter(store, full):
+    derive_columns(full, ['department_name_clean'])
+    department = full['department_name_clean'].value_counts().index[0]
+    start, end = '2010-03-15', '2014-06-30'
+
+    pruned = load_store(['raw_row_number', 'date', 'subject_race'], store_dir=store,
+                        departments=[department], start=start, end=end)
+
+    keep = ((full['department_name_clean'] == department)
+            & (full['date'] >= pd.Timestamp(start)) & (full['date'] <= pd.Timestamp(end)))
+    expected = full.loc[keep, ['raw_row_number', 'date', 'subject_race']]
+    assert len(expected)
+    pd.testing.assert_frame_equal(_sorted(pruned), _sorted(expected), check_categorical=False)
+
+    parts = read_manifest(store)['parts']
+    assert 0 < len(select_parts(parts, [department], start, end)) < len(parts)
+
+
+def test_store_cube_matches_full_cube(store, stops_csv):
+    stored = load_store_cube(store)
+    built = load_cube(stops_csv, cube_dir='cube')
+
+    assert stored.total() == built.total()
+    assert stored.unique_subjects == built.unique_subjects
+    pd.testing.assert_frame_equal(_cells(stored), _cells(built), check_categorical=False)
+
+
+def test_department_pattern_matches_csv_with_piped_names(stops_csv, cvap_csv):
+    # Rows whose clean (first) name is outside the pattern but whose raw name matches it
+    df = pd.read_csv(stops_csv, dtype=str, keep_default_na=False)
+    relabel = df.index[::9]
+    df.loc[relabel, 'department_name'] = 'Tampa Airport Police|Tampa Police Department'
+    df.to_csv(stops_csv, index=False)
+    ingest(stops_csv)
+
+    from_csv = cvap_disparity.disparity(stops_csv=stops_csv)
+    from_store = cvap_disparity.disparity(use_store=True)
+
+    assert from_store['total_stops'] == from_csv['total_stops']
+    pd.testing.assert_series_equal(from_store['race_stops'], from_csv['race_stops'], check_categorical=False)
+    pd.testing.assert_frame_equal(from_store['comparison_df'], from_csv['comparison_df'])
+
+    parts = read_manifest()['parts']
+    selected = select_parts(parts, cvap_disparity.HILLSBOROUGH_DEPARTMENTS)
+    assert 'Tampa Airport Police' in {part['department'] for part in selected}
+    assert len(selected) < len(parts)
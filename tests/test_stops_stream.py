@@ -0,0 +1,51 @@
+"""Streaming summary: chunked counters and the HyperLogLog distinct counter."""
+
+import numpy as np
+import pandas as pd
+
+from quick_summary import COLUMNS, COUNT_KEYS, compute_summary, compute_summary_streaming
+from stops_data import read_stops_csv
+from stops_stream import HyperLogLog
+
+# Four times the ~0.8% standard error at the default precision
+TOLERANCE = 0.035
+
+
+def test_hyperloglog_error_bound():
+    for distinct in (100, 5_000, 50_000):
+        sketch = HyperLogLog()
+        sketch.update(np.arange(distinct))
+        assert abs(sketch.count() - distinct) <= TOLERANCE * distinct
+
+
+def test_hyperloglog_ignores_duplicates_and_missing():
+    sketch = HyperLogLog()
+    sketch.update(pd.Series(np.arange(10_000)))
+    registers = sketch.registers.copy()
+
+    sketch.update(pd.Series(np.arange(10_000)))
+    sketch.update(pd.Series([None, np.nan]))
+    np.testing.assert_array_equal(sketch.registers, registers)
+
+
+def test_hyperloglog_merge_equals_union():
+    left, right, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.update(np.arange(0, 30_000))
+    right.update(np.arange(20_000, 50_000))
+    union.update(np.arange(0, 50_000))
+
+    left.merge(right)
+    np.testing.assert_array_equal(left.registers, union.registers)
+
+
+def test_streaming_matches_in_memory(stops_csv):
+    expected = compute_summary(read_stops_csv(stops_csv, COLUMNS))
+    streamed = compute_summary_streaming(stops_csv, chunksize=300)
+
+    assert streamed['total'] == expected['total']
+    assert abs(streamed['unique_subjects'] - expected['unique_subjects']) <= TOLERANCE * expected['unique_subjects']
+    for key in COUNT_KEYS:
+        left = streamed[key].sort_index()
+        right = expected[key][expected[key] > 0].sort_index()
+        pd.testing.assert_series_equal(left, right, check_names=False, check_index_type=False,
+                                       check_categorical=False, check_dtype=False)
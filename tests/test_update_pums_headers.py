@@ -0,0 +1,54 @@
+"""Streaming PUMS header rewrite: only the header line changes."""
+
+import pytest
+
+from update_pums_headers import update_csv_headers
+from update_pums_headers_improved import describe_column, rewrite_csv_header
+
+# Quoted fields, an embedded newline and no trailing newline: the body must survive byte for byte
+BODY = b'H,2018HU0000001,"a, b",1\r\nH,2018HU0000002,"line\r\nbreak",\r\nH,2018HU0000003,,3'
+
+
+@pytest.mark.parametrize('newline', [b'\n', b'\r\n'])
+def test_body_is_byte_identical(work_dir, newline):
+    source = work_dir / 'psam_h12.csv'
+    source.write_bytes(b'RT,SERIALNO,NOTE,VEH' + newline + BODY)
+
+    result = rewrite_csv_header(source, lambda header: [f"{col}_x" for col in header], work_dir / 'out.csv')
+
+    assert result == (['RT', 'SERIALNO', 'NOTE', 'VEH'], ['RT_x', 'SERIALNO_x', 'NOTE_x', 'VEH_x'])
+    assert (work_dir / 'out.csv').read_bytes() == b'RT_x,SERIALNO_x,NOTE_x,VEH_x' + newline + BODY
+    assert source.read_bytes() == b'RT,SERIALNO,NOTE,VEH' + newline + BODY
+
+
+def test_in_place_rewrite_quotes_new_names(work_dir):
+    source = work_dir / 'psam_p12.csv'
+    source.write_bytes(b'SERIALNO,AGEP\n' + BODY)
+
+    rewrite_csv_header(source, lambda header: [f"{col}, described" for col in header])
+
+    assert source.read_bytes() == b'"SERIALNO, described","AGEP, described"\n' + BODY
+    assert [path.name for path in work_dir.iterdir()] == ['psam_p12.csv']
+
+
+def test_empty_file(work_dir):
+    source = work_dir / 'empty.csv'
+    source.write_bytes(b'')
+
+    assert rewrite_csv_header(source, list) is None
+
+
+def test_update_csv_headers_uses_descriptions(work_dir):
+    source = work_dir / 'psam_h12.csv'
+    source.write_bytes(b'SERIALNO,VEH\n' + BODY)
+
+    update_csv_headers(source, {'VEH': 'Vehicles available'}, work_dir / 'out.csv')
+
+    assert (work_dir / 'out.csv').read_bytes() == b'SERIALNO,VEH_Vehicles available\n' + BODY
+
+
+def test_describe_column():
+    descriptions = {'VEH': 'Vehicles (1 ton or less) available'}
+
+    assert describe_column('VEH', descriptions) == 'VEH_Vehicles_1_ton_or_less_available'
+    assert describe_column('RT', descriptions) == 'RT'
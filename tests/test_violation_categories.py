@@ -0,0 +1,82 @@
+"""Violation categorization: equivalence with the per-row rules and the persisted lookup table."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import violation_categories
+from stops_data import read_stops_csv
+from violation_categories import (CODE_PATTERN, UNKNOWN_CATEGORY, categorize_violation, classify_violations,
+                                  load_lookup)
+
+# Descriptions that exercise the rule order: several match more than one rule
+EDGE_CASES = [
+    'SEAT BELT - DRIVER', 'FAIL TO STOP AT RED LIGHT', 'UNLAWFUL SPEED 316.183', 'NO VALID DL 322.03',
+    'EXPIRED REGISTRATION', 'NO PROOF OF INSURANCE', 'BRAKE LIGHT OUT', 'FAIL TO YIELD', 'DUI 316.193',
+    'CARELESS DRIVING', 'HIGHWAY OBSTRUCTION', 'LITTERING', 'speeding in school zone', '', None,
+]
+
+
+@pytest.fixture
+def violations(stops_csv):
+    stops = read_stops_csv(stops_csv, columns=['violation'])['violation']
+    edge_cases = pd.Series(EDGE_CASES, dtype=object)
+    return pd.concat([stops.astype(object), edge_cases], ignore_index=True)
+
+
+def test_matches_per_row_rules(violations, work_dir):
+    result = classify_violations(violations, lookup_file=work_dir / 'lookup.json')
+
+    expected = violations.apply(categorize_violation)
+    assert result['violation_category'].astype(object).tolist() == expected.tolist()
+    assert result['violation_category'].iloc[-1] == UNKNOWN_CATEGORY
+
+
+def test_matches_per_row_code_extraction(violations, work_dir):
+    result = classify_violations(violations, lookup_file=work_dir / 'lookup.json')
+
+    expected = violations.str.extract(CODE_PATTERN)[0]
+    pd.testing.assert_series_equal(result['violation_code_main'], expected, check_names=False)
+
+
+def test_categorical_input(violations, work_dir):
+    plain = classify_violations(violations, lookup_file=work_dir / 'plain.json')
+    categorical = classify_violations(violations.astype('category'), lookup_file=work_dir / 'categorical.json')
+
+    pd.testing.assert_frame_equal(plain, categorical)
+
+
+def test_lookup_reused(violations, work_dir, capsys):
+    lookup_file = work_dir / 'lookup.json'
+    first = classify_violations(violations, lookup_file=lookup_file)
+    assert 'Classified' in capsys.readouterr().out
+
+    second = classify_violations(violations, lookup_file=lookup_file)
+    assert 'Classified' not in capsys.readouterr().out
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_only_new_descriptions_classified(violations, work_dir, capsys):
+    lookup_file = work_dir / 'lookup.json'
+    classify_violations(violations, lookup_file=lookup_file)
+    capsys.readouterr()
+
+    extended = pd.concat([violations, pd.Series(['NEW RECKLESS DRIVING 316.192'])], ignore_index=True)
+    result = classify_violations(extended, lookup_file=lookup_file)
+
+    assert 'Classified 1 new violation descriptions' in capsys.readouterr().out
+    assert result['violation_category'].iloc[-1] == 'Reckless Driving'
+    assert 'NEW RECKLESS DRIVING 316.192' in load_lookup(lookup_file)
+
+
+def test_rule_change_invalidates_lookup(violations, work_dir, monkeypatch):
+    lookup_file = work_dir / 'lookup.json'
+    classify_violations(violations, lookup_file=lookup_file)
+    assert load_lookup(lookup_file)
+
+    monkeypatch.setattr(violation_categories, 'OTHER_CATEGORY', 'Uncategorized')
+    assert load_lookup(lookup_file) == {}
+
+    result = classify_violations(pd.Series(['LITTERING']), lookup_file=lookup_file)
+    assert result['violation_category'].tolist() == ['Uncategorized']
+    assert np.isnan(result['violation_code_main'].iloc[0])